@@ -1,24 +1,109 @@
-from flask import Flask, jsonify
+import time
+from flask import Flask, Response, g, jsonify, request
 from flask_cors import CORS
 from app.config.config import config
-from app.utils.logger import logger
+from app.utils.logger import configure_logging, logger
+from app.utils.json_provider import FastJSONProvider
+from app.services.market_poller import MarketDataPoller
+from app.services.tick_store import TickStore
+from app.services.indicator_service import IndicatorService
+from app.services.stream_hub import StreamHub
+from app.services.shared_snapshot_store import SharedSnapshotStore
+from app.services.snapshot_archive import SnapshotArchive
+from app.services.monte_carlo import MonteCarloEngine
+from app.services.downsampling import Downsampler
+from app.utils import metrics
 import os
 
-def create_app(config_name='default'):
-    """Application factory pattern"""
+# Snapshot handlers of the most recently created app. The NSE service and its
+# snapshot store are module-level and outlive any one app, so each new app
+# replaces the previous app's handlers rather than adding to them.
+_snapshot_subscribers = []
+
+def create_app(config_name='default', start_background=True):
+    """
+    Application factory pattern.
+
+    A preloading server passes `start_background=False` and starts the
+    poller in each worker after fork instead (see `app.server`).
+    """
     
     # Create Flask app
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
     
     # Load configuration
     app.config.from_object(config[config_name])
+    configure_logging(app.config)
     
     # Configure CORS
-    CORS(app, origins=app.config['CORS_ORIGINS'])
+    CORS(app, origins=app.config['CORS_ORIGINS'], expose_headers=['X-Snapshot-Version', 'X-Snapshot-Stale'])
     
     # Register blueprints
-    from app.api.routes import api_bp
+    from app.api.routes import api_bp, nse_service
+    from app.api.calc_routes import calc_bp
+    from app.api.crypto_routes import crypto_bp
     app.register_blueprint(api_bp)
+    app.register_blueprint(calc_bp)
+    app.register_blueprint(crypto_bp)
+    
+    # Under a multi-worker server one poller process writes snapshots that every worker maps
+    if app.config['SHARED_SNAPSHOTS_ENABLED']:
+        nse_service.snapshots = SharedSnapshotStore(
+            app.config['SHARED_SNAPSHOT_DIR'],
+            history_size=app.config['SNAPSHOT_HISTORY_SIZE']
+        )
+    
+    subscribers = []
+    
+    # Keep the last snapshots on disk so a restart can answer before NSE does
+    if app.config['SNAPSHOT_ARCHIVE_ENABLED']:
+        archive = SnapshotArchive(app.config['SNAPSHOT_ARCHIVE_DIR'])
+        nse_service.archive = archive
+        subscribers.append(archive.save)
+        app.extensions['snapshot_archive'] = archive
+    
+    # Record every published price snapshot for intraday history
+    tick_store = TickStore(
+        app.config['TICK_STORE_PATH'],
+        utc_offset_minutes=app.config['MARKET_UTC_OFFSET_MINUTES'],
+        retention_days=app.config['TICK_RETENTION_DAYS']
+    )
+    app.extensions['tick_store'] = tick_store
+    
+    # Technical indicators over the recorded bars, advanced as new bars close
+    indicator_service = IndicatorService(nse_service, tick_store, interval=app.config['INDICATOR_INTERVAL'])
+    app.extensions['indicator_service'] = indicator_service
+    
+    if app.config['TICK_STORE_ENABLED']:
+        subscribers.append(tick_store.record_snapshot)
+        subscribers.append(indicator_service.on_snapshot)
+    
+    # Push row diffs of live datasets to SSE clients, all sharing the one poller
+    stream_hub = StreamHub(
+        nse_service,
+        queue_size=app.config['STREAM_QUEUE_SIZE'],
+        max_clients=app.config['STREAM_MAX_CLIENTS']
+    )
+    app.extensions['stream_hub'] = stream_hub
+    subscribers.append(stream_hub.on_snapshot)
+    replace_snapshot_subscribers(nse_service.snapshots, subscribers)
+    
+    # Chart series thinned to a requested point count, memoized per series and resolution
+    app.extensions['downsampler'] = Downsampler(max_entries=app.config['DOWNSAMPLE_CACHE_SIZE'])
+    
+    # Return projections for the calculators; the process pool starts on first use
+    app.extensions['monte_carlo'] = MonteCarloEngine.from_config(app.config)
+    
+    # Pre-warm NSE snapshots off the request path
+    poller = MarketDataPoller.from_config(nse_service, app.config)
+    app.extensions['market_poller'] = poller
+    if app.config['MARKET_POLLER_ENABLED'] and start_background:
+        poller.start()
+    
+    # Request latency/size histograms and scrape-time service gauges, served at /metrics
+    if app.config['METRICS_ENABLED']:
+        register_metrics(app, nse_service, stream_hub)
     
     # Root route
     @app.route('/')
@@ -40,13 +125,62 @@ def create_app(config_name='default'):
     
     @app.errorhandler(500)
     def internal_error(error):
-        logger.error(f"Internal server error: {error}")
+        logger.error("Internal server error: %s", error)
         return jsonify({
             'status': 'error',
             'message': 'Internal server error'
         }), 500
     
     # Log application startup
-    logger.info(f"Finance API started with config: {config_name}")
+    logger.info("Finance API started with config: %s", config_name)
     
     return app
+
+def replace_snapshot_subscribers(snapshots, subscribers):
+    """Subscribe an app's snapshot handlers, unsubscribing the previous app's"""
+    for callback in _snapshot_subscribers:
+        snapshots.unsubscribe(callback)
+    for callback in subscribers:
+        snapshots.subscribe(callback)
+    _snapshot_subscribers[:] = subscribers
+
+def register_metrics(app, nse_service, stream_hub):
+    """Install request timing hooks, service gauges and the /metrics endpoint"""
+    
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('request_started', None)
+        if started is not None:
+            # The URL rule, not the path, keeps label cardinality bounded
+            route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+            metrics.REQUEST_LATENCY.observe(time.perf_counter() - started, route, request.method, str(response.status_code))
+            if not response.is_streamed and response.content_length is not None:
+                metrics.RESPONSE_SIZE.observe(response.content_length, route)
+        return response
+    
+    cache_results = ('hits', 'stale_hits', 'misses', 'coalesced')
+    metrics.registry.callback(
+        'nse_cache_lookups_total', 'NSE response cache lookups by result',
+        lambda: {(result,): value for result, value in nse_service.cache_stats().items() if result in cache_results},
+        labels=('result',), kind='counter'
+    )
+    metrics.registry.callback(
+        'nse_cache_hit_ratio', 'Share of NSE cache lookups served from cache',
+        lambda: nse_service.cache_stats()['hit_ratio']
+    )
+    metrics.registry.callback(
+        'nse_circuit_open', 'Whether the NSE circuit breaker is rejecting requests',
+        lambda: int(nse_service.breaker.stats()['state'] == 'open')
+    )
+    metrics.registry.callback(
+        'stream_clients', 'Open Server-Sent Event streams',
+        lambda: stream_hub.stats()['clients']
+    )
+    
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.registry.render(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,167 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from app.services.calculator import AXES, CALCULATORS, CalculatorError, evaluate
+from app.services.monte_carlo import KINDS, MonteCarloTimeout
+from app.services.schedules import FORMATS, SCHEDULES, parse_plans, stream_schedule
+from app.utils.logger import logger
+
+# Create Blueprint
+calc_bp = Blueprint('calc', __name__, url_prefix='/api/calc')
+
+def calculator_params():
+    """Scenario parameters from a JSON body (POST) or the query string, with comma-separated lists (GET)"""
+    if request.method == 'POST':
+        params = request.get_json(silent=True)
+        if not isinstance(params, dict):
+            raise CalculatorError('Expected a JSON object body')
+        return params
+    return request.args.to_dict()
+
+@calc_bp.route('')
+def list_calculators():
+    """List the available calculators and their inputs"""
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'axes': list(AXES),
+            'modes': ['grid', 'zip'],
+            'maxScenarios': current_app.config['CALC_MAX_SCENARIOS'],
+            'calculators': [{
+                'name': calculator.name,
+                'description': calculator.description,
+                'outputs': list(calculator.outputs),
+                'frequencies': list(calculator.frequencies) if calculator.frequencies else None,
+                'defaultFrequency': calculator.default_frequency
+            } for calculator in CALCULATORS.values()],
+            'schedules': [{
+                'name': schedule.name,
+                'fields': ['plan', *schedule.fields],
+                'frequencies': list(schedule.frequencies),
+                'formats': list(FORMATS)
+            } for schedule in SCHEDULES.values()],
+            'projections': list(KINDS)
+        }
+    })
+
+@calc_bp.route('/<name>', methods=['GET', 'POST'])
+def calculate(name):
+    """
+    Evaluate a calculator over every scenario in one call.
+
+    `amount`, `rate` (% per year) and `years` are each a number, a list or
+    a range; `mode=grid` (default) returns results over their full product,
+    `mode=zip` pairs them element-wise.
+    """
+    calculator = CALCULATORS.get(name)
+    if calculator is None:
+        return jsonify({
+            'status': 'error',
+            'message': f"Unknown calculator: {name}"
+        }), 404
+    
+    try:
+        params = calculator_params()
+        result = evaluate(
+            calculator,
+            params,
+            mode=params.get('mode') or 'grid',
+            max_scenarios=current_app.config['CALC_MAX_SCENARIOS']
+        )
+        return jsonify({
+            'status': 'success',
+            'data': result
+        })
+    except CalculatorError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error("Error in %s calculator endpoint: %s", name, e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@calc_bp.route('/schedule/<name>', methods=['GET', 'POST'])
+def generate_schedule(name):
+    """
+    Stream per-period schedules (emi amortization, sip growth) for a batch of plans.
+
+    Rows are generated and encoded as the client reads them, as NDJSON
+    (default) or CSV (`format=csv`), so memory stays flat however long the
+    tenures or large the batch.
+    """
+    schedule = SCHEDULES.get(name)
+    if schedule is None:
+        return jsonify({
+            'status': 'error',
+            'message': f"Unknown schedule: {name}"
+        }), 404
+    
+    try:
+        params = calculator_params()
+        output = request.args.get('format') or params.get('format') or 'ndjson'
+        if output not in FORMATS:
+            raise CalculatorError(f"'format' must be one of: {', '.join(FORMATS)}")
+        # Everything is validated here; once streaming starts there is no status code left to change
+        plans, frequency, rows = parse_plans(schedule, params, max_rows=current_app.config['CALC_MAX_SCHEDULE_ROWS'])
+    except CalculatorError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    response = Response(stream_schedule(schedule, plans, frequency, output), mimetype=FORMATS[output])
+    response.headers['X-Schedule-Rows'] = str(rows)
+    response.headers['X-Accel-Buffering'] = 'no'
+    if output == 'csv':
+        response.headers['Content-Disposition'] = f'attachment; filename="{name}-schedule.csv"'
+    return response
+
+@calc_bp.route('/monte-carlo/stats')
+def get_monte_carlo_stats():
+    """Get Monte Carlo pool settings and result cache counters"""
+    return jsonify({
+        'status': 'success',
+        'data': current_app.extensions['monte_carlo'].stats()
+    })
+
+@calc_bp.route('/monte-carlo/<kind>', methods=['GET', 'POST'])
+def monte_carlo(kind):
+    """
+    Project a SIP or lumpsum over simulated return paths.
+
+    Takes `amount`, `years`, `expectedReturn` and `volatility` (% per year),
+    `paths`, `seed` and `percentiles`; returns percentile bands (P10/P50/P90
+    by default) of the final corpus. The same parameters always give the
+    same result, served from cache after the first run.
+    """
+    if kind not in KINDS:
+        return jsonify({
+            'status': 'error',
+            'message': f"Unknown projection: {kind}"
+        }), 404
+    
+    try:
+        params = calculator_params()
+        result = current_app.extensions['monte_carlo'].project(kind, params)
+        return jsonify({
+            'status': 'success',
+            'data': result
+        })
+    except CalculatorError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except MonteCarloTimeout as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
+    except Exception as e:
+        logger.error("Error in %s Monte Carlo endpoint: %s", kind, e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
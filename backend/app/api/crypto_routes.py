@@ -0,0 +1,110 @@
+from flask import Blueprint, current_app, jsonify, request
+from app.services.coingecko_service import CoinGeckoService, CryptoRequestError
+from app.services.downsampling import DownsamplingError, parse_resolution
+from app.utils.logger import logger
+
+# Create Blueprint
+crypto_bp = Blueprint('crypto', __name__, url_prefix='/api/crypto')
+
+# Initialize CoinGecko Service
+coingecko_service = CoinGeckoService()
+
+def proxy_response(name, fetch):
+    """Run a service call and wrap its result, with Cache-Control from the endpoint's TTL"""
+    try:
+        result = fetch()
+    except (CryptoRequestError, DownsamplingError) as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        logger.error("Error in crypto %s endpoint: %s", name, e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+    
+    if not result['success']:
+        response = jsonify({
+            'status': 'error',
+            'message': result['error']
+        })
+        response.status_code = result['status_code']
+        if 'retry_after' in result:
+            response.headers['Retry-After'] = str(result['retry_after'])
+        return response
+    
+    body = {
+        'status': 'success',
+        'data': result['data']
+    }
+    if result.get('stale'):
+        body['stale'] = True
+    response = jsonify(body)
+    response.cache_control.public = True
+    response.cache_control.max_age = 0 if result.get('stale') else int(coingecko_service.ttl_for(name))
+    return response
+
+def int_arg(name, default):
+    try:
+        return int(request.args.get(name, default))
+    except ValueError:
+        raise CryptoRequestError(f"{name} must be an integer")
+
+@crypto_bp.route('/coins/markets')
+def get_markets():
+    """Get top coins by market cap (?vs_currency=usd&per_page=10&page=1)"""
+    return proxy_response('markets', lambda: coingecko_service.get_markets(
+        request.args.get('vs_currency', 'usd'),
+        per_page=int_arg('per_page', 10),
+        page=int_arg('page', 1)
+    ))
+
+@crypto_bp.route('/global')
+def get_global():
+    """Get global crypto market data"""
+    return proxy_response('global', coingecko_service.get_global)
+
+@crypto_bp.route('/coins/<coin_id>')
+def get_coin(coin_id):
+    """Get one coin's details and market data"""
+    return proxy_response('coin', lambda: coingecko_service.get_coin(coin_id))
+
+@crypto_bp.route('/coins/<coin_id>/market_chart')
+def get_market_chart(coin_id):
+    """Get a coin's price history (?vs_currency=usd&days=7), downsampled with ?points=N"""
+    vs_currency = request.args.get('vs_currency', 'usd')
+    days = request.args.get('days', '7')
+    interval = request.args.get('interval')
+    
+    def fetch():
+        resolution = parse_resolution(request.args, current_app.config['DOWNSAMPLE_MAX_POINTS'])
+        result = coingecko_service.get_market_chart(coin_id, vs_currency, days=days, interval=interval)
+        if result['success'] and resolution is not None:
+            key = ('market_chart', coin_id.lower(), vs_currency.lower(), days, interval)
+            result['data'] = current_app.extensions['downsampler'].market_chart(key, result['data'], *resolution)
+        return result
+    
+    return proxy_response('market_chart', fetch)
+
+@crypto_bp.route('/search')
+def search():
+    """Search coins (?query=...)"""
+    return proxy_response('search', lambda: coingecko_service.search(request.args.get('query')))
+
+@crypto_bp.route('/search/trending')
+def get_trending():
+    """Get trending coins"""
+    return proxy_response('trending', coingecko_service.get_trending)
+
+@crypto_bp.route('/stats')
+def get_stats():
+    """Get CoinGecko cache counters, circuit breaker, rate limiter and backoff state"""
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'cache': coingecko_service.cache_stats(),
+            'upstream': coingecko_service.upstream_stats()
+        }
+    })
@@ -1,5 +1,11 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify, request
 from app.services.nse_service import NSEService
+from app.services.async_nse_service import AsyncNSEService
+from app.services.tick_store import INTERVALS, PERIODS
+from app.services.downsampling import DownsamplingError, parse_resolution
+from app.config.config import Config
+from app.models.snapshot import body_etag, encode_payload
+from app.utils.json_provider import dumps_bytes
 from app.utils.logger import logger
 
 # Create Blueprint
@@ -7,6 +13,90 @@ api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 # Initialize NSE Service
 nse_service = NSEService()
+async_nse_service = AsyncNSEService(nse_service, max_concurrency=Config.NSE_MAX_CONCURRENCY)
+
+def refresh_interval(name):
+    """Get how often a dataset is refreshed, used as its Cache-Control max-age"""
+    poller = current_app.extensions.get('market_poller')
+    if poller is not None and poller.running:
+        return poller.interval_for(name)
+
+    return nse_service.cache.ttl_for(nse_service.DATASETS[name].endpoint)
+
+def cacheable_response(snapshot, body, etag):
+    """Wrap a pre-encoded body with the snapshot's validators and Cache-Control"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.last_modified = snapshot.last_modified
+    response.cache_control.public = True
+    response.cache_control.max_age = int(refresh_interval(snapshot.name))
+    response.headers['X-Snapshot-Version'] = str(snapshot.version)
+    if snapshot.restored or snapshot.stale:
+        # Last-known data from before a restart or an NSE outage; clients should not cache it
+        response.cache_control.max_age = 0
+        response.headers['X-Snapshot-Stale'] = 'true'
+    return response
+
+def requested_since():
+    """The `?since=<version>` a client already holds, or None"""
+    try:
+        return int(request.args['since'])
+    except (KeyError, ValueError):
+        return None
+
+def delta_response(snapshot, since):
+    """Build a response with only the rows changed since a version, or None if it is not retained"""
+    if nse_service.DATASETS[snapshot.name].key is None:
+        return None
+    # Checked first so only retained versions are ever memoized on the snapshot
+    if since != snapshot.version and nse_service.snapshots.at_version(snapshot.name, since) is None:
+        return None
+
+    def encode(payload):
+        delta = nse_service.get_delta(snapshot, since)
+        if delta is None:
+            return None
+        body = dumps_bytes({'status': 'success', 'format': 'delta', 'data': delta})
+        return body, body_etag(body)
+
+    encoded = snapshot.derive(('delta', since), encode)
+    if encoded is None:
+        return None
+    return cacheable_response(snapshot, *encoded)
+
+def snapshot_response(snapshot):
+    """Build a cacheable JSON response from a snapshot's pre-encoded body"""
+    since = requested_since()
+    if since is not None:
+        # Clients behind the retained history get the full payload instead
+        response = delta_response(snapshot, since)
+        if response is not None:
+            return response
+
+    if request.args.get('format') == 'columnar':
+        return cacheable_response(snapshot, snapshot.columnar_body, snapshot.columnar_etag)
+    return cacheable_response(snapshot, snapshot.body, snapshot.etag)
+
+def derived_response(snapshot, key, build):
+    """Build a cacheable JSON response for a view of a snapshot, encoded once per snapshot"""
+    columnar = request.args.get('format') == 'columnar'
+
+    def encode(payload):
+        body = encode_payload(build(payload), columnar=columnar)
+        return body, body_etag(body)
+
+    body, etag = snapshot.derive((key, columnar), encode)
+    return cacheable_response(snapshot, body, etag)
+
+@api_bp.after_request
+def add_conditional_headers(response):
+    """Give successful GETs a content-hash ETag and answer matching validators with 304"""
+    if request.method != 'GET' or response.status_code != 200 or response.is_streamed:
+        return response
+
+    if response.get_etag()[0] is None:
+        response.add_etag()
+    return response.make_conditional(request)
 
 @api_bp.route('/hello')
 def api_hello():
@@ -33,23 +123,109 @@ def get_nifty50_symbols():
     """Get list of Nifty 50 stock symbols"""
     try:
         logger.info("Fetching Nifty50 symbols")
-        result = nse_service.get_nifty50_symbols()
+        result = nse_service.get_snapshot('nifty50_symbols')
         
         if result['success']:
+            return snapshot_response(result['snapshot'])
+        else:
             return jsonify({
-                'status': 'success',
-                'data': {
-                    'symbols': result['symbols'],
-                    'count': result['count']
-                }
-            })
+                'status': 'error',
+                'message': result['error']
+            }), 503
+    except Exception as e:
+        logger.error("Error in Nifty50 symbols endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api_bp.route('/nifty50/stocks')
+def get_nifty50_stocks():
+    """Get quotes for every Nifty 50 constituent (optionally ?sector=...)"""
+    try:
+        sector = request.args.get('sector')
+        logger.info("Fetching Nifty50 stocks (sector: %s)", sector or 'all')
+        result = nse_service.get_quote_index()
+        
+        if not result['success']:
+            return jsonify({
+                'status': 'error',
+                'message': result['error']
+            }), 503
+        
+        quotes = result['quotes']
+        if sector is None:
+            stocks = quotes.stocks
+        else:
+            stocks = quotes.sector_stocks(sector)
+            if stocks is None:
+                return jsonify({
+                    'status': 'error',
+                    'message': f"Unknown sector: {sector}"
+                }), 404
+        
+        return derived_response(result['snapshot'], ('stocks', sector), lambda payload: {
+            'stocks': stocks,
+            'index': quotes.index_quote,
+            'count': len(stocks),
+            'timestamp': quotes.timestamp
+        })
+    except Exception as e:
+        logger.error("Error in Nifty50 stocks endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api_bp.route('/nifty50/stock/<symbol>')
+def get_nifty50_stock(symbol):
+    """Get the latest quote for one Nifty 50 stock"""
+    try:
+        symbol = symbol.upper()
+        logger.info("Fetching Nifty50 stock %s", symbol)
+        result = nse_service.get_quote_index()
+        
+        if not result['success']:
+            return jsonify({
+                'status': 'error',
+                'message': result['error']
+            }), 503
+        
+        quotes = result['quotes']
+        if symbol not in quotes:
+            return jsonify({
+                'status': 'error',
+                'message': f"{symbol} is not a Nifty 50 constituent"
+            }), 404
+        
+        return derived_response(result['snapshot'], ('stock', symbol), lambda payload: {
+            'quote': quotes.quote(symbol),
+            'timestamp': quotes.timestamp
+        })
+    except Exception as e:
+        logger.error("Error in Nifty50 stock endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api_bp.route('/nifty50/market-overview')
+def get_market_overview():
+    """Get Nifty 50 breadth, leaders and sector performance"""
+    try:
+        logger.info("Fetching Nifty50 market overview")
+        result = nse_service.get_quote_index()
+        
+        if result['success']:
+            quotes = result['quotes']
+            return derived_response(result['snapshot'], 'overview', lambda payload: quotes.overview())
         else:
             return jsonify({
                 'status': 'error',
                 'message': result['error']
             }), 503
     except Exception as e:
-        logger.error(f"Error in Nifty50 symbols endpoint: {str(e)}")
+        logger.error("Error in market overview endpoint: %s", e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -60,23 +236,17 @@ def get_all_indices():
     """Get all indices from NSE API"""
     try:
         logger.info("Fetching all indices")
-        result = nse_service.get_all_indices()
+        result = nse_service.get_snapshot('indices')
         
         if result['success']:
-            return jsonify({
-                'status': 'success',
-                'data': {
-                    'indices': result['indices'],
-                    'count': result['count']
-                }
-            })
+            return snapshot_response(result['snapshot'])
         else:
             return jsonify({
                 'status': 'error',
                 'message': result['error']
             }), 503
     except Exception as e:
-        logger.error(f"Error in all indices endpoint: {str(e)}")
+        logger.error("Error in all indices endpoint: %s", e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -87,25 +257,17 @@ def get_52week_high_stocks():
     """Get 52-week high stocks from NSE API"""
     try:
         logger.info("Fetching 52-week high stocks")
-        result = nse_service.get_52week_high_stocks()
+        result = nse_service.get_snapshot('52week_high')
         
         if result['success']:
-            return jsonify({
-                'status': 'success',
-                'data': {
-                    'highStocks': result['highStocks'],
-                    'count': result['count'],
-                    'totalHigh': result['totalHigh'],
-                    'timestamp': result['timestamp']
-                }
-            })
+            return snapshot_response(result['snapshot'])
         else:
             return jsonify({
                 'status': 'error',
                 'message': result['error']
             }), 503
     except Exception as e:
-        logger.error(f"Error in 52-week high stocks endpoint: {str(e)}")
+        logger.error("Error in 52-week high stocks endpoint: %s", e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -116,16 +278,165 @@ def get_52week_low_stocks():
     """Get 52-week low stocks from NSE API"""
     try:
         logger.info("Fetching 52-week low stocks")
-        result = nse_service.get_52week_low_stocks()
+        result = nse_service.get_snapshot('52week_low')
+        
+        if result['success']:
+            return snapshot_response(result['snapshot'])
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': result['error']
+            }), 503
+    except Exception as e:
+        logger.error("Error in 52-week low stocks endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+# Schema-driven live datasets: URL slug -> dataset name
+LIVE_DATASETS = {
+    'gainers': 'gainers',
+    'losers': 'losers',
+    'most-active': 'most_active'
+}
+
+@api_bp.route('/live/<slug>')
+def get_live_dataset(slug):
+    """Get a live market dataset (gainers, losers, most-active) from NSE API"""
+    if slug not in LIVE_DATASETS:
+        return jsonify({
+            'status': 'error',
+            'message': 'Endpoint not found'
+        }), 404
+    
+    try:
+        logger.info("Fetching live dataset %s", slug)
+        result = nse_service.get_snapshot(LIVE_DATASETS[slug])
+        
+        if result['success']:
+            return snapshot_response(result['snapshot'])
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': result['error']
+            }), 503
+    except Exception as e:
+        logger.error("Error in live %s endpoint: %s", slug, e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+def history_response(symbol):
+    """Build an OHLC history response for a symbol from the tick store, downsampled with ?points=N"""
+    period = request.args.get('period', '1d')
+    interval = request.args.get('interval', '5m')
+    
+    if period not in PERIODS or interval not in INTERVALS:
+        return jsonify({
+            'status': 'error',
+            'message': f"period must be one of {', '.join(PERIODS)} and interval one of {', '.join(INTERVALS)}"
+        }), 400
+    
+    try:
+        resolution = parse_resolution(request.args, current_app.config['DOWNSAMPLE_MAX_POINTS'])
+    except DownsamplingError as e:
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 400
+    
+    bars = current_app.extensions['tick_store'].history(symbol, period=period, interval=interval)
+    source_count = len(bars)
+    if resolution is not None:
+        bars = current_app.extensions['downsampler'].bars((symbol, period, interval), bars, *resolution)
+    
+    return jsonify({
+        'status': 'success',
+        'data': {
+            'symbol': symbol,
+            'period': period,
+            'interval': interval,
+            'bars': bars,
+            'count': len(bars),
+            'sourceCount': source_count
+        }
+    })
+
+@api_bp.route('/nifty50/stock/<symbol>/history')
+def get_stock_history(symbol):
+    """Get intraday OHLC history for a Nifty 50 stock"""
+    try:
+        logger.info("Fetching history for %s", symbol)
+        return history_response(symbol.upper())
+    except Exception as e:
+        logger.error("Error in stock history endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api_bp.route('/indices/<path:symbol>/history')
+def get_index_history(symbol):
+    """Get intraday OHLC history for an index"""
+    try:
+        logger.info("Fetching history for index %s", symbol)
+        return history_response(symbol)
+    except Exception as e:
+        logger.error("Error in index history endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api_bp.route('/indicators/<symbol>')
+def get_indicators(symbol):
+    """Get SMA/EMA/RSI/MACD/Bollinger/volatility indicators for a Nifty 50 stock"""
+    try:
+        logger.info("Fetching indicators for %s", symbol)
+        result = current_app.extensions['indicator_service'].get_indicators(symbol.upper())
+        
+        if result['success']:
+            return jsonify({
+                'status': 'success',
+                'data': {
+                    'symbol': result['symbol'],
+                    'interval': result['interval'],
+                    'bars': result['bars'],
+                    'indicators': result['indicators']
+                }
+            })
+        else:
+            return jsonify({
+                'status': 'error',
+                'message': result['error']
+            }), 404 if result.get('not_found') else 503
+    except Exception as e:
+        logger.error("Error in indicators endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api_bp.route('/indicators')
+def get_indicators_batch():
+    """Get indicators for many Nifty 50 stocks (?symbols=A,B; all by default)"""
+    try:
+        symbols = [symbol.strip().upper() for symbol in request.args.get('symbols', '').split(',') if symbol.strip()]
+        logger.info("Fetching indicators for %s symbols", len(symbols) or 'all')
+        result = current_app.extensions['indicator_service'].get_batch(
+            symbols or None,
+            columnar=request.args.get('format') == 'columnar'
+        )
         
         if result['success']:
             return jsonify({
                 'status': 'success',
                 'data': {
-                    'lowStocks': result['lowStocks'],
-                    'count': result['count'],
-                    'totalLow': result['totalLow'],
-                    'timestamp': result['timestamp']
+                    'interval': result['interval'],
+                    'indicators': result['indicators'],
+                    'count': result['count']
                 }
             })
         else:
@@ -134,8 +445,119 @@ def get_52week_low_stocks():
                 'message': result['error']
             }), 503
     except Exception as e:
-        logger.error(f"Error in 52-week low stocks endpoint: {str(e)}")
+        logger.error("Error in batch indicators endpoint: %s", e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@api_bp.route('/market/snapshot')
+def get_market_snapshot():
+    """Get indices, Nifty 50 symbols and 52-week high/low stocks in one response"""
+    try:
+        logger.info("Fetching market snapshot")
+        results = async_nse_service.run(async_nse_service.get_market_snapshot())
+        
+        data = {}
+        errors = {}
+        for name, result in results.items():
+            if result['success']:
+                data[name] = result['snapshot'].payload
+            else:
+                errors[name] = result['error']
+        
+        if not data:
+            return jsonify({
+                'status': 'error',
+                'message': 'All market data sources are unavailable',
+                'errors': errors
+            }), 503
+        
+        response = {
+            'status': 'success',
+            'data': data
+        }
+        if errors:
+            response['errors'] = errors
+        return jsonify(response)
+    except Exception as e:
+        logger.error("Error in market snapshot endpoint: %s", e)
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
+
+@api_bp.route('/stream/<name>')
+def stream_dataset(name):
+    """Stream a live dataset (indices, nifty50) as Server-Sent Events: a full snapshot, then row diffs"""
+    hub = current_app.extensions['stream_hub']
+    if name not in hub.datasets:
+        return jsonify({
+            'status': 'error',
+            'message': 'Endpoint not found'
+        }), 404
+    
+    client = hub.connect(name)
+    if client is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Too many open streams'
+        }), 503
+    
+    try:
+        # Registered before reading the snapshot, so no diff published in between is missed
+        snapshot = hub.current(name)
+    except Exception as e:
+        hub.disconnect(client)
+        logger.error("Error starting %s stream: %s", name, e)
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 503
+    
+    # Reconnecting EventSource clients send the last version they saw
+    try:
+        last_event_id = int(request.headers['Last-Event-ID'])
+    except (KeyError, ValueError):
+        last_event_id = None
+    initial = hub.initial_event(snapshot, last_event_id)
+    heartbeat = current_app.config['STREAM_HEARTBEAT_INTERVAL']
+    
+    def events():
+        try:
+            yield b'retry: 5000\n' + initial
+            while True:
+                event = client.next_event(heartbeat)
+                # Comment lines keep idle connections (and proxies) alive
+                yield event if event is not None else b': keepalive\n\n'
+        finally:
+            hub.disconnect(client)
+    
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_bp.route('/stream/stats')
+def get_stream_stats():
+    """Get live stream client and backpressure statistics"""
+    return jsonify({
+        'status': 'success',
+        'data': current_app.extensions['stream_hub'].stats()
+    })
+
+@api_bp.route('/cache/stats')
+def get_cache_stats():
+    """Get NSE response cache statistics"""
+    return jsonify({
+        'status': 'success',
+        'data': nse_service.cache_stats()
+    })
+
+@api_bp.route('/upstream/stats')
+def get_upstream_stats():
+    """Get NSE circuit breaker and rate limiter status"""
+    return jsonify({
+        'status': 'success',
+        'data': nse_service.upstream_stats()
+    })
@@ -1,4 +1,6 @@
+import multiprocessing
 import os
+import tempfile
 from datetime import datetime
 
 class Config:
@@ -13,8 +15,156 @@ class Config:
     API_DESCRIPTION = 'NSE India Financial Data API'
     
     # NSE API Configuration
-    NSE_BASE_URL = 'https://www.nseindia.com/api'
+    NSE_BASE_URL = os.environ.get('NSE_BASE_URL', 'https://www.nseindia.com/api')
+    NSE_HOME_URL = os.environ.get('NSE_HOME_URL', 'https://www.nseindia.com')
     NSE_TIMEOUT = 30
+    NSE_POOL_SIZE = 10
+    NSE_RATE_LIMIT = 10  # requests per second
+    NSE_RATE_BURST = 5
+    # 'file' shares one bucket across all worker processes on the host
+    NSE_RATE_LIMIT_BACKEND = os.environ.get('NSE_RATE_LIMIT_BACKEND', 'file')
+    NSE_RATE_LIMIT_FILE = os.path.join(tempfile.gettempdir(), 'finance_api_nse_ratelimit')
+    NSE_BREAKER_FAILURE_THRESHOLD = 5
+    NSE_BREAKER_RESET_TIMEOUT = 30
+    NSE_MAX_CONCURRENCY = 4
+    
+    # NSE Response Cache Configuration (seconds)
+    NSE_CACHE_DEFAULT_TTL = 30
+    NSE_CACHE_STALE_TTL = 300
+    NSE_REFRESH_COALESCE_WINDOW = 2
+    # How long a snapshot rebuilt from an expired response (NSE unreachable) is served before retrying
+    NSE_STALE_SNAPSHOT_TTL = 10
+    NSE_CACHE_TTLS = {
+        'allIndices': 15,
+        'equity-stockIndices?index=NIFTY%2050': 15,
+        'live-analysis-data-52weekhighstock': 60,
+        'live-analysis-data-52weeklowstock': 60,
+        'live-analysis-variations?index=gainers': 30,
+        'live-analysis-variations?index=loosers': 30,
+        'live-analysis-most-active-securities?index=volume': 30
+    }
+    
+    # CoinGecko Proxy Configuration
+    COINGECKO_BASE_URL = os.environ.get('COINGECKO_BASE_URL', 'https://api.coingecko.com/api/v3')
+    COINGECKO_API_KEY = os.environ.get('COINGECKO_API_KEY', '')
+    COINGECKO_TIMEOUT = 15
+    COINGECKO_POOL_SIZE = 10
+    # The public API allows roughly 30 calls a minute; shared across workers like the NSE limit
+    COINGECKO_RATE_LIMIT = float(os.environ.get('COINGECKO_RATE_LIMIT', 0.5))  # requests per second
+    COINGECKO_RATE_BURST = 5
+    COINGECKO_RATE_LIMIT_BACKEND = os.environ.get('COINGECKO_RATE_LIMIT_BACKEND', 'file')
+    COINGECKO_RATE_LIMIT_FILE = os.path.join(tempfile.gettempdir(), 'finance_api_coingecko_ratelimit')
+    # Longest a request thread waits for a rate-limit token before answering from cache or with a 503
+    COINGECKO_RATE_LIMIT_MAX_WAIT = 2
+    COINGECKO_BREAKER_FAILURE_THRESHOLD = 5
+    COINGECKO_BREAKER_RESET_TIMEOUT = 30
+    # After a 429 without Retry-After, back off this long, doubling per consecutive 429
+    COINGECKO_BACKOFF_BASE = 5
+    COINGECKO_BACKOFF_MAX = 300
+    COINGECKO_MARKETS_PAGE_SIZE = 250
+    
+    # CoinGecko Response Cache Configuration (seconds, per endpoint)
+    COINGECKO_CACHE_STALE_TTL = 600
+    COINGECKO_CACHE_MAX_ENTRIES = 1000
+    COINGECKO_CACHE_TTLS = {
+        'markets': 60,
+        'global': 120,
+        'coin': 120,
+        'market_chart': 300,
+        'search': 3600,
+        'trending': 300
+    }
+    
+    # Chart downsampling (?points=N on history and market chart endpoints)
+    DOWNSAMPLE_MAX_POINTS = 5000
+    DOWNSAMPLE_CACHE_SIZE = 512
+    
+    # Market Data Poller Configuration (intervals in seconds)
+    MARKET_POLLER_ENABLED = True
+    MARKET_UTC_OFFSET_MINUTES = 330  # IST
+    MARKET_OPEN_TIME = '09:00'
+    MARKET_CLOSE_TIME = '15:45'
+    MARKET_HOURS_POLL_INTERVALS = {
+        'indices': 15,
+        'nifty50_symbols': 15,
+        'nifty50': 15,
+        '52week_high': 60,
+        '52week_low': 60,
+        'gainers': 30,
+        'losers': 30,
+        'most_active': 30
+    }
+    OFF_HOURS_POLL_INTERVALS = {
+        'indices': 300,
+        'nifty50_symbols': 900,
+        'nifty50': 900,
+        '52week_high': 900,
+        '52week_low': 900,
+        'gainers': 900,
+        'losers': 900,
+        'most_active': 900
+    }
+    POLLER_RETRY_INTERVAL = 10
+    
+    # Versions of each dataset kept for ?since= deltas
+    SNAPSHOT_HISTORY_SIZE = 32
+    # Share snapshots between server workers through memory-mapped files written by one poller process
+    SHARED_SNAPSHOTS_ENABLED = False
+    SHARED_SNAPSHOT_DIR = os.environ.get('SHARED_SNAPSHOT_DIR') or None  # default: /dev/shm/finance_api_snapshots-<uid>
+    # Persist the latest snapshots to disk and serve them, flagged stale, after a restart
+    SNAPSHOT_ARCHIVE_ENABLED = True
+    SNAPSHOT_ARCHIVE_DIR = os.environ.get('SNAPSHOT_ARCHIVE_DIR', 'data/snapshots')
+    
+    # Intraday Tick Store Configuration
+    TICK_STORE_ENABLED = True
+    TICK_STORE_PATH = os.environ.get('TICK_STORE_PATH', 'data/ticks.db')
+    TICK_RETENTION_DAYS = 7
+    INDICATOR_INTERVAL = '5m'
+    
+    # Prometheus metrics at /metrics
+    METRICS_ENABLED = True
+    
+    # Financial calculators (/api/calc): most scenarios evaluated in one request
+    CALC_MAX_SCENARIOS = int(os.environ.get('CALC_MAX_SCENARIOS', 200000))
+    # Streamed schedules hold one chunk in memory at a time; this only bounds CPU per request
+    CALC_MAX_SCHEDULE_ROWS = int(os.environ.get('CALC_MAX_SCHEDULE_ROWS', 10000000))
+    
+    # Production Server (gunicorn) Configuration
+    SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:5000')
+    SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS') or 0) or multiprocessing.cpu_count() * 2 + 1
+    # Threads per worker; each open SSE stream holds one (see STREAM_MAX_CLIENTS)
+    SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 16))
+    SERVER_WORKER_CLASS = 'gthread'
+    # Import the app once in the master so workers share it copy-on-write
+    SERVER_PRELOAD = os.environ.get('SERVER_PRELOAD', '1') != '0'
+    # Fetch every dataset once in the master before forking, so workers start warm
+    SERVER_PRIME_SNAPSHOTS = True
+    SERVER_TIMEOUT = 30
+    SERVER_GRACEFUL_TIMEOUT = 30
+    SERVER_KEEPALIVE = 5
+    SERVER_BACKLOG = 2048
+    # Recycle workers after this many requests (jittered so they don't restart together)
+    SERVER_MAX_REQUESTS = 10000
+    SERVER_MAX_REQUESTS_JITTER = 1000
+    
+    # Live Stream (Server-Sent Events) Configuration
+    STREAM_QUEUE_SIZE = 32
+    # Open streams per process: each holds one of SERVER_THREADS for its whole life, so by default half
+    # the threads are left for ordinary requests, and at least one always is
+    STREAM_MAX_CLIENTS = min(int(os.environ.get('STREAM_MAX_CLIENTS') or 0) or SERVER_THREADS // 2, SERVER_THREADS - 1)
+    STREAM_HEARTBEAT_INTERVAL = 15
+    
+    # Monte Carlo projections (/api/calc/monte-carlo): a single-process server pools every CPU, while each
+    # gunicorn worker starts its own pool of its share of them (rounded up, and at least two so projections
+    # still run in parallel with more workers than CPUs); MONTE_CARLO_PROCESSES sets both
+    MONTE_CARLO_PROCESSES = int(os.environ.get('MONTE_CARLO_PROCESSES') or 0) or multiprocessing.cpu_count()
+    MONTE_CARLO_WORKER_PROCESSES = int(os.environ.get('MONTE_CARLO_PROCESSES') or 0) or \
+        max(2, -(-multiprocessing.cpu_count() // SERVER_WORKERS))
+    MONTE_CARLO_CHUNK_PATHS = 50000
+    MONTE_CARLO_MAX_PATHS = int(os.environ.get('MONTE_CARLO_MAX_PATHS', 1000000))
+    MONTE_CARLO_TIMEOUT = int(os.environ.get('MONTE_CARLO_TIMEOUT', 30))  # seconds
+    MONTE_CARLO_CACHE_TTL = 3600
+    MONTE_CARLO_CACHE_SIZE = 256
     
     # CORS Configuration
     CORS_ORIGINS = [
@@ -25,25 +175,37 @@ class Config:
     ]
     
     # Logging Configuration
-    LOG_LEVEL = 'INFO'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    LOG_FILE = 'logs/app.log'
+    LOG_FILE = os.environ.get('LOG_FILE', 'logs/app.log')
+    LOG_ROTATION = os.environ.get('LOG_ROTATION', 'size')  # 'size' or 'time'
+    LOG_MAX_BYTES = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT = 5
+    LOG_ROTATE_WHEN = 'midnight'
 
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
-    LOG_LEVEL = 'DEBUG'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'DEBUG')
 
 class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
-    LOG_LEVEL = 'WARNING'
+    SHARED_SNAPSHOTS_ENABLED = os.environ.get('SHARED_SNAPSHOTS_ENABLED', '1') != '0'
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING')
 
 class TestingConfig(Config):
     """Testing configuration"""
     TESTING = True
     DEBUG = True
     LOG_LEVEL = 'DEBUG'
+    LOG_FILE = None
+    MARKET_POLLER_ENABLED = False
+    TICK_STORE_ENABLED = False
+    TICK_STORE_PATH = ':memory:'
+    SNAPSHOT_ARCHIVE_ENABLED = False
+    MONTE_CARLO_PROCESSES = 1
+    MONTE_CARLO_WORKER_PROCESSES = 1
 
 # Configuration dictionary
 config = {
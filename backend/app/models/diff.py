@@ -0,0 +1,34 @@
+def keyed_rows(table, key):
+    """Map each record's key to its tuple of values"""
+    return dict(zip(table.column(key), zip(*table.columns)))
+
+def diff_tables(previous, current, key='symbol'):
+    """
+    Keyed diff between two record tables.
+
+    Returns the rows of `current` that are new or whose values differ (as
+    dicts) and the keys that are gone. Rows are compared as value tuples, so
+    only changed rows are ever materialized.
+    """
+    old = keyed_rows(previous, key)
+    new = keyed_rows(current, key)
+    fields = current.fields
+
+    added = []
+    changed = []
+    for row_key, values in new.items():
+        before = old.get(row_key)
+        if before is None:
+            added.append(dict(zip(fields, values)))
+        elif before != values:
+            changed.append(dict(zip(fields, values)))
+
+    return {
+        'added': added,
+        'changed': changed,
+        'removed': [row_key for row_key in old if row_key not in new]
+    }
+
+def is_empty(diff):
+    """Whether a diff carries no changes"""
+    return not (diff['added'] or diff['changed'] or diff['removed'])
@@ -0,0 +1,112 @@
+# The `equity-stockIndices` payload lists the index itself alongside its constituents
+NIFTY50_INDEX_SYMBOL = 'NIFTY 50'
+
+UNCLASSIFIED_SECTOR = 'Unclassified'
+
+def _breadth(changes):
+    """Advance/decline counts for a sequence of price changes"""
+    advances = sum(1 for change in changes if change > 0)
+    declines = sum(1 for change in changes if change < 0)
+    return {
+        'advances': advances,
+        'declines': declines,
+        'unchanged': len(changes) - advances - declines,
+        'advanceDeclineRatio': round(advances / declines, 2) if declines else None
+    }
+
+class QuoteIndex:
+    """
+    Per-symbol index over one Nifty 50 `equity-stockIndices` snapshot.
+
+    Built once per published `nifty50` snapshot: quotes are keyed by
+    symbol (a position into the snapshot's record table), constituents are
+    grouped by sector, and market breadth and leaders are aggregated up
+    front, so every read is a lookup rather than a scan or upstream call.
+    """
+
+    __slots__ = ('table', 'positions', 'index_quote', 'stocks', 'sectors', 'breadth', 'timestamp')
+
+    TOP_N = 5
+
+    def __init__(self, table, timestamp='', index_symbol=NIFTY50_INDEX_SYMBOL):
+        self.table = table
+        self.timestamp = timestamp
+        self.positions = {}
+        self.index_quote = None
+
+        for i, symbol in enumerate(table.column('symbol')):
+            if symbol == index_symbol:
+                self.index_quote = table[i]
+            else:
+                self.positions[symbol] = i
+
+        positions = list(self.positions.values())
+        self.stocks = table.take(positions)
+
+        changes = table.column('change')
+        self.breadth = _breadth([changes[i] for i in positions])
+
+        industries = table.column('industry')
+        groups = {}
+        for symbol, i in self.positions.items():
+            groups.setdefault(industries[i] or UNCLASSIFIED_SECTOR, []).append(i)
+        self.sectors = {name: self._sector(name, members) for name, members in groups.items()}
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Build the index from a `nifty50` snapshot payload"""
+        return cls(payload['stocks'], timestamp=payload.get('timestamp', ''))
+
+    def _sector(self, name, members):
+        """Aggregate one sector's constituents (table positions)"""
+        symbols = self.table.column('symbol')
+        pchanges = self.table.column('pChange')
+        changes = self.table.column('change')
+        traded = self.table.column('totalTradedValue')
+        members = sorted(members, key=lambda i: pchanges[i], reverse=True)
+
+        return {
+            'sector': name,
+            'symbols': [symbols[i] for i in members],
+            'count': len(members),
+            'avgPChange': round(sum(pchanges[i] for i in members) / len(members), 2),
+            'totalTradedValue': sum(traded[i] for i in members),
+            **_breadth([changes[i] for i in members])
+        }
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, symbol):
+        return symbol in self.positions
+
+    def quote(self, symbol):
+        """The latest quote for one constituent as a dict, or None"""
+        i = self.positions.get(symbol)
+        return self.table[i] if i is not None else None
+
+    def sector_stocks(self, sector):
+        """Constituents of one sector as a record table, or None for an unknown sector"""
+        group = self.sectors.get(sector)
+        if group is None:
+            return None
+        return self.table.take([self.positions[symbol] for symbol in group['symbols']])
+
+    def _leaders(self, column, reverse):
+        """The TOP_N constituent quotes ordered by one numeric column"""
+        values = self.table.column(column)
+        ranked = sorted(self.positions.values(), key=lambda i: values[i], reverse=reverse)
+        return [self.table[i] for i in ranked[:self.TOP_N]]
+
+    def overview(self):
+        """Market-overview payload: index level, breadth, leaders and sectors"""
+        return {
+            'index': self.index_quote,
+            'breadth': self.breadth,
+            'topGainers': self._leaders('pChange', reverse=True),
+            'topLosers': self._leaders('pChange', reverse=False),
+            'mostActive': self._leaders('totalTradedValue', reverse=True),
+            'sectors': sorted(self.sectors.values(), key=lambda group: group['avgPChange'], reverse=True),
+            'count': len(self.positions),
+            'timestamp': self.timestamp
+        }
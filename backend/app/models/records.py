@@ -0,0 +1,118 @@
+from array import array
+from collections import namedtuple
+
+# One output column: output name, source key (or tuple path into nested objects) in the NSE row,
+# type (float or str), default
+Field = namedtuple('Field', ['name', 'source', 'type', 'default'])
+
+def resolve_path(data, path, default=None):
+    """Follow a tuple of keys into nested NSE JSON, returning `default` if any is missing"""
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return default
+        data = data[key]
+    return data
+
+def field_value(row, field):
+    """Read one field's raw value from an NSE row"""
+    if isinstance(field.source, tuple):
+        return resolve_path(row, field.source, field.default)
+    return row.get(field.source, field.default)
+
+def to_float(value, default=0.0):
+    """Parse an NSE numeric value (number, '1,234.50', '-', None) as a float"""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(',', ''))
+    except ValueError:
+        return default
+
+def to_str(value, default=''):
+    """Coerce an NSE value to a string"""
+    if value is None:
+        return default
+    return value if isinstance(value, str) else str(value)
+
+def coerce_column(field, values):
+    """Convert one column of raw values to the field's type"""
+    default = field.default
+
+    if field.type is float:
+        try:
+            # Fast path: NSE already sent numbers
+            return array('d', values)
+        except TypeError:
+            return array('d', [to_float(value, default) for value in values])
+
+    if all(type(value) is str for value in values):
+        return values
+    return [to_str(value, default) for value in values]
+
+class RecordTable:
+    """
+    Immutable, column-oriented table of records.
+
+    Field names are stored once. Numeric columns are packed `array('d')`
+    buffers parsed from NSE's values exactly once when the table is built,
+    so a snapshot keeps far fewer objects alive than one dict per row.
+    Iterating or indexing yields plain row dicts for callers that want the
+    row-oriented view.
+    """
+
+    __slots__ = ('fields', 'columns', '_length')
+
+    def __init__(self, fields, columns):
+        self.fields = tuple(fields)
+        self.columns = tuple(columns)
+        self._length = len(self.columns[0]) if self.columns else 0
+
+    @classmethod
+    def from_rows(cls, fields, rows):
+        """Build a table from NSE row dicts, one column at a time"""
+        columns = [
+            coerce_column(field, [field_value(row, field) for row in rows])
+            for field in fields
+        ]
+        return cls([field.name for field in fields], columns)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        fields = self.fields
+        for values in zip(*self.columns):
+            yield dict(zip(fields, values))
+
+    def __getitem__(self, index):
+        return dict(zip(self.fields, (column[index] for column in self.columns)))
+
+    def column(self, name):
+        """Get one column by field name"""
+        return self.columns[self.fields.index(name)]
+
+    def take(self, positions):
+        """A new table holding only the records at `positions`, in that order"""
+        columns = [
+            array('d', [column[i] for i in positions]) if isinstance(column, array) else [column[i] for i in positions]
+            for column in self.columns
+        ]
+        return RecordTable(self.fields, columns)
+
+    def to_rows(self):
+        """Row-oriented view: a list with one dict per record"""
+        return list(self)
+
+    def to_columnar(self):
+        """Column-oriented view: field names appear once"""
+        return {
+            'fields': list(self.fields),
+            'columns': [list(column) for column in self.columns],
+            'length': self._length
+        }
+
+    def __json__(self):
+        """Default JSON form, used by the app's JSON provider"""
+        return self.to_rows()
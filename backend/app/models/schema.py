@@ -0,0 +1,89 @@
+from operator import itemgetter
+from app.models.records import RecordTable, coerce_column, field_value, resolve_path
+
+class EndpointSchema:
+    """
+    Declarative description of one NSE dataset.
+
+    `rows_path` locates the list of records in the raw response, `fields`
+    maps each record into output columns, `key` names the field that
+    identifies a record between snapshots (for deltas), and `extras` copies top-level
+    values (output name -> (path, default)) into the payload. The payload is
+    `{rows_key: RecordTable, 'count': n, **extras}`; with `as_list=True` the
+    single field's values are emitted as a plain list instead of a table.
+
+    The row mapper is specialized for the schema on first use: when every
+    record carries every source key, all fields are pulled from each row in
+    one C-level `itemgetter` call and transposed with `zip`, falling back to
+    per-field `.get` lookups (with defaults) only when a key is missing.
+    Fields whose source is a tuple path (e.g. `('meta', 'industry')`) are
+    resolved into nested objects row by row.
+    """
+
+    __slots__ = ('name', 'endpoint', 'rows_key', 'fields', 'rows_path', 'key', 'extras', 'as_list', '_mapper')
+
+    def __init__(self, name, endpoint, rows_key, fields, rows_path=('data',), key=None, extras=None, as_list=False):
+        self.name = name
+        self.endpoint = endpoint
+        self.rows_key = rows_key
+        self.fields = tuple(fields)
+        self.rows_path = tuple(rows_path)
+        self.key = key
+        self.extras = dict(extras or {})
+        self.as_list = as_list
+        self._mapper = None
+
+    @property
+    def mapper(self):
+        """The compiled row mapper for this schema"""
+        if self._mapper is None:
+            self._mapper = self._compile()
+        return self._mapper
+
+    def _compile(self):
+        """Build a mapping function specialized to this schema's fields"""
+        fields = self.fields
+        names = [field.name for field in fields]
+        # Top-level keys go through one itemgetter; nested paths are resolved per row
+        flat = [field for field in fields if not isinstance(field.source, tuple)]
+        nested = [field for field in fields if isinstance(field.source, tuple)]
+        getter = itemgetter(*[field.source for field in flat]) if flat else None
+        single = len(flat) == 1
+
+        def map_rows(rows):
+            if not rows:
+                return RecordTable(names, [[] for _ in fields])
+
+            try:
+                if not flat:
+                    raw_columns = []
+                elif single:
+                    raw_columns = [list(map(getter, rows))]
+                else:
+                    raw_columns = list(zip(*map(getter, rows)))
+            except (KeyError, TypeError):
+                raw_columns = [[field_value(row, field) for row in rows] for field in flat]
+
+            columns = dict(zip((field.name for field in flat), raw_columns))
+            for field in nested:
+                columns[field.name] = [field_value(row, field) for row in rows]
+
+            return RecordTable(names, [coerce_column(field, columns[field.name]) for field in fields])
+
+        return map_rows
+
+    def transform(self, data):
+        """Map a raw NSE response into this dataset's payload"""
+        rows = resolve_path(data, self.rows_path)
+        if not isinstance(rows, list):
+            rows = []
+
+        table = self.mapper(rows)
+        payload = {
+            self.rows_key: list(table.columns[0]) if self.as_list else table,
+            'count': len(table)
+        }
+        for name, (path, default) in self.extras.items():
+            payload[name] = resolve_path(data, path, default)
+
+        return payload
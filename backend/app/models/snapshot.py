@@ -0,0 +1,222 @@
+import hashlib
+import json
+import struct
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from app.models.records import RecordTable
+from app.utils.json_provider import dumps_bytes
+from app.utils.metrics import ENCODE_LATENCY
+
+# NSE timestamps are exchange-local (IST) wall-clock strings
+NSE_TIMEZONE = timezone(timedelta(hours=5, minutes=30))
+NSE_TIMESTAMP_FORMATS = ('%d-%b-%Y %H:%M:%S', '%d-%b-%Y %H:%M', '%d-%b-%Y')
+
+def parse_nse_timestamp(value):
+    """Parse an NSE `timestamp` field into an aware datetime, or None"""
+    if not isinstance(value, str) or not value:
+        return None
+
+    for fmt in NSE_TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).replace(tzinfo=NSE_TIMEZONE)
+        except ValueError:
+            continue
+    return None
+
+def encode_payload(payload, columnar=False):
+    """Encode a `data` payload as a success response body"""
+    if not columnar:
+        return dumps_bytes({'status': 'success', 'data': payload})
+
+    payload = {
+        key: value.to_columnar() if isinstance(value, RecordTable) else value
+        for key, value in payload.items()
+    }
+    return dumps_bytes({'status': 'success', 'format': 'columnar', 'data': payload})
+
+def body_etag(body):
+    """Strong ETag value: a hash of an encoded body"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    Immutable, published view of one market dataset.
+
+    `payload` is the `data` body served by the matching API route. It is
+    built once when the snapshot is published and must be treated as
+    read-only by every reader.
+    """
+
+    name: str
+    payload: dict
+    fetched_at: float = field(default_factory=time.time)
+    expires_at: float = float('inf')
+    # When the content last changed; republishing identical data keeps the old value
+    modified_at: float = None
+    # Increases whenever the content changes; unchanged republishes keep it
+    version: int = 0
+    # Loaded from the on-disk archive at startup rather than fetched by this process
+    restored: bool = False
+    # Rebuilt from an expired upstream response because NSE could not be reached
+    stale: bool = False
+    # Views derived from the payload, built at most once per snapshot (see `derive`)
+    _derived: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was fetched"""
+        return time.time() - self.fetched_at
+
+    @property
+    def is_fresh(self):
+        """Whether the snapshot is still within its publish TTL"""
+        return time.time() < self.expires_at
+
+    @cached_property
+    def body(self):
+        """Encoded JSON response body, serialized once per snapshot"""
+        with ENCODE_LATENCY.time(self.name):
+            return encode_payload(self.payload)
+
+    @cached_property
+    def columnar_body(self):
+        """Encoded JSON body with record tables in column-oriented form"""
+        if not any(isinstance(value, RecordTable) for value in self.payload.values()):
+            return self.body
+        with ENCODE_LATENCY.time(self.name):
+            return encode_payload(self.payload, columnar=True)
+
+    @cached_property
+    def etag(self):
+        """Strong ETag value: a hash of the encoded body"""
+        return body_etag(self.body)
+
+    @cached_property
+    def columnar_etag(self):
+        """Strong ETag value for the columnar body"""
+        return body_etag(self.columnar_body)
+
+    def derive(self, key, builder):
+        """Get a view of the payload, calling `builder(payload)` only the first time per key"""
+        try:
+            return self._derived[key]
+        except KeyError:
+            # Racing readers may both build; either result is equivalent
+            value = self._derived[key] = builder(self.payload)
+            return value
+
+    @property
+    def last_modified(self):
+        """The NSE `timestamp` of the data, else when its content last changed"""
+        parsed = parse_nse_timestamp(self.payload.get('timestamp'))
+        if parsed is not None:
+            return parsed
+
+        modified_at = self.modified_at if self.modified_at is not None else self.fetched_at
+        return datetime.fromtimestamp(modified_at, timezone.utc)
+
+# Changed with the file layout (v2 stores the payload as JSON rather than a pickle); other files are rejected
+MAGIC = b'FSN2'
+HEADER = struct.Struct('<4sI')
+# Pre-encoded sections stored after the header, in this order
+SECTIONS = ('body', 'columnar_body', 'payload')
+
+def encode_payload_state(payload):
+    """
+    JSON form of a payload that `decode_payload_state` turns back into it.
+
+    Record tables are stored column-oriented, with a flag per column for
+    the packed numeric ones. Snapshot files are read by other processes,
+    so nothing in them is ever unpickled or otherwise executed.
+    """
+    tables = {}
+    values = {}
+    for key, value in payload.items():
+        if isinstance(value, RecordTable):
+            tables[key] = [isinstance(column, array) for column in value.columns]
+            value = value.to_columnar()
+        values[key] = value
+    return dumps_bytes({'tables': tables, 'payload': values})
+
+def decode_payload_state(data):
+    """Rebuild a payload, record tables included, from `encode_payload_state` output"""
+    state = json.loads(data)
+    payload = state['payload']
+    for key, packed in state['tables'].items():
+        table = payload[key]
+        columns = [
+            # Non-finite floats were written as null
+            array('d', (float('nan') if value is None else value for value in column)) if numeric else column
+            for column, numeric in zip(table['columns'], packed)
+        ]
+        payload[key] = RecordTable(table['fields'], columns)
+    return payload
+
+def encode_snapshot(snapshot):
+    """Serialize a snapshot: header, both encoded bodies and the payload"""
+    sections = {
+        'body': snapshot.body,
+        'columnar_body': snapshot.columnar_body,
+        'payload': encode_payload_state(snapshot.payload)
+    }
+    offsets = {}
+    position = 0
+    for key in SECTIONS:
+        offsets[key] = (position, len(sections[key]))
+        position += len(sections[key])
+
+    header = json.dumps({
+        'name': snapshot.name,
+        'version': snapshot.version,
+        'fetched_at': snapshot.fetched_at,
+        'expires_at': snapshot.expires_at if snapshot.expires_at != float('inf') else None,
+        'modified_at': snapshot.modified_at,
+        'stale': snapshot.stale,
+        'etag': snapshot.etag,
+        'columnar_etag': snapshot.columnar_etag,
+        'sections': offsets
+    }).encode()
+    return b''.join([HEADER.pack(MAGIC, len(header)), header, *(sections[key] for key in SECTIONS)])
+
+def decode_snapshot(buffer, previous=None, restored=False):
+    """
+    Rebuild a snapshot from `encode_snapshot` output.
+
+    Bodies and ETags are taken as stored rather than re-encoded. When
+    `previous` has the same version its payload and bodies are reused, so
+    an unchanged republish costs no decoding.
+    """
+    magic, header_length = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise ValueError('not a snapshot file')
+    header = json.loads(bytes(buffer[HEADER.size:HEADER.size + header_length]))
+    start = HEADER.size + header_length
+
+    def section(key):
+        offset, length = header['sections'][key]
+        return buffer[start + offset:start + offset + length]
+
+    reuse = previous is not None and previous.version == header['version'] and previous.restored == restored
+    expires_at = header['expires_at']
+    snapshot = Snapshot(
+        name=header['name'],
+        payload=previous.payload if reuse else decode_payload_state(bytes(section('payload'))),
+        fetched_at=header['fetched_at'],
+        expires_at=float('inf') if expires_at is None else expires_at,
+        modified_at=header['modified_at'],
+        version=header['version'],
+        restored=restored,
+        stale=header.get('stale', False)
+    )
+
+    # Fill the cached properties so readers never encode
+    cached = snapshot.__dict__
+    cached['etag'] = header['etag']
+    cached['columnar_etag'] = header['columnar_etag']
+    for key in ('body', 'columnar_body'):
+        cached[key] = getattr(previous, key) if reuse else bytes(section(key))
+    return snapshot
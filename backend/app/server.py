@@ -0,0 +1,184 @@
+"""
+Production serving under gunicorn.
+
+`gunicorn -c gunicorn.conf.py wsgi:app` and `python run.py --production`
+both take their settings from `gunicorn_options`, so the server is
+configured from `Config` like the rest of the app.
+
+With `SERVER_PRELOAD` the master imports the app once, primes every
+dataset snapshot and then forks; workers share that memory copy-on-write
+and start serving warm. Anything that must not cross a fork (pooled NSE
+sockets, the SQLite connection, the logging thread, the poller thread) is
+released before forking and recreated in the child.
+
+With `SHARED_SNAPSHOTS_ENABLED` as well, the master also forks a single
+poller process that is the only one to call NSE, record ticks and write
+snapshots; workers only read them from the `SharedSnapshotStore`, so
+upstream traffic does not grow with the worker count.
+"""
+
+import os
+import signal
+import threading
+from app.services.shared_snapshot_store import SharedSnapshotStore
+from app.utils.logger import configure_logging, logger, stop_logging
+
+# Signals gunicorn's master handles, reset in the poller process it forks
+MASTER_SIGNALS = ('SIGHUP', 'SIGQUIT', 'SIGINT', 'SIGTERM', 'SIGTTIN', 'SIGTTOU', 'SIGUSR1', 'SIGUSR2', 'SIGWINCH', 'SIGCHLD')
+
+_poller_pid = None
+
+def gunicorn_options(config):
+    """gunicorn settings and lifecycle hooks for a config class"""
+    return {
+        'bind': config.SERVER_BIND,
+        'workers': config.SERVER_WORKERS,
+        'threads': config.SERVER_THREADS,
+        'worker_class': config.SERVER_WORKER_CLASS,
+        'preload_app': config.SERVER_PRELOAD,
+        'timeout': config.SERVER_TIMEOUT,
+        'graceful_timeout': config.SERVER_GRACEFUL_TIMEOUT,
+        'keepalive': config.SERVER_KEEPALIVE,
+        'backlog': config.SERVER_BACKLOG,
+        'max_requests': config.SERVER_MAX_REQUESTS,
+        'max_requests_jitter': config.SERVER_MAX_REQUESTS_JITTER,
+        'when_ready': when_ready,
+        'post_fork': post_fork,
+        'worker_exit': worker_exit,
+        'on_exit': on_exit
+    }
+
+def _nse_service():
+    from app.api.routes import nse_service
+    return nse_service
+
+def _coingecko_service():
+    from app.api.crypto_routes import coingecko_service
+    return coingecko_service
+
+def _shares_snapshots(app):
+    return isinstance(_nse_service().snapshots, SharedSnapshotStore) and app.config['MARKET_POLLER_ENABLED']
+
+def prepare_fork(app):
+    """In the master: warm the snapshots children will inherit, then release fork-unsafe resources"""
+    poller = app.extensions['market_poller']
+    if app.config['SERVER_PRIME_SNAPSHOTS'] and app.config['MARKET_POLLER_ENABLED']:
+        primed = poller.prime()
+        logger.info("Primed %s/%s snapshots before forking workers", len(primed), len(poller.market_hours_intervals))
+
+    app.extensions['tick_store'].close()
+    _nse_service().client.close()
+    _coingecko_service().client.close()
+
+    if _shares_snapshots(app):
+        start_poller_process(app)
+
+def _reopen(app):
+    """Recreate what `prepare_fork` released, in a forked child"""
+    configure_logging(app.config)
+    app.extensions['tick_store'].reopen()
+    _nse_service().client.reopen()
+    _coingecko_service().client.reopen()
+
+def start_worker(app, forked=True):
+    """
+    In a worker: recreate per-process resources and start polling, or
+    become a reader of the poller process's shared snapshots.
+
+    `forked=False` is for workers that loaded the app themselves (no
+    preload); there is no poller process then, so each worker polls.
+    """
+    if forked:
+        _reopen(app)
+    # The pool starts on first use, so it can still be sized to this worker's share of the CPUs
+    app.extensions['monte_carlo'].processes = app.config['MONTE_CARLO_WORKER_PROCESSES']
+
+    if forked and _shares_snapshots(app):
+        snapshots = _nse_service().snapshots
+        snapshots.writer = False
+        # The poller process is the one tick store and archive writer
+        snapshots.unsubscribe(app.extensions['tick_store'].record_snapshot)
+        if 'snapshot_archive' in app.extensions:
+            snapshots.unsubscribe(app.extensions['snapshot_archive'].save)
+    elif app.config['MARKET_POLLER_ENABLED']:
+        app.extensions['market_poller'].start()
+
+def stop_worker(app):
+    """Stop background work and flush logs as a worker exits"""
+    app.extensions['market_poller'].stop()
+    app.extensions['monte_carlo'].close()
+    _nse_service().client.close()
+    _coingecko_service().client.close()
+    app.extensions['tick_store'].close()
+    stop_logging()
+
+def run_poller_process(app):
+    """Body of the poller process: poll and publish shared snapshots until SIGTERM"""
+    for name in MASTER_SIGNALS:
+        signal.signal(getattr(signal, name), signal.SIG_DFL)
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+
+    _reopen(app)
+    app.extensions['market_poller'].start()
+    logger.info("Poller process writing shared snapshots to %s", _nse_service().snapshots.directory)
+
+    while not stopped.wait(1):
+        pass
+    stop_worker(app)
+
+def start_poller_process(app):
+    """Fork the poller process (a bare fork, so workers forked later inherit no process handle to join)"""
+    global _poller_pid
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            run_poller_process(app)
+        except BaseException:
+            logger.exception("Poller process failed")
+            status = 1
+        finally:
+            os._exit(status)
+    _poller_pid = pid
+
+def stop_poller_process():
+    """Ask the poller process to finish its current poll and exit"""
+    global _poller_pid
+    if _poller_pid is not None:
+        try:
+            os.kill(_poller_pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        _poller_pid = None
+
+# gunicorn hooks
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        prepare_fork(server.app.wsgi())
+
+def post_fork(server, worker):
+    start_worker(worker.app.wsgi(), forked=server.cfg.preload_app)
+
+def worker_exit(server, worker):
+    stop_worker(worker.app.wsgi())
+
+def on_exit(server):
+    stop_poller_process()
+
+def serve(config_name='production'):
+    """Run the app under gunicorn with the options for `config_name`"""
+    from gunicorn.app.base import BaseApplication
+    from app import create_app
+    from app.config.config import config
+
+    class FinanceApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options(config[config_name]).items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return create_app(config_name, start_background=False)
+
+    FinanceApplication().run()
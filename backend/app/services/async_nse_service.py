@@ -0,0 +1,86 @@
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from app.utils.logger import logger
+
+class AsyncNSEService:
+    """
+    Asyncio front end to `NSEService` for composite requests.
+
+    Fetches for several datasets run concurrently, bounded by a semaphore
+    and paced by the service's token bucket, so a composite response costs
+    roughly one upstream round trip instead of one per dataset. Blocking
+    I/O runs on the service's pooled `NSEClient` in a shared thread pool, and
+    the cache and snapshot store are shared with the synchronous service:
+    a token is only taken when the cache actually goes upstream, and
+    snapshots restored from disk start the same background refresh.
+    """
+
+    # Datasets returned by /api/market/snapshot
+    MARKET_SNAPSHOT_DATASETS = ('indices', 'nifty50_symbols', '52week_high', '52week_low')
+
+    def __init__(self, service, max_concurrency=4):
+        self.service = service
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='nse-async')
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        """Get the concurrency semaphore bound to the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _run_blocking(self, func, *args):
+        """Run a blocking call on the shared thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def fetch_data(self, endpoint):
+        """Fetch an endpoint on the thread pool; the cache's loader waits on the rate limiter there, off the loop"""
+        cached = self.service.cache.peek(endpoint)
+        if cached is not None:
+            return {
+                'success': True,
+                'data': cached
+            }
+
+        async with self._semaphore():
+            return await self._run_blocking(self.service.fetch_data, endpoint)
+
+    async def get_snapshot(self, name):
+        """Get a dataset snapshot, fetching its endpoint concurrently if needed"""
+        snapshot = self.service.snapshots.get(name)
+        if snapshot is None and self.service.archive is not None:
+            snapshot = await self._run_blocking(self.service.restore_snapshot, name)
+
+        # Archived data answers at once; the service starts its live refresh in the background
+        if snapshot is not None and snapshot.restored:
+            return self.service.get_snapshot(name)
+
+        if snapshot is not None and snapshot.is_fresh:
+            return {
+                'success': True,
+                'snapshot': snapshot
+            }
+
+        result = await self.fetch_data(self.service.DATASETS[name].endpoint)
+        if not result['success']:
+            return result
+
+        # The endpoint is now cached, so building the snapshot does no I/O
+        return await self._run_blocking(self.service.get_snapshot, name)
+
+    async def get_market_snapshot(self, names=None):
+        """Get several dataset snapshots at once, keyed by dataset name"""
+        names = list(names or self.MARKET_SNAPSHOT_DATASETS)
+        logger.info("Fetching market snapshot for %s datasets concurrently", len(names))
+
+        results = await asyncio.gather(*(self.get_snapshot(name) for name in names))
+        return dict(zip(names, results))
+
+    def run(self, coroutine):
+        """Run a coroutine to completion from synchronous (WSGI) code"""
+        return asyncio.run(coroutine)
@@ -0,0 +1,215 @@
+import math
+import numpy as np
+from dataclasses import dataclass
+
+# Axes every calculator is evaluated over, in grid order
+AXES = ('amount', 'rate', 'years')
+
+# Compounding periods per year, by frequency name (as used by the frontend calculators)
+COMPOUNDING = {
+    'annually': 1,
+    'semi-annually': 2,
+    'quarterly': 4,
+    'monthly': 12,
+    'daily': 365
+}
+# EMI payment periods per year
+PAYMENT = {
+    'monthly': 12,
+    'quarterly': 4,
+    'yearly': 1
+}
+
+class CalculatorError(ValueError):
+    """Invalid calculator input"""
+
+def _growth(rate, periods):
+    """(1 + rate) ** periods, via log1p/exp for accuracy at small rates"""
+    return np.exp(periods * np.log1p(rate))
+
+def _annuity_factor(rate, periods):
+    """((1 + rate) ** periods - 1) / rate, which tends to `periods` as rate -> 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = np.expm1(periods * np.log1p(rate)) / rate
+    return np.where(rate == 0, periods, factor)
+
+def sip(amount, rate, years, frequency=None):
+    """Monthly SIP of `amount`, contributions at the start of each month"""
+    monthly = rate / 100 / 12
+    months = years * 12
+    maturity = amount * _annuity_factor(monthly, months) * (1 + monthly)
+    invested = amount * months
+    return {'totalInvestment': invested, 'totalReturns': maturity - invested, 'maturityAmount': maturity}
+
+def lumpsum(amount, rate, years, frequency=None):
+    """One-time investment compounded annually"""
+    maturity = amount * _growth(rate / 100, years)
+    return {'totalInvestment': amount, 'totalReturns': maturity - amount, 'maturityAmount': maturity}
+
+def emi(amount, rate, years, frequency='monthly'):
+    """Equated installment repaying a loan of `amount` over `years`"""
+    per_year = PAYMENT[frequency]
+    periodic = rate / 100 / per_year
+    periods = years * per_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = _growth(periodic, periods)
+        installment = amount * periodic * growth / (growth - 1)
+    installment = np.where(periodic == 0, amount / periods, installment)
+    total = installment * periods
+    return {'emi': installment, 'totalAmount': total, 'totalInterest': total - amount}
+
+def compound_interest(amount, rate, years, frequency='annually'):
+    """Principal compounded `frequency` times a year"""
+    per_year = COMPOUNDING[frequency]
+    maturity = amount * _growth(rate / 100 / per_year, years * per_year)
+    return {'totalInterest': maturity - amount, 'maturityAmount': maturity}
+
+def simple_interest(amount, rate, years, frequency=None):
+    """Interest on the principal only"""
+    interest = amount * rate / 100 * years
+    return {'totalInterest': interest, 'maturityAmount': amount + interest}
+
+def future_value(amount, rate, years, frequency='annually'):
+    """What a present `amount` grows to"""
+    per_year = COMPOUNDING[frequency]
+    value = amount * _growth(rate / 100 / per_year, years * per_year)
+    return {'futureValue': value, 'interest': value - amount}
+
+def present_value(amount, rate, years, frequency='annually'):
+    """What a future `amount` is worth today"""
+    per_year = COMPOUNDING[frequency]
+    factor = 1 / _growth(rate / 100 / per_year, years * per_year)
+    return {'presentValue': amount * factor, 'discountFactor': factor}
+
+@dataclass(frozen=True)
+class Calculator:
+    """
+    A vectorized calculator.
+
+    `compute(amount, rate, years, frequency)` takes broadcastable arrays
+    (rate in % per year) and returns named result arrays, which may depend
+    on only some of the axes; `evaluate` broadcasts them to the full shape.
+    """
+
+    name: str
+    description: str
+    compute: object
+    outputs: tuple
+    # Allowed `frequency` values (None if the calculator takes none) and the default
+    frequencies: tuple = None
+    default_frequency: str = None
+
+CALCULATORS = {
+    calculator.name: calculator for calculator in (
+        Calculator('sip', 'Monthly SIP maturity', sip, ('totalInvestment', 'totalReturns', 'maturityAmount')),
+        Calculator('lumpsum', 'One-time investment maturity', lumpsum, ('totalInvestment', 'totalReturns', 'maturityAmount')),
+        Calculator('emi', 'Loan installment', emi, ('emi', 'totalAmount', 'totalInterest'), tuple(PAYMENT), 'monthly'),
+        Calculator('compound-interest', 'Compound interest', compound_interest, ('totalInterest', 'maturityAmount'), tuple(COMPOUNDING), 'annually'),
+        Calculator('simple-interest', 'Simple interest', simple_interest, ('totalInterest', 'maturityAmount')),
+        Calculator('future-value', 'Future value of a present amount', future_value, ('futureValue', 'interest'), tuple(COMPOUNDING), 'annually'),
+        Calculator('present-value', 'Present value of a future amount', present_value, ('presentValue', 'discountFactor'), tuple(COMPOUNDING), 'annually')
+    )
+}
+
+def parse_axis(name, value, max_size=None):
+    """
+    One axis as a 1-D float array.
+
+    Accepts a number, a list of numbers, a comma-separated string, or a
+    range: `{"start", "stop", "step"}` (stop inclusive) or `{"start", "stop", "num"}`.
+    Ranges and strings longer than `max_size` are rejected before any
+    array is allocated.
+    """
+    if value is None:
+        raise CalculatorError(f"Missing '{name}'")
+
+    def check_size(size):
+        if max_size is not None and size > max_size:
+            raise CalculatorError(f"'{name}' has more than {max_size} values")
+
+    try:
+        if isinstance(value, dict):
+            start, stop = float(value['start']), float(value['stop'])
+            if not (math.isfinite(start) and math.isfinite(stop)):
+                raise CalculatorError(f"'{name}' must be finite")
+            if 'num' in value:
+                num = int(value['num'])
+                check_size(num)
+                values = np.linspace(start, stop, max(num, 0))
+            else:
+                step = float(value['step'])
+                if not step > 0 or not math.isfinite(step):
+                    raise CalculatorError(f"'{name}' step must be positive")
+                # Half a step of slack keeps `stop` despite float rounding
+                size = (stop + step / 2 - start) / step
+                if not math.isfinite(size):
+                    raise CalculatorError(f"'{name}' step is too small for its range")
+                check_size(size)
+                values = np.arange(start, stop + step / 2, step)
+        elif isinstance(value, str):
+            parts = [part for part in value.split(',') if part.strip()]
+            check_size(len(parts))
+            values = np.array([float(part) for part in parts])
+        else:
+            values = np.atleast_1d(np.asarray(value, dtype=np.float64))
+            check_size(values.size)
+    except CalculatorError:
+        raise
+    except (KeyError, TypeError, ValueError, OverflowError) as e:
+        raise CalculatorError(f"Invalid '{name}': {e}")
+
+    if values.ndim != 1 or values.size == 0:
+        raise CalculatorError(f"'{name}' must be a number or a non-empty list")
+    if not np.all(np.isfinite(values)):
+        raise CalculatorError(f"'{name}' must be finite")
+    return values
+
+def evaluate(calculator, params, mode='grid', max_scenarios=None):
+    """
+    Evaluate a calculator over many scenarios in one vectorized pass.
+
+    `grid` evaluates the full amount x rate x years product, giving result
+    matrices of shape (len(amount), len(rate), len(years)). `zip` pairs the
+    axes element-wise (each of length n, or 1 to broadcast), giving
+    length-n results.
+    """
+    # No axis can be longer than the whole scenario budget
+    axes = {name: parse_axis(name, params.get(name), max_scenarios) for name in AXES}
+    if np.any(axes['amount'] < 0):
+        raise CalculatorError("'amount' must not be negative")
+    if np.any(axes['rate'] < 0):
+        raise CalculatorError("'rate' must not be negative")
+    if np.any(axes['years'] <= 0):
+        raise CalculatorError("'years' must be positive")
+
+    frequency = params.get('frequency') or calculator.default_frequency
+    if calculator.frequencies is not None and frequency not in calculator.frequencies:
+        raise CalculatorError(f"'frequency' must be one of: {', '.join(calculator.frequencies)}")
+
+    if mode == 'grid':
+        shape = tuple(axis.size for axis in axes.values())
+        arguments = [axis.reshape([-1 if i == position else 1 for i in range(len(AXES))])
+                     for position, axis in enumerate(axes.values())]
+    elif mode == 'zip':
+        sizes = {axis.size for axis in axes.values()} - {1}
+        if len(sizes) > 1:
+            raise CalculatorError("In 'zip' mode every axis must have the same length (or length 1)")
+        shape = (sizes.pop() if sizes else 1,)
+        arguments = list(axes.values())
+    else:
+        raise CalculatorError("'mode' must be 'grid' or 'zip'")
+
+    scenarios = int(np.prod(shape))
+    if max_scenarios is not None and scenarios > max_scenarios:
+        raise CalculatorError(f"{scenarios} scenarios requested, the limit is {max_scenarios}")
+
+    results = calculator.compute(*arguments, frequency=frequency)
+    return {
+        'calculator': calculator.name,
+        'mode': mode,
+        'frequency': frequency,
+        'axes': axes,
+        'shape': list(shape),
+        'scenarios': scenarios,
+        'results': {name: np.ascontiguousarray(np.broadcast_to(results[name], shape)) for name in calculator.outputs}
+    }
@@ -0,0 +1,67 @@
+import requests
+from requests.adapters import HTTPAdapter
+from app.services.nse_client import ACCEPT_ENCODING
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'finance-api/1.0',
+    'Accept': 'application/json',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive'
+}
+
+class CoinGeckoRateLimited(Exception):
+    """CoinGecko answered 429; `retry_after` is its Retry-After in seconds, when given"""
+
+    def __init__(self, retry_after=None):
+        super().__init__(f"CoinGecko rate limit hit (retry after {retry_after}s)" if retry_after else 'CoinGecko rate limit hit')
+        self.retry_after = retry_after
+
+class CoinGeckoClient:
+    """
+    Keep-alive HTTP client for the CoinGecko API.
+
+    Holds one `requests.Session` with a pooled adapter, like `NSEClient`.
+    CoinGecko needs no handshake; an API key, when configured, is sent as
+    the demo-plan header. 429 responses raise `CoinGeckoRateLimited` so the
+    service can back off instead of retrying into the limit.
+    """
+
+    def __init__(self, base_url, timeout=15, pool_size=10, api_key=None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.api_key = api_key
+        self.session = self._create_session()
+
+    def _create_session(self):
+        """Create a session with a keep-alive connection pool"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(DEFAULT_HEADERS)
+        if self.api_key:
+            session.headers['x-cg-demo-api-key'] = self.api_key
+        return session
+
+    def get_json(self, path, params=None):
+        """GET an API path and decode its JSON body"""
+        response = self.session.get(f"{self.base_url}/{path}", params=params, timeout=self.timeout)
+
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers['Retry-After'])
+            except (KeyError, ValueError):
+                retry_after = None
+            raise CoinGeckoRateLimited(retry_after)
+
+        response.raise_for_status()
+        return response.json()
+
+    def reopen(self):
+        """Replace the connection pool (in forked server workers)"""
+        self.session = self._create_session()
+
+    def close(self):
+        """Close every pooled connection"""
+        self.session.close()
@@ -0,0 +1,272 @@
+import math
+import re
+import threading
+import time
+from urllib.parse import urlencode
+import requests
+from app.utils.logger import logger
+from app.config.config import Config
+from app.utils.cache import SnapshotCache
+from app.services.coingecko_client import CoinGeckoClient, CoinGeckoRateLimited
+from app.utils.rate_limiter import create_rate_limiter
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.metrics import COINGECKO_LATENCY
+
+COIN_ID_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]{0,99}$')
+CURRENCY_PATTERN = re.compile(r'^[a-z]{2,10}$')
+CHART_DAYS = ('1', '7', '14', '30', '90', '180', '365', 'max')
+
+# Parameters the proxy always sends, so every client shares one cache entry per resource
+MARKETS_PARAMS = {'order': 'market_cap_desc', 'sparkline': 'false', 'price_change_percentage': '1h,24h,7d'}
+COIN_PARAMS = {
+    'localization': 'false',
+    'tickers': 'false',
+    'market_data': 'true',
+    'community_data': 'false',
+    'developer_data': 'false',
+    'sparkline': 'false'
+}
+
+class CryptoRequestError(ValueError):
+    """Invalid crypto proxy request parameters"""
+
+class CoinGeckoService:
+    """
+    Service class for CoinGecko API interactions, structured like `NSEService`.
+
+    Every endpoint has its own TTL cache (`COINGECKO_CACHE_TTLS`) with
+    single-flight loading, so one upstream call answers every client asking
+    for the same resource, and expired entries keep being served while one
+    background refresh runs. Request parameters are normalized before they
+    become cache keys: the market list is always fetched as full pages of
+    `COINGECKO_MARKETS_PAGE_SIZE` coins and sliced locally, so any `per_page`
+    up to that size shares one upstream call.
+
+    A 429 puts the whole service into backoff for Retry-After seconds (or an
+    exponential delay); until it ends no request reaches CoinGecko and the
+    last cached responses are served instead. The backoff deadline is kept
+    in the rate limiter, so with the file backend one worker's 429 stops
+    every worker. Request threads wait at most `COINGECKO_RATE_LIMIT_MAX_WAIT`
+    for a token and are answered the same way when none comes in time.
+    """
+
+    def __init__(self):
+        self.client = CoinGeckoClient(
+            Config.COINGECKO_BASE_URL,
+            timeout=Config.COINGECKO_TIMEOUT,
+            pool_size=Config.COINGECKO_POOL_SIZE,
+            api_key=Config.COINGECKO_API_KEY or None
+        )
+        self.caches = {
+            name: SnapshotCache(
+                default_ttl=ttl,
+                stale_ttl=Config.COINGECKO_CACHE_STALE_TTL,
+                max_entries=Config.COINGECKO_CACHE_MAX_ENTRIES
+            )
+            for name, ttl in Config.COINGECKO_CACHE_TTLS.items()
+        }
+        self.rate_limiter = create_rate_limiter(
+            Config.COINGECKO_RATE_LIMIT,
+            Config.COINGECKO_RATE_BURST,
+            backend=Config.COINGECKO_RATE_LIMIT_BACKEND,
+            path=Config.COINGECKO_RATE_LIMIT_FILE
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.COINGECKO_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=Config.COINGECKO_BREAKER_RESET_TIMEOUT
+        )
+        self.markets_page_size = Config.COINGECKO_MARKETS_PAGE_SIZE
+        self.max_wait = Config.COINGECKO_RATE_LIMIT_MAX_WAIT
+        # Consecutive 429s seen by this process, for the exponential delay
+        self._rate_limited = 0
+        self._backoff_lock = threading.Lock()
+
+    def ttl_for(self, name):
+        """Get the cache TTL of an endpoint, used as its Cache-Control max-age"""
+        return self.caches[name].default_ttl
+
+    def backoff_remaining(self):
+        """Seconds left before CoinGecko may be called again after a 429"""
+        return self.rate_limiter.paused_for()
+
+    def _back_off(self, retry_after):
+        """Stop calling CoinGecko for Retry-After seconds, or an exponentially growing delay"""
+        with self._backoff_lock:
+            self._rate_limited += 1
+            delay = retry_after
+            if delay is None:
+                delay = min(Config.COINGECKO_BACKOFF_BASE * 2 ** (self._rate_limited - 1), Config.COINGECKO_BACKOFF_MAX)
+        self.rate_limiter.pause(delay)
+        logger.warning("CoinGecko rate limited us, backing off for %.0fs", delay)
+
+    def _request(self, name, path, params):
+        """Fetch a path from CoinGecko, bypassing the cache"""
+        remaining = self.backoff_remaining()
+        if remaining > 0:
+            raise CoinGeckoRateLimited(round(remaining))
+        # Fail fast while CoinGecko is known to be down instead of waiting out the timeout
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"CoinGecko circuit is open, skipping {path}")
+
+        # Never park a request thread behind a long queue of reservations
+        if not self.rate_limiter.acquire(max_wait=self.max_wait):
+            raise CoinGeckoRateLimited(math.ceil(self.rate_limiter.wait_time()))
+        logger.info("Fetching data from CoinGecko: %s", path)
+
+        start = time.perf_counter()
+        try:
+            data = self.client.get_json(path, params)
+        except CoinGeckoRateLimited as e:
+            COINGECKO_LATENCY.observe(time.perf_counter() - start, name, 'rate_limited')
+            self._back_off(e.retry_after)
+            raise
+        except requests.HTTPError as e:
+            COINGECKO_LATENCY.observe(time.perf_counter() - start, name, 'error')
+            # A 4xx (unknown coin, bad parameter) says nothing about CoinGecko's health
+            if e.response is None or e.response.status_code >= 500:
+                self.breaker.record_failure()
+            raise
+        except Exception:
+            COINGECKO_LATENCY.observe(time.perf_counter() - start, name, 'error')
+            self.breaker.record_failure()
+            raise
+
+        COINGECKO_LATENCY.observe(time.perf_counter() - start, name, 'success')
+        self.breaker.record_success()
+        with self._backoff_lock:
+            self._rate_limited = 0
+        return data
+
+    def fetch(self, name, path, params=None):
+        """Get an endpoint through its cache, falling back to the last good response on errors"""
+        params = dict(sorted((params or {}).items()))
+        key = f"{path}?{urlencode(params)}" if params else path
+        cache = self.caches[name]
+
+        try:
+            return {
+                'success': True,
+                'data': cache.get(key, lambda: self._request(name, path, params))
+            }
+        except Exception as e:
+            logger.error("Error fetching %s from CoinGecko: %s", key, e)
+
+            # Serve the last good response, however old, rather than an error
+            stale = cache.peek(key, allow_stale=True)
+            if stale is not None:
+                return {
+                    'success': True,
+                    'data': stale,
+                    'stale': True
+                }
+
+            result = {
+                'success': False,
+                'error': str(e),
+                'status_code': 503
+            }
+            if isinstance(e, CoinGeckoRateLimited):
+                result['retry_after'] = max(math.ceil(max(self.backoff_remaining(), e.retry_after or 0)), 1)
+            elif isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code == 404:
+                result['status_code'] = 404
+            return result
+
+    @staticmethod
+    def _currency(vs_currency):
+        vs_currency = (vs_currency or 'usd').lower()
+        if not CURRENCY_PATTERN.match(vs_currency):
+            raise CryptoRequestError(f"Invalid vs_currency: {vs_currency}")
+        return vs_currency
+
+    @staticmethod
+    def _coin_id(coin_id):
+        coin_id = coin_id.lower()
+        if not COIN_ID_PATTERN.match(coin_id):
+            raise CryptoRequestError(f"Invalid coin id: {coin_id}")
+        return coin_id
+
+    def get_markets(self, vs_currency='usd', per_page=10, page=1):
+        """Get coins by market cap, sliced from shared full-size upstream pages"""
+        vs_currency = self._currency(vs_currency)
+        if not 1 <= per_page <= self.markets_page_size:
+            raise CryptoRequestError(f"per_page must be between 1 and {self.markets_page_size}")
+        if page < 1:
+            raise CryptoRequestError('page must be positive')
+
+        offset = (page - 1) * per_page
+        first = offset // self.markets_page_size + 1
+        last = (offset + per_page - 1) // self.markets_page_size + 1
+
+        coins = []
+        stale = False
+        for upstream_page in range(first, last + 1):
+            result = self.fetch('markets', 'coins/markets', {
+                **MARKETS_PARAMS,
+                'vs_currency': vs_currency,
+                'per_page': self.markets_page_size,
+                'page': upstream_page
+            })
+            if not result['success']:
+                return result
+            coins.extend(result['data'])
+            stale = stale or result.get('stale', False)
+
+        start = offset - (first - 1) * self.markets_page_size
+        result = {
+            'success': True,
+            'data': coins[start:start + per_page]
+        }
+        if stale:
+            result['stale'] = True
+        return result
+
+    def get_global(self):
+        """Get global crypto market data"""
+        return self.fetch('global', 'global')
+
+    def get_coin(self, coin_id):
+        """Get one coin's details and market data"""
+        return self.fetch('coin', f"coins/{self._coin_id(coin_id)}", COIN_PARAMS)
+
+    def get_market_chart(self, coin_id, vs_currency='usd', days='7', interval=None):
+        """Get a coin's price, market cap and volume history"""
+        days = str(days).lower()
+        if days not in CHART_DAYS:
+            raise CryptoRequestError(f"days must be one of: {', '.join(CHART_DAYS)}")
+        params = {'vs_currency': self._currency(vs_currency), 'days': days}
+        # CoinGecko picks the granularity from `days`; only daily can be forced on the public API
+        if interval == 'daily':
+            params['interval'] = interval
+        return self.fetch('market_chart', f"coins/{self._coin_id(coin_id)}/market_chart", params)
+
+    def search(self, query):
+        """Search coins, exchanges and categories"""
+        query = (query or '').strip().lower()
+        if not query:
+            raise CryptoRequestError('query is required')
+        if len(query) > 100:
+            raise CryptoRequestError('query is too long')
+        return self.fetch('search', 'search', {'query': query})
+
+    def get_trending(self):
+        """Get trending searches"""
+        return self.fetch('trending', 'search/trending')
+
+    def cache_stats(self):
+        """Get response cache counters per endpoint"""
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+    def upstream_stats(self):
+        """Get the CoinGecko circuit breaker, rate limiter and 429 backoff state"""
+        return {
+            'circuit': self.breaker.stats(),
+            'rate_limit': {
+                'rate': self.rate_limiter.rate,
+                'burst': self.rate_limiter.burst,
+                'backend': type(self.rate_limiter).__name__
+            },
+            'backoff': {
+                'remaining': round(self.backoff_remaining(), 1),
+                'consecutive_429s': self._rate_limited
+            }
+        }
@@ -0,0 +1,147 @@
+import math
+import numpy as np
+from app.utils.cache import SnapshotCache
+
+class DownsamplingError(ValueError):
+    """Invalid downsampling request"""
+
+def lttb(x, y, threshold):
+    """
+    Indices of `threshold` points chosen by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; the points between are split into
+    `threshold - 2` equal buckets and each bucket keeps the point forming
+    the largest triangle with the point kept from the previous bucket and
+    the average of the next one. Buckets are laid out as one padded matrix
+    and next-bucket averages computed up front, so the only Python loop is
+    the inherently sequential walk over buckets, one vector op each.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    x = x - x[0]
+    y = np.asarray(y, dtype=np.float64)
+
+    every = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+    starts, counts = edges[:-1], np.diff(edges)
+
+    # Average of each bucket; bucket i aims at bucket i + 1's average, the last one at the final point
+    avg_x = np.add.reduceat(x[:n - 1], starts) / counts
+    avg_y = np.add.reduceat(y[:n - 1], starts) / counts
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    # Short buckets are padded by repeating their last point; argmax returns the first of equal areas, so the pad never wins
+    offsets = np.arange(counts.max())
+    index = np.minimum(starts[:, None] + offsets, (edges[1:] - 1)[:, None])
+    bucket_x, bucket_y = x[index], y[index]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (bucket_y[i] - ay) - (ax - bucket_x[i]) * (next_y[i] - ay))
+        a = index[i, np.argmax(area)]
+        selected[i + 1] = a
+    return selected
+
+def minmax(x, y, threshold):
+    """
+    Indices of at most `threshold` points by min/max decimation.
+
+    Keeps the first and last points plus the lowest and highest point of
+    each of `(threshold - 2) // 2` equal buckets, in order, so every peak
+    and trough survives. Fully vectorized.
+    """
+    n = len(y)
+    buckets = (threshold - 2) // 2
+    if threshold >= n or buckets < 1:
+        return np.arange(n)
+
+    interior = np.asarray(y[1:n - 1], dtype=np.float64)
+    size = math.ceil(len(interior) / buckets)
+    rows = math.ceil(len(interior) / size)
+    padding = rows * size - len(interior)
+
+    lows = np.append(interior, np.full(padding, np.inf)).reshape(rows, size)
+    highs = np.append(interior, np.full(padding, -np.inf)).reshape(rows, size)
+    base = np.arange(rows) * size + 1
+    return np.unique(np.concatenate(([0], base + lows.argmin(axis=1), base + highs.argmax(axis=1), [n - 1])))
+
+METHODS = {
+    'lttb': lttb,
+    'minmax': minmax
+}
+
+def parse_resolution(args, max_points=None):
+    """`(points, method)` from request arguments, or None when no `points` was asked for"""
+    if args.get('points') in (None, ''):
+        return None
+    try:
+        points = int(args['points'])
+    except (TypeError, ValueError):
+        raise DownsamplingError('points must be an integer')
+    if points < 3:
+        raise DownsamplingError('points must be at least 3')
+    if max_points is not None and points > max_points:
+        raise DownsamplingError(f"points must be at most {max_points}")
+
+    method = args.get('method') or 'lttb'
+    if method not in METHODS:
+        raise DownsamplingError(f"method must be one of: {', '.join(METHODS)}")
+    return points, method
+
+class Downsampler:
+    """
+    Downsampled series, memoized per (series, range, resolution).
+
+    Each result is stored with the `version` of the source it was computed
+    from (the upstream response itself, or a cheap fingerprint of it) and
+    reused for as long as the source compares equal, so a chart polled by
+    many clients is reduced once per upstream refresh.
+    """
+
+    def __init__(self, max_entries=512):
+        self.cache = SnapshotCache(default_ttl=float('inf'), stale_ttl=0, max_entries=max_entries)
+
+    def indices(self, key, version, x, y, points, method='lttb'):
+        """Indices of the points to keep from a series"""
+        cache_key = (key, points, method)
+        cached = self.cache.peek(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        selected = METHODS[method](x, y, points).tolist()
+        self.cache.set(cache_key, (version, selected))
+        return selected
+
+    def market_chart(self, key, chart, points, method='lttb'):
+        """A CoinGecko market chart with every series cut to the points chosen from its prices"""
+        prices = chart.get('prices') or []
+        if len(prices) <= points:
+            return chart
+
+        series = np.asarray(prices, dtype=np.float64)
+        selected = self.indices(key, chart, series[:, 0], series[:, 1], points, method)
+        reduced = {
+            name: [values[i] for i in selected] if len(values) == len(prices) else values
+            for name, values in chart.items()
+            if isinstance(values, list)
+        }
+        return {**chart, **reduced}
+
+    def bars(self, key, bars, points, method='lttb'):
+        """OHLC bars thinned to the bars chosen from their closes"""
+        if len(bars) <= points:
+            return bars
+
+        # Bars only change at the end, so the count and the last bar identify the series
+        version = (len(bars), bars[0]['time'], tuple(bars[-1].values()))
+        x = np.fromiter((bar['time'] for bar in bars), dtype=np.float64, count=len(bars))
+        y = np.fromiter((bar['close'] for bar in bars), dtype=np.float64, count=len(bars))
+        return [bars[i] for i in self.indices(key, version, x, y, points, method)]
@@ -0,0 +1,281 @@
+import math
+import threading
+import time
+import numpy as np
+from app.models.quotes import NIFTY50_INDEX_SYMBOL
+from app.services.tick_store import INTERVALS
+from app.utils.logger import logger
+
+INDICATOR_NAMES = (
+    'close', 'sma20', 'sma50', 'ema12', 'ema26', 'rsi14',
+    'macd', 'macdSignal', 'macdHist', 'bbUpper', 'bbMiddle', 'bbLower', 'volatility20'
+)
+
+class IndicatorEngine:
+    """
+    Vectorized technical indicators for a fixed universe of symbols.
+
+    State is held as NumPy arrays with one column per symbol, so each new
+    bar updates every symbol at once. EMA, MACD and RSI (Wilder smoothing)
+    are recursive and cost O(symbols) per bar; SMA, Bollinger bands and
+    rolling volatility read a fixed-size window from a ring buffer, so no
+    update ever touches the full history. Symbols without a price in a bar
+    carry their previous close forward. The latest values are kept as one
+    (symbols x indicators) matrix.
+    """
+
+    SMA_PERIODS = (20, 50)
+    EMA_FAST = 12
+    EMA_SLOW = 26
+    MACD_SIGNAL = 9
+    RSI_PERIOD = 14
+    BB_PERIOD = 20
+    BB_WIDTH = 2.0
+    VOL_PERIOD = 20
+
+    def __init__(self, symbols):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+
+        self.window = max(max(self.SMA_PERIODS), self.BB_PERIOD, self.VOL_PERIOD + 1)
+        # Each bar is written twice so the last `window` bars are always one contiguous slice
+        self._ring = np.full((2 * self.window, n), np.nan)
+        self._pos = 0
+        self.bars = 0
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.last_close = np.full(n, np.nan)
+
+        self._ema_fast = np.full(n, np.nan)
+        self._ema_slow = np.full(n, np.nan)
+        self._macd_signal = np.full(n, np.nan)
+        self._avg_gain = np.full(n, np.nan)
+        self._avg_loss = np.full(n, np.nan)
+        self.latest = np.full((n, len(INDICATOR_NAMES)), np.nan)
+
+    @staticmethod
+    def _ema_step(state, value, period):
+        """Advance an EMA; an unseeded (NaN) state starts at the value itself"""
+        alpha = 2.0 / (period + 1)
+        return np.where(np.isnan(state), value, state + alpha * (value - state))
+
+    def _tail(self, length):
+        """The last `length` bars, oldest first, as a (length x symbols) view"""
+        end = self._pos + self.window
+        return self._ring[end - length:end]
+
+    def load(self, closes):
+        """Feed a (bars x symbols) history matrix, oldest bar first"""
+        for row in np.asarray(closes, dtype=float):
+            self.update(row)
+        return self.latest
+
+    def update(self, closes):
+        """Add one bar of closes (NaN where missing) and refresh every indicator"""
+        closes = np.asarray(closes, dtype=float)
+        closes = np.where(np.isnan(closes), self.last_close, closes)
+        seen = ~np.isnan(closes)
+        previous = self.last_close
+
+        self._ring[self._pos] = closes
+        self._ring[self._pos + self.window] = closes
+        self._pos = (self._pos + 1) % self.window
+        self.bars += 1
+        self.counts += seen
+        self.last_close = closes
+
+        self._ema_fast = self._ema_step(self._ema_fast, closes, self.EMA_FAST)
+        self._ema_slow = self._ema_step(self._ema_slow, closes, self.EMA_SLOW)
+        macd = self._ema_fast - self._ema_slow
+        self._macd_signal = self._ema_step(self._macd_signal, macd, self.MACD_SIGNAL)
+
+        delta = closes - previous
+        gain = np.where(delta > 0, delta, 0.0)
+        loss = np.where(delta < 0, -delta, 0.0)
+        has_delta = ~np.isnan(delta)
+        self._avg_gain = np.where(
+            has_delta,
+            np.where(np.isnan(self._avg_gain), gain, self._avg_gain + (gain - self._avg_gain) / self.RSI_PERIOD),
+            self._avg_gain
+        )
+        self._avg_loss = np.where(
+            has_delta,
+            np.where(np.isnan(self._avg_loss), loss, self._avg_loss + (loss - self._avg_loss) / self.RSI_PERIOD),
+            self._avg_loss
+        )
+
+        self.latest = self._compute(closes, macd)
+        return self.latest
+
+    def _compute(self, closes, macd):
+        """Assemble the (symbols x indicators) matrix for the current bar"""
+        counts = self.counts
+        nan = np.nan
+        columns = {'close': closes}
+
+        for period in self.SMA_PERIODS:
+            columns[f"sma{period}"] = np.where(counts >= period, self._tail(period).mean(axis=0), nan)
+
+        columns['ema12'] = np.where(counts >= self.EMA_FAST, self._ema_fast, nan)
+        columns['ema26'] = np.where(counts >= self.EMA_SLOW, self._ema_slow, nan)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = self._avg_gain / self._avg_loss
+            rsi = np.where(self._avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + rs))
+        columns['rsi14'] = np.where(counts > self.RSI_PERIOD, rsi, nan)
+
+        macd_ready = counts >= self.EMA_SLOW
+        columns['macd'] = np.where(macd_ready, macd, nan)
+        columns['macdSignal'] = np.where(counts >= self.EMA_SLOW + self.MACD_SIGNAL - 1, self._macd_signal, nan)
+        columns['macdHist'] = columns['macd'] - columns['macdSignal']
+
+        window = self._tail(self.BB_PERIOD)
+        bb_ready = counts >= self.BB_PERIOD
+        middle = window.mean(axis=0)
+        width = self.BB_WIDTH * window.std(axis=0)
+        columns['bbMiddle'] = np.where(bb_ready, middle, nan)
+        columns['bbUpper'] = np.where(bb_ready, middle + width, nan)
+        columns['bbLower'] = np.where(bb_ready, middle - width, nan)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = np.diff(np.log(self._tail(self.VOL_PERIOD + 1)), axis=0)
+            volatility = returns.std(axis=0, ddof=1)
+        columns['volatility20'] = np.where(counts > self.VOL_PERIOD, volatility, nan)
+
+        return np.column_stack([columns[name] for name in INDICATOR_NAMES])
+
+    def values(self, symbol):
+        """Latest indicators for one symbol as a dict (None where not yet defined)"""
+        row = self.latest[self.index[symbol]]
+        return {
+            name: (None if math.isnan(value) else float(value))
+            for name, value in zip(INDICATOR_NAMES, row.tolist())
+        }
+
+class IndicatorService:
+    """
+    Keeps an `IndicatorEngine` for the Nifty 50 universe up to date.
+
+    The universe comes from the `nifty50_symbols` dataset. The engine is
+    seeded once from the tick store's bars and then advanced one bar at a
+    time as `nifty50` snapshots cross a bar boundary.
+    """
+
+    def __init__(self, nse_service, tick_store, interval='5m'):
+        self.nse_service = nse_service
+        self.tick_store = tick_store
+        self.interval = interval
+        self.seconds = INTERVALS[interval]
+        self.engine = None
+        self._bucket = None
+        self._live = None
+        self._lock = threading.Lock()
+
+    def _universe(self):
+        """Nifty 50 constituents, excluding the index's own row"""
+        result = self.nse_service.get_snapshot('nifty50_symbols')
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        return [symbol for symbol in result['snapshot'].payload['symbols'] if symbol != NIFTY50_INDEX_SYMBOL]
+
+    def ensure_ready(self):
+        """Build and seed the engine on first use"""
+        with self._lock:
+            if self.engine is not None:
+                return self.engine
+
+            engine = IndicatorEngine(self._universe())
+            now = time.time()
+            self._bucket = self.tick_store.bucket(now, self.seconds)
+            # Enough bars to fill the windows and let the recursive averages settle
+            limit = engine.window + IndicatorEngine.EMA_SLOW * 4
+            buckets, rows = self.tick_store.closes(engine.symbols, self.interval, end=now, limit=limit)
+
+            matrix = np.array(rows, dtype=float).reshape(len(rows), len(engine.symbols))
+            completed = [i for i, bucket in enumerate(buckets) if bucket < self._bucket]
+            engine.load(matrix[completed])
+            self._live = matrix[-1] if buckets and buckets[-1] == self._bucket else np.full(len(engine.symbols), np.nan)
+
+            logger.info("Indicator engine seeded with %s %s bars for %s symbols", len(completed), self.interval, len(engine.symbols))
+            self.engine = engine
+            return engine
+
+    def on_snapshot(self, snapshot):
+        """Snapshot subscriber: close the current bar when a new bucket starts"""
+        if snapshot.name != 'nifty50' or self.engine is None:
+            return
+
+        stocks = snapshot.payload['stocks']
+        if hasattr(stocks, 'column'):
+            prices = zip(stocks.column('symbol'), stocks.column('lastPrice'))
+        else:
+            prices = ((row.get('symbol'), row.get('lastPrice')) for row in stocks)
+        bucket = self.tick_store.bucket(snapshot.fetched_at, self.seconds)
+
+        with self._lock:
+            engine = self.engine
+            if bucket > self._bucket:
+                if not np.all(np.isnan(self._live)):
+                    engine.update(self._live)
+                self._bucket = bucket
+                self._live = np.full(len(engine.symbols), np.nan)
+
+            for symbol, price in prices:
+                i = engine.index.get(symbol)
+                if i is not None and price:
+                    self._live[i] = price
+
+    def get_indicators(self, symbol):
+        """Get the latest indicators for one symbol"""
+        try:
+            engine = self.ensure_ready()
+        except Exception as e:
+            logger.error("Error preparing indicator engine: %s", e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+        if symbol not in engine.index:
+            return {
+                'success': False,
+                'error': f"Unknown symbol: {symbol}",
+                'not_found': True
+            }
+
+        return {
+            'success': True,
+            'symbol': symbol,
+            'interval': self.interval,
+            'bars': int(engine.counts[engine.index[symbol]]),
+            'indicators': engine.values(symbol)
+        }
+
+    def get_batch(self, symbols=None, columnar=False):
+        """Get the latest indicators for many symbols (all of them by default)"""
+        try:
+            engine = self.ensure_ready()
+        except Exception as e:
+            logger.error("Error preparing indicator engine: %s", e)
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+        symbols = [symbol for symbol in (symbols or engine.symbols) if symbol in engine.index]
+        if columnar:
+            rows = engine.latest[[engine.index[symbol] for symbol in symbols]]
+            indicators = {
+                'fields': list(INDICATOR_NAMES),
+                'symbols': symbols,
+                'values': np.where(np.isnan(rows), None, rows).tolist()
+            }
+        else:
+            indicators = {symbol: engine.values(symbol) for symbol in symbols}
+
+        return {
+            'success': True,
+            'interval': self.interval,
+            'indicators': indicators,
+            'count': len(symbols)
+        }
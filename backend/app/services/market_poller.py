@@ -0,0 +1,132 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from app.utils.logger import logger
+
+class MarketDataPoller:
+    """
+    Background poller that keeps NSE dataset snapshots warm.
+
+    Each dataset is refreshed on its own interval, taken from the
+    market-hours schedule while the exchange is open and from the off-hours
+    schedule otherwise. Refreshed data is published to the service's
+    snapshot store, which the API routes only read from.
+    """
+
+    def __init__(self, service, market_hours_intervals, off_hours_intervals,
+                 utc_offset_minutes=330, market_open='09:00', market_close='15:45',
+                 retry_interval=10):
+        self.service = service
+        self.market_hours_intervals = dict(market_hours_intervals)
+        self.off_hours_intervals = dict(off_hours_intervals)
+        self.tz = timezone(timedelta(minutes=utc_offset_minutes))
+        self.market_open = self._parse_time(market_open)
+        self.market_close = self._parse_time(market_close)
+        self.retry_interval = retry_interval
+        self._last_attempt = {}
+        self._retry_due = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_config(cls, service, config):
+        """Create a poller from a Flask config mapping"""
+        return cls(
+            service,
+            market_hours_intervals=config['MARKET_HOURS_POLL_INTERVALS'],
+            off_hours_intervals=config['OFF_HOURS_POLL_INTERVALS'],
+            utc_offset_minutes=config['MARKET_UTC_OFFSET_MINUTES'],
+            market_open=config['MARKET_OPEN_TIME'],
+            market_close=config['MARKET_CLOSE_TIME'],
+            retry_interval=config['POLLER_RETRY_INTERVAL']
+        )
+
+    @staticmethod
+    def _parse_time(value):
+        """Parse an 'HH:MM' string into minutes after midnight"""
+        hours, minutes = value.split(':')
+        return int(hours) * 60 + int(minutes)
+
+    @property
+    def running(self):
+        """Whether the polling thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_market_open(self, now=None):
+        """Check whether `now` (a UTC-aware datetime) falls in trading hours"""
+        local = (now or datetime.now(timezone.utc)).astimezone(self.tz)
+        if local.weekday() >= 5:
+            return False
+
+        minutes = local.hour * 60 + local.minute
+        return self.market_open <= minutes < self.market_close
+
+    def interval_for(self, name, now=None):
+        """Get the current polling interval for a dataset in seconds"""
+        if self.is_market_open(now):
+            return self.market_hours_intervals[name]
+        return self.off_hours_intervals[name]
+
+    def poll_once(self, name):
+        """Refresh one dataset and publish its snapshot"""
+        interval = self.interval_for(name)
+        # Keep serving a snapshot through one missed poll before it expires
+        result = self.service.refresh_snapshot(name, ttl=interval * 2)
+
+        self._last_attempt[name] = time.monotonic()
+        if result['success'] and not result.get('stale'):
+            self._retry_due.pop(name, None)
+        else:
+            # A stale result republished the last good response; NSE itself still failed
+            error = result.get('error', 'NSE unreachable, serving the last good response')
+            logger.warning("Poll of %s failed, retrying in %ss: %s", name, self.retry_interval, error)
+            self._retry_due[name] = self._last_attempt[name] + self.retry_interval
+
+        return result
+
+    def next_due(self, name):
+        """Get the monotonic time at which a dataset should next be polled"""
+        if name not in self._last_attempt:
+            return 0
+
+        # Re-evaluated on every pass so a schedule switch at market open applies immediately
+        due = self._last_attempt[name] + self.interval_for(name)
+        return min(due, self._retry_due.get(name, due))
+
+    def prime(self):
+        """Poll every dataset once on the calling thread; returns the names that succeeded"""
+        results = {name: self.poll_once(name) for name in self.market_hours_intervals}
+        return [name for name, result in results.items() if result['success'] and not result.get('stale')]
+
+    def start(self):
+        """Start polling on a daemon thread"""
+        if self.running:
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='market-data-poller', daemon=True)
+        self._thread.start()
+        logger.info("Market data poller started for %s", ', '.join(self.market_hours_intervals))
+
+    def stop(self, timeout=5):
+        """Stop polling and wait for the thread to exit"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        """Poll every dataset that is due, then sleep until the next one is"""
+        while not self._stop.is_set():
+            for name in self.market_hours_intervals:
+                if self._stop.is_set():
+                    return
+                if time.monotonic() >= self.next_due(name):
+                    try:
+                        self.poll_once(name)
+                    except Exception as e:
+                        logger.error("Unexpected error polling %s: %s", name, e)
+                        self._last_attempt[name] = time.monotonic()
+
+            wait = min(self.next_due(name) for name in self.market_hours_intervals) - time.monotonic()
+            self._stop.wait(min(max(wait, 0.5), 30))
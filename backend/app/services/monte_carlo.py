@@ -0,0 +1,274 @@
+import hashlib
+import json
+import math
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from app.services.calculator import CALCULATORS, CalculatorError, evaluate
+from app.utils.cache import SnapshotCache
+from app.utils.logger import logger
+
+KINDS = ('sip', 'lumpsum')
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+class MonteCarloTimeout(Exception):
+    """A projection did not finish within its time budget"""
+
+def simulate_chunk(kind, amount, years, expected_return, volatility, paths, seed):
+    """
+    Final corpus of `paths` simulated investments.
+
+    Returns are lognormal with standard deviation of annual log returns
+    `volatility`, and their mean compounds like the fixed-rate calculators:
+    annually at `expected_return` for a lumpsum, monthly at
+    `expected_return / 12` for a SIP. SIPs step month by month, contributing
+    at the start of each month; a lumpsum only depends on the total log
+    return, which is drawn directly. `seed` is a
+    `np.random.SeedSequence`, so each chunk has its own reproducible stream.
+
+    Runs in pool processes, so it only takes plain, picklable arguments.
+    """
+    rng = np.random.default_rng(seed)
+    months = round(years * 12)
+    # Monthly mean log return, less the lognormal correction so the mean growth is exact
+    monthly = math.log1p(expected_return) / 12 if kind == 'lumpsum' else math.log1p(expected_return / 12)
+    drift = monthly - volatility ** 2 / 24
+    scale = volatility / math.sqrt(12)
+
+    if kind == 'lumpsum':
+        log_return = rng.standard_normal(paths) * (scale * math.sqrt(months)) + drift * months
+        return amount * np.exp(log_return)
+
+    values = np.zeros(paths)
+    # A year of monthly growth factors at a time; float32 draws halve the RNG cost
+    block = np.empty((min(12, months), paths), dtype=np.float32)
+    for start in range(0, months, 12):
+        growth = block[:min(12, months - start)]
+        rng.standard_normal(out=growth, dtype=np.float32)
+        growth *= scale
+        growth += drift
+        np.exp(growth, out=growth)
+        for factor in growth:
+            values += amount
+            values *= factor
+    return values
+
+def parse_projection(kind, params, max_paths=None):
+    """Validate projection parameters into the normalized form used for simulation and cache keys"""
+    if kind not in KINDS:
+        raise CalculatorError(f"Unknown projection: {kind}")
+
+    def number(name, default=None, integer=False):
+        value = params.get(name, default)
+        if value is None:
+            raise CalculatorError(f"Missing '{name}'")
+        try:
+            value = int(value) if integer else float(value)
+        except (TypeError, ValueError):
+            raise CalculatorError(f"'{name}' must be a number")
+        if not math.isfinite(value):
+            raise CalculatorError(f"'{name}' must be finite")
+        return value
+
+    projection = {
+        'kind': kind,
+        'amount': number('amount'),
+        'years': number('years'),
+        # Percent per year, as in the calculators
+        'expectedReturn': number('expectedReturn', 12),
+        'volatility': number('volatility', 15),
+        'paths': number('paths', 10000, integer=True),
+        'seed': number('seed', 0, integer=True)
+    }
+    if projection['amount'] < 0:
+        raise CalculatorError("'amount' must not be negative")
+    if not 0 < projection['years'] <= 100:
+        raise CalculatorError("'years' must be between 0 and 100")
+    if kind == 'sip' and round(projection['years'] * 12) < 1:
+        raise CalculatorError("'years' must cover at least one month")
+    if projection['expectedReturn'] <= -100 or projection['volatility'] < 0:
+        raise CalculatorError("'expectedReturn' must be above -100 and 'volatility' must not be negative")
+    if projection['paths'] < 1:
+        raise CalculatorError("'paths' must be positive")
+    if max_paths is not None and projection['paths'] > max_paths:
+        raise CalculatorError(f"{projection['paths']} paths requested, the limit is {max_paths}")
+    if projection['seed'] < 0:
+        raise CalculatorError("'seed' must not be negative")
+
+    percentiles = params.get('percentiles', DEFAULT_PERCENTILES)
+    if isinstance(percentiles, str):
+        percentiles = [part for part in percentiles.split(',') if part.strip()]
+    try:
+        percentiles = sorted({int(value) for value in percentiles})
+    except (TypeError, ValueError):
+        raise CalculatorError("'percentiles' must be a list of integers")
+    if not percentiles or not all(1 <= value <= 99 for value in percentiles):
+        raise CalculatorError("'percentiles' must be between 1 and 99")
+    projection['percentiles'] = percentiles
+    return projection
+
+def projection_key(projection):
+    """Stable hash of normalized projection parameters"""
+    return hashlib.sha256(json.dumps(projection, sort_keys=True).encode('utf-8')).hexdigest()
+
+class MonteCarloEngine:
+    """
+    Monte Carlo projections of SIP and lumpsum outcomes.
+
+    A projection is split into fixed-size chunks of paths. Each chunk gets
+    its own child of `SeedSequence(seed)`, so results depend only on the
+    parameters, never on how many processes ran them, and chunks are
+    simulated in parallel on a process pool (NumPy releases the GIL too
+    rarely for threads to help). The pool is created on first use, with
+    the forkserver start method, so it is never forked from a threaded
+    server worker. Results are cached by parameter hash, and concurrent
+    identical requests share one simulation.
+    """
+
+    def __init__(self, processes=1, chunk_paths=50000, max_paths=1000000, timeout=30,
+                 cache_ttl=3600, cache_size=256):
+        self.processes = processes
+        self.chunk_paths = chunk_paths
+        self.max_paths = max_paths
+        self.timeout = timeout
+        self.cache = SnapshotCache(default_ttl=cache_ttl, stale_ttl=0, max_entries=cache_size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        """Create an engine from a Flask config mapping"""
+        return cls(
+            processes=config['MONTE_CARLO_PROCESSES'],
+            chunk_paths=config['MONTE_CARLO_CHUNK_PATHS'],
+            max_paths=config['MONTE_CARLO_MAX_PATHS'],
+            timeout=config['MONTE_CARLO_TIMEOUT'],
+            cache_ttl=config['MONTE_CARLO_CACHE_TTL'],
+            cache_size=config['MONTE_CARLO_CACHE_SIZE']
+        )
+
+    def project(self, kind, params):
+        """Percentile bands of the final corpus for a projection, from the cache when possible"""
+        projection = parse_projection(kind, params, self.max_paths)
+        return self.cache.get(projection_key(projection), lambda: self._project(projection))
+
+    def _project(self, projection):
+        started = time.perf_counter()
+        values = self._simulate(projection)
+
+        months = round(projection['years'] * 12)
+        invested = projection['amount'] * (months if projection['kind'] == 'sip' else 1)
+        fixed = None
+        if projection['expectedReturn'] >= 0:
+            fixed = evaluate(CALCULATORS[projection['kind']], {
+                'amount': projection['amount'],
+                'rate': projection['expectedReturn'],
+                'years': projection['years']
+            })['results']['maturityAmount'].item()
+        bands = np.percentile(values, projection['percentiles'])
+
+        return {
+            **projection,
+            'invested': invested,
+            'bands': {f"p{percentile}": band for percentile, band in zip(projection['percentiles'], bands.tolist())},
+            'mean': values.mean().item(),
+            'probabilityOfLoss': np.count_nonzero(values < invested).item() / values.size,
+            # What the fixed-rate calculator projects at the expected return
+            'fixedRateCorpus': fixed,
+            'elapsedMs': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def _chunks(self, projection):
+        """Argument tuples for `simulate_chunk`, one per chunk of paths"""
+        paths = projection['paths']
+        count = -(-paths // self.chunk_paths)
+        seeds = np.random.SeedSequence(projection['seed']).spawn(count)
+        return [
+            (projection['kind'], projection['amount'], projection['years'],
+             projection['expectedReturn'] / 100, projection['volatility'] / 100,
+             min(self.chunk_paths, paths - i * self.chunk_paths), seed)
+            for i, seed in enumerate(seeds)
+        ]
+
+    def _simulate(self, projection):
+        """Final values of every path, simulated inline or across the pool, within `timeout` seconds"""
+        chunks = self._chunks(projection)
+        if self.processes <= 1 or len(chunks) == 1:
+            # Inline chunks cannot be interrupted, so the budget is checked between them
+            deadline = time.monotonic() + self.timeout
+            values = []
+            for chunk in chunks:
+                if values and time.monotonic() > deadline:
+                    raise self._timeout(projection)
+                values.append(simulate_chunk(*chunk))
+            return np.concatenate(values)
+
+        executor = self._get_executor()
+        try:
+            futures = [executor.submit(simulate_chunk, *chunk) for chunk in chunks]
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise
+        done, pending = wait(futures, timeout=self.timeout)
+        if pending:
+            # Cancelling only drops queued chunks; running ones would keep the pool busy under retries
+            self._recycle_executor(executor)
+            raise self._timeout(projection)
+
+        try:
+            return np.concatenate([future.result() for future in futures])
+        except BrokenProcessPool:
+            self._reset_executor(executor)
+            raise
+
+    def _timeout(self, projection):
+        return MonteCarloTimeout(f"Projection of {projection['paths']} paths took longer than {self.timeout}s")
+
+    def _get_executor(self):
+        """The process pool, started on first use"""
+        with self._lock:
+            if self._executor is None:
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+                self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+                logger.info("Started Monte Carlo pool with %s processes", self.processes)
+            return self._executor
+
+    def _reset_executor(self, executor):
+        """Drop a broken pool so the next projection starts a new one"""
+        logger.error("Monte Carlo pool broke; restarting it on next use")
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _recycle_executor(self, executor):
+        """Drop a pool holding abandoned work and stop its processes; the next projection starts a new one"""
+        logger.warning("Monte Carlo projection timed out; restarting the pool")
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        processes = list((executor._processes or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def stats(self):
+        """Get pool settings and result cache counters"""
+        return {
+            'processes': self.processes,
+            'poolStarted': self._executor is not None,
+            'chunkPaths': self.chunk_paths,
+            'maxPaths': self.max_paths,
+            'cache': self.cache.stats()
+        }
+
+    def close(self):
+        """Shut the process pool down, abandoning queued chunks"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,99 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from app.utils.logger import logger
+
+try:
+    import brotli  # noqa: F401 - lets urllib3 decode "br" responses
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+        '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+    ),
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive'
+}
+
+class NSEClient:
+    """
+    Keep-alive HTTP client for the NSE API.
+
+    Holds one `requests.Session` with a pooled adapter for the lifetime of
+    the service. NSE only serves the API to clients carrying the cookies set
+    by its home page, so that handshake is done once and repeated only when
+    the API answers 401/403.
+    """
+
+    def __init__(self, base_url, home_url, timeout=30, pool_size=10):
+        self.base_url = base_url.rstrip('/')
+        self.home_url = home_url
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.handshakes = 0
+        self._primed = False
+        self._handshake_lock = threading.Lock()
+        self.session = self._create_session()
+
+    def _create_session(self):
+        """Create a session with a keep-alive connection pool"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update(DEFAULT_HEADERS)
+        return session
+
+    def refresh_cookies(self, stale_cookies=None):
+        """Visit the NSE home page to obtain fresh session cookies"""
+        with self._handshake_lock:
+            # Another thread already refreshed the cookies this caller saw rejected
+            if stale_cookies is None and self._primed:
+                return
+            if stale_cookies is not None and self.session.cookies.get_dict() != stale_cookies:
+                return
+
+            logger.info("Refreshing NSE cookies from %s", self.home_url)
+            self.session.cookies.clear()
+            response = self.session.get(self.home_url, timeout=self.timeout)
+            response.raise_for_status()
+            self.handshakes += 1
+            self._primed = True
+
+    def get_json(self, endpoint):
+        """GET an API endpoint and decode its JSON body"""
+        if not self._primed:
+            self.refresh_cookies()
+
+        url = f"{self.base_url}/{endpoint}"
+        cookies = self.session.cookies.get_dict()
+        response = self.session.get(url, timeout=self.timeout)
+
+        if response.status_code in (401, 403):
+            logger.warning("NSE rejected cookies with %s, retrying %s", response.status_code, endpoint)
+            self.refresh_cookies(stale_cookies=cookies)
+            response = self.session.get(url, timeout=self.timeout)
+
+        response.raise_for_status()
+        return response.json()
+
+    def reopen(self):
+        """
+        Replace the connection pool, keeping the handshake cookies.
+
+        Used in forked server workers: pooled sockets inherited from the
+        master must not be shared between processes, but its cookies can.
+        """
+        cookies = self.session.cookies.copy()
+        self.session = self._create_session()
+        self.session.cookies.update(cookies)
+        self._handshake_lock = threading.Lock()
+
+    def close(self):
+        """Close every pooled connection"""
+        self.session.close()
@@ -1,161 +1,387 @@
-from nsepython import nsefetch
+import threading
+import time
 from app.utils.logger import logger
 from app.config.config import Config
-import time
+from app.utils.cache import SnapshotCache
+from app.services.snapshot_store import SnapshotStore
+from app.services.nse_client import NSEClient
+from app.utils.rate_limiter import create_rate_limiter
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.metrics import TRANSFORM_LATENCY, UPSTREAM_LATENCY
+from app.models.records import Field
+from app.models.schema import EndpointSchema
+from app.models.quotes import QuoteIndex
+from app.models.diff import diff_tables
+
+NIFTY50_ENDPOINT = "equity-stockIndices?index=NIFTY%2050"
+ALL_INDICES_ENDPOINT = "allIndices"
+HIGH_52WEEK_ENDPOINT = "live-analysis-data-52weekhighstock"
+LOW_52WEEK_ENDPOINT = "live-analysis-data-52weeklowstock"
+GAINERS_ENDPOINT = "live-analysis-variations?index=gainers"
+LOSERS_ENDPOINT = "live-analysis-variations?index=loosers"
+MOST_ACTIVE_ENDPOINT = "live-analysis-most-active-securities?index=volume"
+
+INDEX_FIELDS = (
+    Field('key', 'key', str, ''),
+    Field('name', 'index', str, ''),
+    Field('symbol', 'indexSymbol', str, ''),
+    Field('lastPrice', 'last', float, 0.0),
+    Field('change', 'variation', float, 0.0),
+    Field('pChange', 'percentChange', float, 0.0),
+    Field('previousClose', 'previousClose', float, 0.0),
+    Field('open', 'open', float, 0.0),
+    Field('high', 'high', float, 0.0),
+    Field('low', 'low', float, 0.0),
+    Field('yearHigh', 'yearHigh', float, 0.0),
+    Field('yearLow', 'yearLow', float, 0.0),
+    Field('indicativeClose', 'indicativeClose', float, 0.0),
+    Field('pe', 'pe', str, ''),
+    Field('pb', 'pb', str, ''),
+    Field('dy', 'dy', str, ''),
+    Field('advances', 'advances', str, '0'),
+    Field('declines', 'declines', str, '0'),
+    Field('unchanged', 'unchanged', str, '0'),
+    Field('perChange365d', 'perChange365d', float, 0.0),
+    Field('date365dAgo', 'date365dAgo', str, ''),
+    Field('perChange30d', 'perChange30d', float, 0.0),
+    Field('date30dAgo', 'date30dAgo', str, ''),
+    Field('previousDay', 'previousDay', float, 0.0),
+    Field('oneWeekAgo', 'oneWeekAgo', float, 0.0),
+    Field('oneMonthAgo', 'oneMonthAgo', float, 0.0),
+    Field('oneYearAgo', 'oneYearAgo', float, 0.0),
+    Field('chartTodayPath', 'chartTodayPath', str, ''),
+    Field('chart30dPath', 'chart30dPath', str, ''),
+    Field('chart365dPath', 'chart365dPath', str, '')
+)
+
+STOCK_52WEEK_FIELDS = (
+    Field('symbol', 'symbol', str, ''),
+    Field('series', 'series', str, ''),
+    Field('companyName', 'comapnyName', str, ''),
+    Field('new52WHL', 'new52WHL', float, 0.0),
+    Field('prev52WHL', 'prev52WHL', float, 0.0),
+    Field('prevHLDate', 'prevHLDate', str, ''),
+    Field('ltp', 'ltp', float, 0.0),
+    Field('prevClose', 'prevClose', float, 0.0),
+    Field('change', 'change', float, 0.0),
+    Field('pChange', 'pChange', float, 0.0)
+)
+
+NIFTY50_STOCK_FIELDS = (
+    Field('symbol', 'symbol', str, ''),
+    Field('companyName', ('meta', 'companyName'), str, ''),
+    Field('industry', ('meta', 'industry'), str, ''),
+    Field('open', 'open', float, 0.0),
+    Field('dayHigh', 'dayHigh', float, 0.0),
+    Field('dayLow', 'dayLow', float, 0.0),
+    Field('lastPrice', 'lastPrice', float, 0.0),
+    Field('previousClose', 'previousClose', float, 0.0),
+    Field('change', 'change', float, 0.0),
+    Field('pChange', 'pChange', float, 0.0),
+    Field('totalTradedVolume', 'totalTradedVolume', float, 0.0),
+    Field('totalTradedValue', 'totalTradedValue', float, 0.0),
+    Field('yearHigh', 'yearHigh', float, 0.0),
+    Field('yearLow', 'yearLow', float, 0.0),
+    Field('lastUpdateTime', 'lastUpdateTime', str, '')
+)
+
+PRICE_VARIATION_FIELDS = (
+    Field('symbol', 'symbol', str, ''),
+    Field('series', 'series', str, ''),
+    Field('open', 'open_price', float, 0.0),
+    Field('high', 'high_price', float, 0.0),
+    Field('low', 'low_price', float, 0.0),
+    Field('ltp', 'ltp', float, 0.0),
+    Field('prevClose', 'prev_price', float, 0.0),
+    Field('change', 'net_price', float, 0.0),
+    Field('pChange', 'perChange', float, 0.0),
+    Field('tradedQuantity', 'trade_quantity', float, 0.0),
+    Field('turnover', 'turnover', float, 0.0)
+)
+
+MOST_ACTIVE_FIELDS = (
+    Field('symbol', 'symbol', str, ''),
+    Field('lastPrice', 'lastPrice', float, 0.0),
+    Field('change', 'change', float, 0.0),
+    Field('pChange', 'pChange', float, 0.0),
+    Field('previousClose', 'previousClose', float, 0.0),
+    Field('open', 'open', float, 0.0),
+    Field('dayHigh', 'dayHigh', float, 0.0),
+    Field('dayLow', 'dayLow', float, 0.0),
+    Field('totalTradedVolume', 'totalTradedVolume', float, 0.0),
+    Field('totalTradedValue', 'totalTradedValue', float, 0.0),
+    Field('yearHigh', 'yearHigh', float, 0.0),
+    Field('yearLow', 'yearLow', float, 0.0)
+)
+
+# Published datasets, declared as data: snapshot name -> schema
+DATASETS = {
+    schema.name: schema
+    for schema in (
+        EndpointSchema(
+            'nifty50_symbols', NIFTY50_ENDPOINT, 'symbols',
+            (Field('symbol', 'symbol', str, ''),), as_list=True
+        ),
+        EndpointSchema(
+            'nifty50', NIFTY50_ENDPOINT, 'stocks', NIFTY50_STOCK_FIELDS, key='symbol',
+            extras={'timestamp': (('timestamp',), '')}
+        ),
+        EndpointSchema(
+            'indices', ALL_INDICES_ENDPOINT, 'indices', INDEX_FIELDS, key='symbol',
+            extras={'timestamp': (('timestamp',), '')}
+        ),
+        EndpointSchema(
+            '52week_high', HIGH_52WEEK_ENDPOINT, 'highStocks', STOCK_52WEEK_FIELDS, key='symbol',
+            extras={'totalHigh': (('high',), 0), 'timestamp': (('timestamp',), '')}
+        ),
+        EndpointSchema(
+            '52week_low', LOW_52WEEK_ENDPOINT, 'lowStocks', STOCK_52WEEK_FIELDS, key='symbol',
+            extras={'totalLow': (('low',), 0), 'timestamp': (('timestamp',), '')}
+        ),
+        EndpointSchema(
+            'gainers', GAINERS_ENDPOINT, 'gainers', PRICE_VARIATION_FIELDS,
+            rows_path=('NIFTY', 'data'), key='symbol', extras={'timestamp': (('NIFTY', 'timestamp'), '')}
+        ),
+        EndpointSchema(
+            'losers', LOSERS_ENDPOINT, 'losers', PRICE_VARIATION_FIELDS,
+            rows_path=('NIFTY', 'data'), key='symbol', extras={'timestamp': (('NIFTY', 'timestamp'), '')}
+        ),
+        EndpointSchema(
+            'most_active', MOST_ACTIVE_ENDPOINT, 'mostActive', MOST_ACTIVE_FIELDS, key='symbol',
+            extras={'timestamp': (('timestamp',), '')}
+        )
+    )
+}
 
 class NSEService:
     """Service class for NSE API interactions"""
     
+    DATASETS = DATASETS
+    
     def __init__(self):
         self.base_url = Config.NSE_BASE_URL
         self.timeout = Config.NSE_TIMEOUT
+        self.client = NSEClient(
+            self.base_url,
+            Config.NSE_HOME_URL,
+            timeout=self.timeout,
+            pool_size=Config.NSE_POOL_SIZE
+        )
+        self.cache = SnapshotCache(
+            default_ttl=Config.NSE_CACHE_DEFAULT_TTL,
+            ttls=Config.NSE_CACHE_TTLS,
+            stale_ttl=Config.NSE_CACHE_STALE_TTL
+        )
+        self.snapshots = SnapshotStore(history_size=Config.SNAPSHOT_HISTORY_SIZE)
+        self.rate_limiter = create_rate_limiter(
+            Config.NSE_RATE_LIMIT,
+            Config.NSE_RATE_BURST,
+            backend=Config.NSE_RATE_LIMIT_BACKEND,
+            path=Config.NSE_RATE_LIMIT_FILE
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.NSE_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=Config.NSE_BREAKER_RESET_TIMEOUT
+        )
+        # On-disk copies of the last snapshots (a SnapshotArchive), set up by create_app
+        self.archive = None
+        self._restore_attempted = set()
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
+    
+    def _request(self, endpoint):
+        """Fetch an endpoint from NSE, bypassing the cache"""
+        url = f"{self.base_url}/{endpoint}"
+        logger.info("Fetching data from: %s", url)
+        
+        # Fail fast while NSE is known to be down instead of waiting out the timeout
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"NSE circuit is open, skipping {endpoint}")
+        
+        # Respect upstream rate limits
+        self.rate_limiter.acquire()
+        
+        start = time.perf_counter()
+        try:
+            data = self.client.get_json(endpoint)
+        except Exception:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, endpoint, 'error')
+            self.breaker.record_failure()
+            raise
+        
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, endpoint, 'success')
+        self.breaker.record_success()
+        logger.info("Successfully fetched data from %s", endpoint)
+        
+        return data
     
     def fetch_data(self, endpoint):
         """Generic method to fetch data from NSE API"""
         try:
-            url = f"{self.base_url}/{endpoint}"
-            logger.info(f"Fetching data from: {url}")
-            
-            # Add delay to respect rate limits
-            time.sleep(0.1)
-            
-            data = nsefetch(url)
-            logger.info(f"Successfully fetched data from {endpoint}")
+            data = self.cache.get(endpoint, lambda: self._request(endpoint))
             
             return {
                 'success': True,
                 'data': data
             }
         except Exception as e:
-            logger.error(f"Error fetching data from {endpoint}: {str(e)}")
+            logger.error("Error fetching data from %s: %s", endpoint, e)
+            
+            # Serve the last good response, however old, rather than an error
+            stale = self.cache.peek(endpoint, allow_stale=True)
+            if stale is not None:
+                return {
+                    'success': True,
+                    'data': stale,
+                    'stale': True
+                }
+            
             return {
                 'success': False,
                 'error': str(e)
             }
     
-    def get_nifty50_symbols(self):
-        """Get Nifty 50 stock symbols"""
-        endpoint = "equity-stockIndices?index=NIFTY%2050"
-        result = self.fetch_data(endpoint)
+    def cache_stats(self):
+        """Get NSE response cache counters"""
+        return self.cache.stats()
+    
+    def upstream_stats(self):
+        """Get the NSE circuit breaker and rate limiter state"""
+        return {
+            'circuit': self.breaker.stats(),
+            'rate_limit': {
+                'rate': self.rate_limiter.rate,
+                'burst': self.rate_limiter.burst,
+                'backend': type(self.rate_limiter).__name__
+            }
+        }
+    
+    def get_snapshot(self, name):
+        """Get the published snapshot for a dataset, building it if missing or expired"""
+        snapshot = self.snapshots.get(name)
+        if snapshot is None and self.archive is not None:
+            snapshot = self.restore_snapshot(name)
         
-        if result['success']:
+        # Last-known data answers at once while the first live fetch runs in the background
+        if snapshot is not None and snapshot.restored:
+            self.refresh_in_background(name)
+            return {
+                'success': True,
+                'snapshot': snapshot
+            }
+        
+        if snapshot is not None and snapshot.is_fresh:
+            return {
+                'success': True,
+                'snapshot': snapshot
+            }
+        
+        endpoint = self.DATASETS[name].endpoint
+        return self.refresh_snapshot(name, ttl=self.cache.ttl_for(endpoint), force=False)
+    
+    def refresh_snapshot(self, name, ttl=float('inf'), force=True):
+        """Rebuild a dataset and publish it as a new snapshot"""
+        endpoint = self.DATASETS[name].endpoint
+        
+        if force:
             try:
-                data = result['data']
-                nifty50_symbols = [stock["symbol"] for stock in data["data"]]
-                
-                return {
-                    'success': True,
-                    'symbols': nifty50_symbols,
-                    'count': len(nifty50_symbols)
-                }
+                # Datasets sharing an endpoint are refreshed back to back; reuse the fresh response
+                self.cache.refresh(
+                    endpoint,
+                    lambda: self._request(endpoint),
+                    max_age=Config.NSE_REFRESH_COALESCE_WINDOW
+                )
             except Exception as e:
-                logger.error(f"Error processing Nifty50 symbols: {str(e)}")
+                logger.error("Error refreshing %s snapshot: %s", name, e)
                 return {
                     'success': False,
                     'error': str(e)
                 }
         
-        return result
+        result = self.get_dataset(name)
+        if not result['success']:
+            return result
+        
+        payload = {key: value for key, value in result.items() if key not in ('success', 'stale')}
+        if not result.get('stale'):
+            return {
+                'success': True,
+                'snapshot': self.snapshots.publish(name, payload, ttl=ttl)
+            }
+        
+        # NSE is unreachable and this is the last good response: serve it flagged stale and retry soon
+        logger.warning("Publishing %s from an expired NSE response", name)
+        return {
+            'success': True,
+            'stale': True,
+            'snapshot': self.snapshots.publish(name, payload, ttl=min(ttl, Config.NSE_STALE_SNAPSHOT_TTL), stale=True)
+        }
     
-    def get_all_indices(self):
-        """Get all indices from NSE"""
-        endpoint = "allIndices"
-        result = self.fetch_data(endpoint)
+    def restore_snapshot(self, name):
+        """Load a dataset's archived snapshot into the store, once per process"""
+        with self._refresh_lock:
+            if name in self._restore_attempted:
+                return self.snapshots.get(name)
+            self._restore_attempted.add(name)
         
-        if result['success']:
+        snapshot = self.archive.load(name)
+        if snapshot is None:
+            return None
+        
+        logger.info("Serving %s restored from disk (fetched %.0fs ago) until the first live refresh", name, snapshot.age)
+        return self.snapshots.restore(snapshot)
+    
+    def refresh_in_background(self, name):
+        """Refresh a dataset on a background thread, unless a refresh is already running"""
+        with self._refresh_lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+        
+        def run():
             try:
-                data = result['data']
-                indices_data = []
-                
-                if 'data' in data and isinstance(data['data'], list):
-                    logger.info(f"Processing {len(data['data'])} indices...")
-                    
-                    for index in data['data']:
-                        index_info = {
-                            'key': index.get('key', ''),
-                            'name': index.get('index', ''),
-                            'symbol': index.get('indexSymbol', ''),
-                            'lastPrice': index.get('last', 0),
-                            'change': index.get('variation', 0),
-                            'pChange': index.get('percentChange', 0),
-                            'previousClose': index.get('previousClose', 0),
-                            'open': index.get('open', 0),
-                            'high': index.get('high', 0),
-                            'low': index.get('low', 0),
-                            'yearHigh': index.get('yearHigh', 0),
-                            'yearLow': index.get('yearLow', 0),
-                            'indicativeClose': index.get('indicativeClose', 0),
-                            'pe': index.get('pe', ''),
-                            'pb': index.get('pb', ''),
-                            'dy': index.get('dy', ''),
-                            'advances': index.get('advances', '0'),
-                            'declines': index.get('declines', '0'),
-                            'unchanged': index.get('unchanged', '0'),
-                            'perChange365d': index.get('perChange365d', 0),
-                            'date365dAgo': index.get('date365dAgo', ''),
-                            'perChange30d': index.get('perChange30d', 0),
-                            'date30dAgo': index.get('date30dAgo', ''),
-                            'previousDay': index.get('previousDay', 0),
-                            'oneWeekAgo': index.get('oneWeekAgo', 0),
-                            'oneMonthAgo': index.get('oneMonthAgo', 0),
-                            'oneYearAgo': index.get('oneYearAgo', 0),
-                            'chartTodayPath': index.get('chartTodayPath', ''),
-                            'chart30dPath': index.get('chart30dPath', ''),
-                            'chart365dPath': index.get('chart365dPath', '')
-                        }
-                        indices_data.append(index_info)
-                
-                return {
-                    'success': True,
-                    'indices': indices_data,
-                    'count': len(indices_data)
-                }
-            except Exception as e:
-                logger.error(f"Error processing indices data: {str(e)}")
-                return {
-                    'success': False,
-                    'error': str(e)
-                }
+                self.refresh_snapshot(name, ttl=self.cache.ttl_for(self.DATASETS[name].endpoint))
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(name)
         
-        return result
+        threading.Thread(target=run, name=f"refresh-{name}", daemon=True).start()
     
-    def get_52week_high_stocks(self):
-        """Get 52-week high stocks"""
-        endpoint = "live-analysis-data-52weekhighstock"
-        result = self.fetch_data(endpoint)
+    def get_delta(self, snapshot, since):
+        """Get the rows added, changed and removed since an earlier version, or None if it is not retained"""
+        schema = self.DATASETS.get(snapshot.name)
+        if schema is None or schema.key is None or since > snapshot.version:
+            return None
+        
+        base = snapshot if since == snapshot.version else self.snapshots.at_version(snapshot.name, since)
+        if base is None:
+            return None
+        
+        delta = diff_tables(base.payload[schema.rows_key], snapshot.payload[schema.rows_key], schema.key)
+        delta['since'] = since
+        delta['version'] = snapshot.version
+        delta['timestamp'] = snapshot.payload.get('timestamp', '')
+        return delta
+    
+    def get_dataset(self, name):
+        """Fetch a dataset and map it through its schema"""
+        schema = self.DATASETS[name]
+        result = self.fetch_data(schema.endpoint)
         
         if result['success']:
             try:
-                data = result['data']
-                high_stocks_data = []
-                
-                if 'data' in data and isinstance(data['data'], list):
-                    logger.info(f"Processing {len(data['data'])} 52-week high stocks...")
-                    
-                    for stock in data['data']:
-                        stock_info = {
-                            'symbol': stock.get('symbol', ''),
-                            'series': stock.get('series', ''),
-                            'companyName': stock.get('comapnyName', ''),
-                            'new52WHL': stock.get('new52WHL', 0),
-                            'prev52WHL': stock.get('prev52WHL', 0),
-                            'prevHLDate': stock.get('prevHLDate', ''),
-                            'ltp': stock.get('ltp', 0),
-                            'prevClose': stock.get('prevClose', 0),
-                            'change': stock.get('change', 0),
-                            'pChange': stock.get('pChange', 0)
-                        }
-                        high_stocks_data.append(stock_info)
+                with TRANSFORM_LATENCY.time(name):
+                    payload = schema.transform(result['data'])
+                logger.info("Processed %s %s records", payload['count'], name)
                 
+                if result.get('stale'):
+                    payload['stale'] = True
                 return {
                     'success': True,
-                    'highStocks': high_stocks_data,
-                    'count': len(high_stocks_data),
-                    'totalHigh': data.get('high', 0),
-                    'timestamp': data.get('timestamp', '')
+                    **payload
                 }
             except Exception as e:
-                logger.error(f"Error processing 52-week high stocks: {str(e)}")
+                logger.error("Error processing %s data: %s", name, e)
                 return {
                     'success': False,
                     'error': str(e)
@@ -163,46 +389,26 @@ class NSEService:
         
         return result
     
-    def get_52week_low_stocks(self):
-        """Get 52-week low stocks"""
-        endpoint = "live-analysis-data-52weeklowstock"
-        result = self.fetch_data(endpoint)
+    def get_nifty50_symbols(self):
+        """Get Nifty 50 stock symbols"""
+        return self.get_dataset('nifty50_symbols')
+    
+    def get_quote_index(self):
+        """Get the latest Nifty 50 snapshot with its per-symbol quote index"""
+        result = self.get_snapshot('nifty50')
         
         if result['success']:
-            try:
-                data = result['data']
-                low_stocks_data = []
-                
-                if 'data' in data and isinstance(data['data'], list):
-                    logger.info(f"Processing {len(data['data'])} 52-week low stocks...")
-                    
-                    for stock in data['data']:
-                        stock_info = {
-                            'symbol': stock.get('symbol', ''),
-                            'series': stock.get('series', ''),
-                            'companyName': stock.get('comapnyName', ''),
-                            'new52WHL': stock.get('new52WHL', 0),
-                            'prev52WHL': stock.get('prev52WHL', 0),
-                            'prevHLDate': stock.get('prevHLDate', ''),
-                            'ltp': stock.get('ltp', 0),
-                            'prevClose': stock.get('prevClose', 0),
-                            'change': stock.get('change', 0),
-                            'pChange': stock.get('pChange', 0)
-                        }
-                        low_stocks_data.append(stock_info)
-                
-                return {
-                    'success': True,
-                    'lowStocks': low_stocks_data,
-                    'count': len(low_stocks_data),
-                    'totalLow': data.get('low', 0),
-                    'timestamp': data.get('timestamp', '')
-                }
-            except Exception as e:
-                logger.error(f"Error processing 52-week low stocks: {str(e)}")
-                return {
-                    'success': False,
-                    'error': str(e)
-                }
-        
+            result['quotes'] = result['snapshot'].derive('quotes', QuoteIndex.from_payload)
         return result
+    
+    def get_all_indices(self):
+        """Get all indices from NSE"""
+        return self.get_dataset('indices')
+    
+    def get_52week_high_stocks(self):
+        """Get 52-week high stocks"""
+        return self.get_dataset('52week_high')
+    
+    def get_52week_low_stocks(self):
+        """Get 52-week low stocks"""
+        return self.get_dataset('52week_low')
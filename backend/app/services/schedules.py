@@ -0,0 +1,161 @@
+import csv
+import io
+import math
+from dataclasses import dataclass
+from app.services.calculator import PAYMENT, CalculatorError
+from app.utils.json_provider import dumps_bytes
+
+# Rows are buffered into chunks of about this many bytes before being yielded
+CHUNK_SIZE = 64 * 1024
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv'
+}
+
+def emi_schedule(amount, rate, years, frequency='monthly'):
+    """Amortization rows (period, payment, principal, interest, balance) for one loan"""
+    per_year = PAYMENT[frequency]
+    periodic = rate / 100 / per_year
+    periods = round(years * per_year)
+    if periodic == 0:
+        payment = amount / periods
+    else:
+        # Same form as parse_plans' range check, so whatever passed it cannot overflow here
+        growth = math.exp(periods * math.log1p(periodic))
+        payment = amount * periodic * growth / (growth - 1)
+
+    balance = amount
+    for period in range(1, periods + 1):
+        interest = balance * periodic
+        # The last installment clears whatever rounding has left
+        principal = balance if period == periods else payment - interest
+        balance -= principal
+        yield period, round(principal + interest, 2), round(principal, 2), round(interest, 2), round(balance, 2)
+
+def sip_schedule(amount, rate, years, frequency=None):
+    """Monthly rows (period, contribution, invested, returns, value) for one SIP, contributions at the start of each month"""
+    monthly = rate / 100 / 12
+    value = invested = 0.0
+    for period in range(1, round(years * 12) + 1):
+        invested += amount
+        value = (value + amount) * (1 + monthly)
+        yield period, amount, round(invested, 2), round(value - invested, 2), round(value, 2)
+
+@dataclass(frozen=True)
+class Schedule:
+    """A per-period schedule: `generate(amount, rate, years, frequency)` yields one tuple per period"""
+
+    name: str
+    generate: object
+    fields: tuple
+    frequencies: tuple
+    default_frequency: str
+
+SCHEDULES = {
+    schedule.name: schedule for schedule in (
+        Schedule('emi', emi_schedule, ('period', 'payment', 'principal', 'interest', 'balance'),
+                 tuple(PAYMENT), 'monthly'),
+        # sip_schedule always steps monthly, so no other frequency is accepted
+        Schedule('sip', sip_schedule, ('period', 'contribution', 'invested', 'returns', 'value'),
+                 ('monthly',), 'monthly')
+    )
+}
+
+def _number(plan, index, name):
+    try:
+        value = float(plan[name])
+    except KeyError:
+        raise CalculatorError(f"Plan {index}: missing '{name}'")
+    except (TypeError, ValueError):
+        raise CalculatorError(f"Plan {index}: '{name}' must be a number")
+    if value != value or value in (float('inf'), float('-inf')):
+        raise CalculatorError(f"Plan {index}: '{name}' must be finite")
+    return value
+
+def parse_plans(schedule, params, max_rows=None):
+    """
+    Validate a batch before anything is streamed.
+
+    `params` holds a `plans` list of `{"amount", "rate", "years"}` objects,
+    or a single plan's fields at the top level. Returns the plans, the
+    frequency and the total number of rows the schedule will produce.
+    """
+    frequency = params.get('frequency') or schedule.default_frequency
+    if frequency not in schedule.frequencies:
+        raise CalculatorError(f"'frequency' must be one of: {', '.join(schedule.frequencies)}")
+    per_year = PAYMENT[frequency]
+
+    raw = params.get('plans', [params])
+    if not isinstance(raw, list) or not raw:
+        raise CalculatorError("'plans' must be a non-empty list")
+
+    plans = []
+    rows = 0
+    for index, plan in enumerate(raw):
+        if not isinstance(plan, dict):
+            raise CalculatorError(f"Plan {index}: expected an object")
+        amount, rate, years = (_number(plan, index, name) for name in ('amount', 'rate', 'years'))
+        if amount < 0 or rate < 0:
+            raise CalculatorError(f"Plan {index}: 'amount' and 'rate' must not be negative")
+        periods = years * per_year
+        if periods < 1 or abs(periods - round(periods)) > 1e-9:
+            raise CalculatorError(f"Plan {index}: 'years' must be a positive whole number of {frequency} periods")
+        # Rows are generated after the response has started, so anything that would overflow is refused now
+        try:
+            growth = math.exp((round(periods) + 1) * math.log1p(rate / 100 / per_year))
+        except OverflowError:
+            growth = math.inf
+        if not math.isfinite(amount * periods * growth):
+            raise CalculatorError(f"Plan {index}: 'rate' and 'years' grow the amount beyond what can be computed")
+        plans.append((amount, rate, years))
+        rows += round(periods)
+
+    if max_rows is not None and rows > max_rows:
+        raise CalculatorError(f"{rows} schedule rows requested, the limit is {max_rows}")
+    return plans, frequency, rows
+
+def schedule_rows(schedule, plans, frequency):
+    """Every plan's rows in turn, each prefixed with the plan's index"""
+    for index, (amount, rate, years) in enumerate(plans):
+        for row in schedule.generate(amount, rate, years, frequency):
+            yield (index,) + row
+
+def ndjson_chunks(fields, rows, chunk_size=CHUNK_SIZE):
+    """Encode rows as newline-delimited JSON objects, yielded in chunks of about `chunk_size` bytes"""
+    buffer = []
+    size = 0
+    for row in rows:
+        line = dumps_bytes(dict(zip(fields, row))) + b'\n'
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield b''.join(buffer)
+
+def csv_chunks(fields, rows, chunk_size=CHUNK_SIZE):
+    """Encode rows as CSV with a header line, yielded in chunks of about `chunk_size` bytes"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+ENCODERS = {
+    'ndjson': ndjson_chunks,
+    'csv': csv_chunks
+}
+
+def stream_schedule(schedule, plans, frequency, output='ndjson', chunk_size=CHUNK_SIZE):
+    """Lazily encoded schedule for every plan; memory stays flat however many rows it holds"""
+    fields = ('plan',) + schedule.fields
+    return ENCODERS[output](fields, schedule_rows(schedule, plans, frequency), chunk_size)
@@ -0,0 +1,101 @@
+import mmap
+import os
+import tempfile
+from app.models.snapshot import decode_snapshot, encode_snapshot
+from app.services.snapshot_archive import ensure_private_directory, write_atomic
+from app.services.snapshot_store import SnapshotStore
+from app.utils.logger import logger
+
+def default_directory():
+    """tmpfs-backed when available, so snapshot files live in shared memory; one directory per user"""
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    owner = os.getuid() if hasattr(os, 'getuid') else os.getlogin()
+    return os.path.join(base, f"finance_api_snapshots-{owner}")
+
+class SharedSnapshotStore(SnapshotStore):
+    """
+    SnapshotStore shared between processes through memory-mapped files.
+
+    One writer process (the poller) publishes as usual, and every publish
+    is also written to `<directory>/<name>.snap`: the encoded JSON bodies,
+    their ETags and the payload as JSON. Files are replaced atomically
+    (temp file + rename), so a reader never maps a half-written snapshot.
+
+    Readers never fetch from NSE while the writer keeps the files fresh.
+    `get()` stats the dataset's file and, when it has been replaced, maps
+    it and adopts the snapshot as if it had been published locally:
+    history, versions and subscribers all behave the same. Encoding is
+    done once by the writer; readers only copy the body bytes out of the
+    mapping once per version. Versions come from the writer, so they agree
+    across workers.
+
+    Readers trust these files, so the directory must be private to the user
+    running the server; one that another user owns or can write to is
+    refused at startup.
+    """
+
+    def __init__(self, directory=None, history_size=32, writer=True):
+        super().__init__(history_size=history_size)
+        self.directory = directory or default_directory()
+        self.writer = writer
+        self._seen = {}
+        ensure_private_directory(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.snap")
+
+    def get(self, name):
+        if not self.writer:
+            self._sync(name)
+        return super().get(name)
+
+    def names(self):
+        if not self.writer:
+            for filename in os.listdir(self.directory):
+                if filename.endswith('.snap'):
+                    self._sync(filename[:-len('.snap')])
+        return super().names()
+
+    def publish(self, name, payload, ttl=float('inf'), stale=False):
+        snapshot = super().publish(name, payload, ttl, stale)
+        # Readers publish locally only when they had to fetch for themselves
+        if self.writer:
+            self._write(snapshot)
+        return snapshot
+
+    def _write(self, snapshot):
+        """Atomically replace the dataset's file with `snapshot`"""
+        try:
+            write_atomic(self.path(snapshot.name), encode_snapshot(snapshot))
+        except OSError as e:
+            logger.error("Error writing shared snapshot %s: %s", snapshot.name, e)
+
+    def _sync(self, name):
+        """Adopt the dataset's file if it has been replaced since it was last read"""
+        try:
+            stat = os.stat(self.path(name))
+        except FileNotFoundError:
+            return
+        if self._seen.get(name) == (stat.st_ino, stat.st_mtime_ns):
+            return
+
+        try:
+            with open(self.path(name), 'rb') as f:
+                stat = os.fstat(f.fileno())
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                    view = memoryview(mapping)
+                    try:
+                        previous = super().get(name)
+                        snapshot = decode_snapshot(view, previous)
+                    finally:
+                        view.release()
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.error("Error reading shared snapshot %s: %s", name, e)
+            return
+
+        with self._lock:
+            # Another thread adopted this file (or a newer one) first
+            if self._seen.get(name) == (stat.st_ino, stat.st_mtime_ns):
+                return
+            self._seen[name] = (stat.st_ino, stat.st_mtime_ns)
+        self._install(snapshot, previous is None or previous.version != snapshot.version)
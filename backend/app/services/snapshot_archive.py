@@ -0,0 +1,89 @@
+import os
+import tempfile
+from app.models.snapshot import decode_snapshot, encode_snapshot
+from app.utils.logger import logger
+
+def write_atomic(path, data):
+    """Replace `path` with `data` so readers see the old file or the new one, never a partial write"""
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+def ensure_private_directory(directory):
+    """
+    Create `directory` private to this user, refusing one anybody else controls.
+
+    `os.makedirs` leaves the mode of an existing directory alone, so a
+    directory created first by another user (e.g. under world-writable
+    /dev/shm) would let them plant snapshot files for us to serve.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):
+        return
+
+    info = os.stat(directory)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(
+            f"Snapshot directory {directory} must be owned by uid {os.getuid()} with mode 0700 "
+            f"(found uid {info.st_uid}, mode {info.st_mode & 0o777:o})"
+        )
+
+class SnapshotArchive:
+    """
+    Last published snapshot of each dataset, kept on disk across restarts.
+
+    Registered as a snapshot subscriber, it rewrites `<directory>/<name>.snap`
+    whenever a dataset's version changes, in the binary snapshot format
+    (encoded bodies, ETags and JSON payload) so a restored snapshot is
+    served without re-encoding. After a deploy or crash `NSEService` loads
+    these lazily and serves them, flagged as restored, until a live refresh
+    replaces them.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._saved_versions = {}
+        ensure_private_directory(directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, f"{name}.snap")
+
+    def save(self, snapshot):
+        """Snapshot subscriber: persist a dataset when its content changes"""
+        if snapshot.restored or self._saved_versions.get(snapshot.name) == snapshot.version:
+            return
+
+        try:
+            write_atomic(self.path(snapshot.name), encode_snapshot(snapshot))
+        except OSError as e:
+            logger.error("Error archiving %s snapshot: %s", snapshot.name, e)
+            return
+        self._saved_versions[snapshot.name] = snapshot.version
+
+    def load(self, name):
+        """The archived snapshot for a dataset, marked `restored`, or None"""
+        try:
+            with open(self.path(name), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error("Error reading archived %s snapshot: %s", name, e)
+            return None
+
+        try:
+            snapshot = decode_snapshot(data, restored=True)
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error("Discarding unreadable archived %s snapshot: %s", name, e)
+            return None
+        self._saved_versions[name] = snapshot.version
+        return snapshot
@@ -0,0 +1,125 @@
+import threading
+import time
+from collections import deque
+from app.models.snapshot import Snapshot
+from app.utils.logger import logger
+
+class SnapshotStore:
+    """
+    Thread-safe registry of the latest published snapshot per dataset.
+
+    Every change of content gets a new version: the publish time in
+    milliseconds, or one more than the previous version if that is not
+    larger, so versions only increase, even across restarts. The last
+    `history_size` versions of each dataset are kept in a ring buffer for
+    computing deltas.
+    """
+
+    def __init__(self, history_size=32):
+        self.history_size = history_size
+        self._snapshots = {}
+        self._history = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """Get the latest snapshot for a dataset, or None"""
+        return self._snapshots.get(name)
+
+    def names(self):
+        """Get the names of all published datasets"""
+        return list(self._snapshots)
+
+    def publish(self, name, payload, ttl=float('inf'), stale=False):
+        """Publish a new snapshot, replacing the previous one atomically"""
+        now = time.time()
+        snapshot = Snapshot(name=name, payload=payload, fetched_at=now, expires_at=now + ttl, modified_at=now, stale=stale)
+
+        # Encoded before taking the lock, which only guards the version bookkeeping
+        etag = snapshot.etag
+
+        # Unchanged content keeps its modification time (and therefore Last-Modified) and version.
+        # The snapshot is not shared yet, so it is still safe to amend in place. Reading the
+        # previous snapshot and installing this one happen under one lock, so concurrent
+        # publishes of a dataset never get the same version.
+        with self._lock:
+            previous = self._snapshots.get(name)
+            changed = previous is None or previous.etag != etag
+            if changed:
+                version = max(int(now * 1000), previous.version + 1 if previous is not None else 0)
+                object.__setattr__(snapshot, 'version', version)
+            else:
+                object.__setattr__(snapshot, 'modified_at', previous.modified_at)
+                object.__setattr__(snapshot, 'version', previous.version)
+            subscribers = self._store(snapshot, changed)
+
+        return self._notify(snapshot, subscribers)
+
+    def restore(self, snapshot):
+        """
+        Install a snapshot loaded from disk, unless the dataset was published meanwhile.
+
+        Subscribers are not notified: the data was already seen by the
+        process that published it.
+        """
+        with self._lock:
+            current = self._snapshots.get(snapshot.name)
+            if current is not None:
+                return current
+            self._snapshots[snapshot.name] = snapshot
+            history = self._history[snapshot.name] = deque(maxlen=self.history_size)
+            history.append(snapshot)
+        return snapshot
+
+    def _install(self, snapshot, changed):
+        """Make `snapshot` the latest for its dataset, record it if `changed`, and notify subscribers"""
+        with self._lock:
+            subscribers = self._store(snapshot, changed)
+        return self._notify(snapshot, subscribers)
+
+    def _store(self, snapshot, changed):
+        """Make `snapshot` the latest and record it if `changed`; returns the subscribers to notify (caller holds the lock)"""
+        name = snapshot.name
+        self._snapshots[name] = snapshot
+        if changed:
+            history = self._history.get(name)
+            if history is None:
+                history = self._history[name] = deque(maxlen=self.history_size)
+            history.append(snapshot)
+        return list(self._subscribers)
+
+    def _notify(self, snapshot, subscribers):
+        """Run subscribers outside the lock, so a slow one never blocks publishing"""
+        for callback in subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                logger.error("Error in snapshot subscriber for %s: %s", snapshot.name, e)
+
+        return snapshot
+
+    def at_version(self, name, version):
+        """Get a retained snapshot by version, or None once it has left the ring buffer"""
+        with self._lock:
+            history = list(self._history.get(name, ()))
+
+        for snapshot in reversed(history):
+            if snapshot.version == version:
+                return snapshot
+        return None
+
+    def versions(self, name):
+        """Get the retained versions of a dataset, oldest first"""
+        with self._lock:
+            return [snapshot.version for snapshot in self._history.get(name, ())]
+
+    def subscribe(self, callback):
+        """Register `callback(snapshot)` to run after every publish"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Remove a previously registered subscriber"""
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
@@ -0,0 +1,164 @@
+import queue
+import threading
+from app.models.diff import is_empty
+from app.utils.json_provider import dumps_bytes
+from app.utils.logger import logger
+
+# Datasets that can be streamed (each needs a schema `key` to diff by)
+STREAM_DATASETS = ('indices', 'nifty50')
+
+def sse_event(event, data, event_id=None):
+    """Encode one Server-Sent Event from an already encoded JSON body"""
+    head = f"id: {event_id}\nevent: {event}\n" if event_id is not None else f"event: {event}\n"
+    return head.encode() + b'data: ' + data + b'\n\n'
+
+class StreamClient:
+    """One connected stream consumer and its bounded event queue"""
+
+    __slots__ = ('name', 'queue', 'dropped')
+
+    def __init__(self, name, queue_size):
+        self.name = name
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, event, resync):
+        """Queue an event; a full queue is replaced by one full-snapshot event"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except queue.Full:
+            pass
+
+        # The client fell behind: its queued diffs no longer matter once it resyncs
+        while True:
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                break
+        self.queue.put_nowait(resync())
+        return False
+
+    def next_event(self, timeout):
+        """Wait for the next encoded event, or None after `timeout` seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class StreamHub:
+    """
+    Fans published snapshots out to Server-Sent Event clients as row diffs.
+
+    The hub subscribes to the `SnapshotStore` once, so every client shares
+    the same poller and NSE traffic does not grow with connections. Each
+    publish is diffed against the previous snapshot and encoded once, then
+    the same bytes are offered to every client's bounded queue. A client
+    whose queue is full has its backlog dropped and replaced with a single
+    full snapshot, so a slow consumer costs bounded memory and never blocks
+    the publisher.
+    """
+
+    def __init__(self, nse_service, datasets=STREAM_DATASETS, queue_size=32, max_clients=500):
+        self.nse_service = nse_service
+        self.datasets = tuple(datasets)
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self._clients = set()
+        self._previous = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'connections': 0,
+            'events': 0,
+            'resyncs': 0
+        }
+
+    def connect(self, name):
+        """Register a client for a dataset, or return None when at capacity"""
+        with self._lock:
+            if len(self._clients) >= self.max_clients:
+                return None
+            client = StreamClient(name, self.queue_size)
+            self._clients.add(client)
+            self._stats['connections'] += 1
+        logger.info("Stream client connected to %s (%s open)", name, len(self._clients))
+        return client
+
+    def disconnect(self, client):
+        """Remove a client and report how many events it lost to backpressure"""
+        with self._lock:
+            self._clients.discard(client)
+        logger.info("Stream client disconnected from %s (dropped %s events)", client.name, client.dropped)
+
+    def snapshot_event(self, snapshot):
+        """Full-snapshot event, reusing the snapshot's encoded body"""
+        return sse_event('snapshot', snapshot.body, snapshot.version)
+
+    def diff_event(self, diff, snapshot):
+        """Row-diff event, identified by the version it brings the client to"""
+        return sse_event('diff', dumps_bytes({'status': 'success', 'data': diff}), snapshot.version)
+
+    def initial_event(self, snapshot, last_event_id=None):
+        """First event for a client: a diff when it resumes from a retained version, else the full snapshot"""
+        if last_event_id is not None:
+            diff = self.nse_service.get_delta(snapshot, last_event_id)
+            if diff is not None:
+                return self.diff_event(diff, snapshot)
+        return self.snapshot_event(snapshot)
+
+    def current(self, name):
+        """The latest snapshot to start a new client from"""
+        snapshot = self._previous.get(name)
+        if snapshot is not None:
+            return snapshot
+
+        result = self.nse_service.get_snapshot(name)
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        return result['snapshot']
+
+    def on_snapshot(self, snapshot):
+        """Snapshot subscriber: diff against the previous publish and fan out"""
+        name = snapshot.name
+        if name not in self.datasets:
+            return
+
+        with self._lock:
+            previous = self._previous.get(name)
+            self._previous[name] = snapshot
+            if previous is None or previous.version == snapshot.version:
+                return
+
+            diff = self.nse_service.get_delta(snapshot, previous.version)
+            if diff is None or is_empty(diff):
+                return
+
+            event = self.diff_event(diff, snapshot)
+            resync_event = None
+
+            def resync():
+                nonlocal resync_event
+                if resync_event is None:
+                    resync_event = self.snapshot_event(snapshot)
+                return resync_event
+
+            clients = [client for client in self._clients if client.name == name]
+            for client in clients:
+                if not client.offer(event, resync):
+                    self._stats['resyncs'] += 1
+            self._stats['events'] += 1
+
+        logger.debug(
+            "Streamed %s diff v%s to %s clients (%s added, %s changed, %s removed)",
+            name, snapshot.version, len(clients), len(diff['added']), len(diff['changed']), len(diff['removed'])
+        )
+
+    def stats(self):
+        """Get open client, event and backpressure counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['clients'] = len(self._clients)
+            stats['dropped'] = sum(client.dropped for client in self._clients)
+            stats['queued'] = sum(client.queue.qsize() for client in self._clients)
+        return stats
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+import threading
+import time
+from app.models.quotes import NIFTY50_INDEX_SYMBOL
+from app.utils.logger import logger
+
+# Rollup intervals in seconds, maintained on every insert
+INTERVALS = {
+    '1m': 60,
+    '5m': 300,
+    '1h': 3600,
+    '1d': 86400
+}
+
+# Lookback windows accepted by history queries
+PERIODS = {
+    '1d': 86400,
+    '5d': 5 * 86400,
+    '1mo': 30 * 86400,
+    '3mo': 90 * 86400,
+    '6mo': 180 * 86400,
+    '1y': 365 * 86400,
+    'max': None
+}
+
+# Datasets recorded from published snapshots: name -> (rows key, price field, symbols to skip).
+# The Nifty 50 payload repeats the index row; the index is recorded from `indices` only,
+# so its bars come from one feed.
+RECORDED_DATASETS = {
+    'indices': ('indices', 'lastPrice', frozenset()),
+    'nifty50': ('stocks', 'lastPrice', frozenset({NIFTY50_INDEX_SYMBOL}))
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticks (
+    symbol TEXT NOT NULL,
+    ts REAL NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ticks_symbol_ts ON ticks (symbol, ts);
+CREATE TABLE IF NOT EXISTS bars (
+    symbol TEXT NOT NULL,
+    interval INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    ticks INTEGER NOT NULL,
+    PRIMARY KEY (symbol, interval, bucket)
+) WITHOUT ROWID;
+"""
+
+UPSERT_BAR = """
+INSERT INTO bars (symbol, interval, bucket, open, high, low, close, ticks)
+VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+ON CONFLICT (symbol, interval, bucket) DO UPDATE SET
+    high = max(high, excluded.high),
+    low = min(low, excluded.low),
+    close = excluded.close,
+    ticks = ticks + 1
+"""
+
+class TickStore:
+    """
+    Append-only SQLite store of intraday price ticks.
+
+    Every tick is appended to `ticks` and folded into OHLC rollups for each
+    interval in `INTERVALS` in the same transaction, so range queries read
+    precomputed bars instead of scanning raw ticks. Buckets are aligned to
+    exchange-local (IST) time so daily bars start at local midnight. Raw
+    ticks older than `retention_days` are pruned; bars are kept.
+    """
+
+    def __init__(self, path, utc_offset_minutes=330, retention_days=7):
+        self.path = path
+        self.offset = utc_offset_minutes * 60
+        self.retention = retention_days * 86400
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = self._connect()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(SCHEMA)
+        return conn
+
+    def bucket(self, ts, interval):
+        """Start of the exchange-local bucket containing `ts`"""
+        return int((ts + self.offset) // interval * interval - self.offset)
+
+    def record(self, ts, prices):
+        """Append one tick per (symbol, price) pair and update every rollup"""
+        ticks = [(symbol, ts, float(price)) for symbol, price in prices if symbol and price]
+        if not ticks:
+            return 0
+
+        bars = [
+            (symbol, interval, self.bucket(ts, interval), price, price, price, price)
+            for symbol, _, price in ticks
+            for interval in INTERVALS.values()
+        ]
+
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany('INSERT INTO ticks (symbol, ts, price) VALUES (?, ?, ?)', ticks)
+                self._conn.executemany(UPSERT_BAR, bars)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        if ts - self._last_prune > 3600:
+            self.prune(ts - self.retention)
+            self._last_prune = ts
+
+        return len(ticks)
+
+    def record_snapshot(self, snapshot):
+        """Snapshot subscriber: record prices from datasets whose content changed"""
+        if snapshot.name not in RECORDED_DATASETS:
+            return
+        # Republished, unchanged data would only add duplicate ticks
+        if snapshot.modified_at is not None and snapshot.modified_at != snapshot.fetched_at:
+            return
+
+        rows_key, price_field, skipped = RECORDED_DATASETS[snapshot.name]
+        rows = snapshot.payload.get(rows_key)
+        if not rows:
+            return
+
+        if hasattr(rows, 'column'):
+            prices = zip(rows.column('symbol'), rows.column(price_field))
+        else:
+            prices = ((row.get('symbol'), row.get(price_field)) for row in rows)
+        if skipped:
+            prices = ((symbol, price) for symbol, price in prices if symbol not in skipped)
+
+        count = self.record(snapshot.fetched_at, prices)
+        logger.debug("Recorded %s ticks from %s", count, snapshot.name)
+
+    def bars(self, symbol, interval='5m', start=None, end=None):
+        """Get OHLC bars for a symbol from the precomputed rollups"""
+        seconds = INTERVALS[interval]
+        start = self.bucket(start, seconds) if start is not None else 0
+        end = end if end is not None else time.time()
+
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT bucket, open, high, low, close, ticks FROM bars '
+                'WHERE symbol = ? AND interval = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket',
+                (symbol, seconds, start, end)
+            ).fetchall()
+
+        return [
+            {'time': bucket, 'open': open_, 'high': high, 'low': low, 'close': close, 'ticks': ticks}
+            for bucket, open_, high, low, close, ticks in rows
+        ]
+
+    def closes(self, symbols, interval='5m', start=None, end=None, limit=None):
+        """Get (buckets, rows) of closes, one value per symbol in order (None where missing)"""
+        seconds = INTERVALS[interval]
+        start = self.bucket(start, seconds) if start is not None else 0
+        end = end if end is not None else time.time()
+        column = {symbol: i for i, symbol in enumerate(symbols)}
+        placeholders = ', '.join('?' * len(column))
+        query = (
+            f"SELECT bucket, symbol, close FROM bars WHERE interval = ? AND bucket >= ? AND bucket <= ? "
+            f"AND symbol IN ({placeholders})"
+        )
+        params = [seconds, start, end, *column]
+
+        # Only the most recent `limit` bars, however far back they go
+        if limit is not None:
+            query += (
+                f" AND bucket >= (SELECT coalesce(min(bucket), 0) FROM (SELECT DISTINCT bucket FROM bars "
+                f"WHERE interval = ? AND bucket <= ? AND symbol IN ({placeholders}) ORDER BY bucket DESC LIMIT ?))"
+            )
+            params += [seconds, end, *column, limit]
+
+        with self._lock:
+            rows = self._conn.execute(query + ' ORDER BY bucket', params).fetchall()
+
+        buckets = []
+        matrix = []
+        for bucket, symbol, close in rows:
+            if not buckets or buckets[-1] != bucket:
+                buckets.append(bucket)
+                matrix.append([None] * len(symbols))
+            matrix[-1][column[symbol]] = close
+        return buckets, matrix
+
+    def history(self, symbol, period='1d', interval='5m', now=None):
+        """Get bars for a lookback period such as '5d' or '1y'"""
+        now = now if now is not None else time.time()
+        lookback = PERIODS[period]
+        start = now - lookback if lookback is not None else None
+        return self.bars(symbol, interval, start=start, end=now)
+
+    def ticks(self, symbol, start=0, end=None):
+        """Get raw (timestamp, price) ticks for a symbol"""
+        end = end if end is not None else time.time()
+
+        with self._lock:
+            return self._conn.execute(
+                'SELECT ts, price FROM ticks WHERE symbol = ? AND ts >= ? AND ts <= ? ORDER BY ts',
+                (symbol, start, end)
+            ).fetchall()
+
+    def symbols(self):
+        """Get every symbol with recorded bars"""
+        with self._lock:
+            rows = self._conn.execute('SELECT DISTINCT symbol FROM bars WHERE interval = ?', (INTERVALS['1d'],)).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, before):
+        """Delete raw ticks older than `before` (rollups are kept)"""
+        with self._lock:
+            deleted = self._conn.execute('DELETE FROM ticks WHERE ts < ?', (before,)).rowcount
+        if deleted:
+            logger.info("Pruned %s ticks older than %.0f", deleted, before)
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def reopen(self):
+        """
+        Open a fresh connection after `close()`.
+
+        SQLite connections must not cross a fork, so a preloading server
+        closes the store in the master and reopens it in each worker.
+        """
+        self._lock = threading.Lock()
+        self._conn = self._connect()
@@ -0,0 +1,189 @@
+import threading
+import time
+from app.utils.logger import logger
+
+class _CacheEntry:
+    """A cached value and the time it was stored"""
+
+    __slots__ = ('value', 'stored_at', 'expires_at')
+
+    def __init__(self, value, ttl):
+        self.value = value
+        self.stored_at = time.monotonic()
+        self.expires_at = self.stored_at + ttl
+
+class _Flight:
+    """An in-progress load that other callers can wait on"""
+
+    __slots__ = ('event', 'value', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+class SnapshotCache:
+    """
+    Thread-safe TTL cache with single-flight loading and stale-while-revalidate.
+
+    Each key has its own TTL. On a miss only one caller runs the loader and
+    any concurrent callers for the same key wait for that result. Once an
+    entry expires it is still served for `stale_ttl` seconds while a single
+    background refresh replaces it.
+
+    With `max_entries`, storing a new key beyond the limit evicts the
+    longest-stored entries first.
+    """
+
+    def __init__(self, default_ttl=30, ttls=None, stale_ttl=300, max_entries=None):
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls or {})
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'errors': 0,
+            'evictions': 0
+        }
+
+    def ttl_for(self, key):
+        """Get the TTL configured for a key"""
+        return self.ttls.get(key, self.default_ttl)
+
+    def get(self, key, loader):
+        """Get a value, calling `loader()` on a miss"""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and now < entry.expires_at:
+                self._stats['hits'] += 1
+                return entry.value
+
+            if entry is not None and now < entry.expires_at + self.stale_ttl:
+                self._stats['stale_hits'] += 1
+                if key not in self._flights:
+                    self._start_background_refresh(key, loader)
+                return entry.value
+
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                self._stats['misses'] += 1
+                flight = self._flights[key] = _Flight()
+                leader = True
+
+        if leader:
+            self._load(key, loader, flight)
+        else:
+            flight.event.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def peek(self, key, allow_stale=False):
+        """Get a cached value without loading, or None if there is none"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+        if not allow_stale and time.monotonic() >= entry.expires_at:
+            return None
+        return entry.value
+
+    def refresh(self, key, loader, max_age=0):
+        """Load a key now, sharing any load in flight and reusing entries younger than `max_age`"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry.stored_at < max_age:
+                return entry.value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                self._stats['refreshes'] += 1
+                flight = self._flights[key] = _Flight()
+
+        if leader:
+            self._load(key, loader, flight)
+        else:
+            flight.event.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def set(self, key, value):
+        """Store a value directly"""
+        with self._lock:
+            self._store(key, value)
+
+    def invalidate(self, key=None):
+        """Drop one key, or every key when none is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        """Get hit, miss and refresh counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['inflight'] = len(self._flights)
+
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = round((stats['hits'] + stats['stale_hits']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _store(self, key, value):
+        """Store an entry as the newest, evicting the oldest past `max_entries` (caller holds the lock)"""
+        self._entries.pop(key, None)
+        self._entries[key] = _CacheEntry(value, self.ttl_for(key))
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+                self._stats['evictions'] += 1
+
+    def _start_background_refresh(self, key, loader):
+        """Refresh a stale key on a daemon thread (caller holds the lock)"""
+        self._stats['refreshes'] += 1
+        flight = self._flights[key] = _Flight()
+        thread = threading.Thread(
+            target=self._load,
+            args=(key, loader, flight),
+            name=f"cache-refresh-{key}",
+            daemon=True
+        )
+        thread.start()
+
+    def _load(self, key, loader, flight):
+        """Run the loader, store the result and release any waiters"""
+        try:
+            value = loader()
+        except Exception as e:
+            logger.error("Error loading cache key %s: %s", key, e)
+            with self._lock:
+                self._stats['errors'] += 1
+            flight.error = e
+        else:
+            flight.value = value
+            with self._lock:
+                self._store(key, value)
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
@@ -0,0 +1,85 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Leave datetimes to Flask's `default` so both paths emit the same HTTP-date strings.
+# NumPy arrays are written directly from their buffers.
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+def _default(obj):
+    """Encode objects exposing `__json__`, NumPy arrays, then anything Flask's provider can"""
+    to_json = getattr(obj, '__json__', None)
+    if to_json is not None:
+        return to_json()
+    if type(obj).__module__ == 'numpy':
+        return obj.tolist()
+    return DefaultJSONProvider.default(obj)
+
+def dumps_bytes(obj):
+    """Serialize to compact JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS)
+
+    options = {'default': _default, 'separators': (',', ':'), 'ensure_ascii': False, 'allow_nan': False}
+    try:
+        text = json.dumps(obj, **options)
+    except ValueError:
+        # Only pay for the rewrite when the payload actually holds NaN/Infinity
+        text = json.dumps(_replace_non_finite(obj), **options)
+    return text.encode('utf-8')
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider backed by orjson, falling back to the stdlib encoder.
+
+    Keys keep their insertion order (NSE field order is meaningful) and
+    decimals, dates, UUIDs and dataclasses are encoded exactly as Flask's
+    default provider encodes them. Non-finite floats are emitted as `null`
+    on both paths so the output is always valid JSON.
+    """
+
+    sort_keys = False
+
+    default = staticmethod(_default)
+
+    def dumps(self, obj, **kwargs):
+        """Serialize to a JSON string"""
+        if kwargs.get('indent') or kwargs.get('sort_keys'):
+            kwargs.setdefault('default', _default)
+            return json.dumps(_replace_non_finite(obj), **kwargs)
+        return dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Deserialize JSON text or bytes"""
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Serialize the arguments into an `application/json` response"""
+        obj = self._prepare_response_obj(args, kwargs)
+
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            body = self.dumps(obj, indent=2) + '\n'
+        else:
+            body = dumps_bytes(obj) + b'\n'
+
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+def _replace_non_finite(obj):
+    """Replace NaN/Infinity with None, matching orjson's output"""
+    if isinstance(obj, float):
+        return obj if obj == obj and obj not in (float('inf'), float('-inf')) else None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    if hasattr(obj, '__json__'):
+        return _replace_non_finite(obj.__json__())
+    if type(obj).__module__ == 'numpy':
+        return _replace_non_finite(obj.tolist())
+    return obj
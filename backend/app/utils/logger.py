@@ -1,42 +1,100 @@
+import atexit
 import logging
 import os
-from datetime import datetime
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
 from app.config.config import Config
 
-def setup_logger(name='finance_api'):
-    """Setup application logger"""
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs('logs', exist_ok=True)
-    
-    # Create logger
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves all formatting to the listener thread.
+
+    The stock handler merges `%` arguments into the message on the calling
+    thread. Records never leave this process, so the listener can do it.
+    """
+
+    def prepare(self, record):
+        return record
+
+_listener = None
+
+def _file_handler(log_file, rotation, max_bytes, backup_count, when):
+    """Rotating file handler by size (`rotation='size'`) or time (`rotation='time'`)"""
+    directory = os.path.dirname(log_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if rotation == 'time':
+        return TimedRotatingFileHandler(log_file, when=when, backupCount=backup_count, delay=True)
+    return RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, delay=True)
+
+def setup_logger(name='finance_api', level=None, log_file=None, log_format=None,
+                 rotation=None, max_bytes=None, backup_count=None, when=None):
+    """
+    Setup application logger.
+
+    The logger only enqueues records; a `QueueListener` thread formats them
+    and writes to the console and a rotating log file, so request threads
+    never block on disk I/O. Calling it again (e.g. from `create_app` with
+    the active config) replaces the handlers and level.
+    """
+    global _listener
+
+    level = level or Config.LOG_LEVEL
+    log_file = Config.LOG_FILE if log_file is None else log_file
+    formatter = logging.Formatter(log_format or Config.LOG_FORMAT)
+
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(_file_handler(
+            log_file,
+            rotation or Config.LOG_ROTATION,
+            max_bytes or Config.LOG_MAX_BYTES,
+            backup_count or Config.LOG_BACKUP_COUNT,
+            when or Config.LOG_ROTATE_WHEN
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    
-    # Prevent duplicate handlers
-    if logger.handlers:
-        return logger
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # File handler
-    file_handler = logging.FileHandler('logs/app.log')
-    file_handler.setLevel(logging.INFO)
-    file_handler.setFormatter(formatter)
-    
-    # Console handler
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    
-    # Add handlers to logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
-    
+    logger.setLevel(level)
+
+    # Flush and replace any previous pipeline
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(_DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
     return logger
 
-# Create default logger instance
-logger = setup_logger()
+def configure_logging(config):
+    """Apply an app config's logging settings to the application logger"""
+    return setup_logger(
+        level=config['LOG_LEVEL'],
+        log_file=config['LOG_FILE'] or '',
+        log_format=config['LOG_FORMAT'],
+        rotation=config['LOG_ROTATION'],
+        max_bytes=config['LOG_MAX_BYTES'],
+        backup_count=config['LOG_BACKUP_COUNT'],
+        when=config['LOG_ROTATE_WHEN']
+    )
+
+def stop_logging():
+    """Drain queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+# Create default logger instance. Console only until an app applies its config
+# (`create_app` -> `configure_logging`), so importing the package writes no log file.
+logger = setup_logger(log_file='')
@@ -0,0 +1,159 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Latency buckets in seconds, from cache hits (sub-millisecond) to slow NSE round trips
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values, extra=''):
+    """Render a `{name="value",...}` label set"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _number(value):
+    """Render a sample value"""
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """
+    Cumulative-bucket histogram, one series per label combination.
+
+    `observe` is a bisect and three increments under a lock, cheap enough
+    to leave on every request.
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        """Record one observation"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *label_values):
+        """Observe the duration of a block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def snapshot(self, *label_values):
+        """(bucket counts, sum, count) for one series, for tests and debugging"""
+        with self._lock:
+            counts, total, count = self._series.get(label_values, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            return list(counts), total, count
+
+    def samples(self):
+        """Exposition lines for every series"""
+        with self._lock:
+            series = [(values, list(counts), total, count) for values, (counts, total, count) in self._series.items()]
+
+        lines = []
+        bounds = self.buckets + (float('inf'),)
+        for values, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {count}")
+        return lines
+
+class Callback:
+    """Counter or gauge whose values are read from `collect()` at scrape time"""
+
+    def __init__(self, name, documentation, collect, labels=(), kind='gauge'):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.kind = kind
+        self.collect = collect
+
+    def samples(self):
+        """Exposition lines from the callback's `{label values: value}` mapping (or a bare value)"""
+        values = self.collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        return [f"{self.name}{_labels(self.labels, key)} {_number(value)}" for key, value in values.items()]
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """Add a metric, replacing any previous one with the same name"""
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def callback(self, name, documentation, collect, labels=(), kind='gauge'):
+        return self.register(Callback(name, documentation, collect, labels, kind))
+
+    def render(self):
+        """The whole registry as Prometheus text exposition"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+# Default registry and the application's metrics
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Time spent handling a request, by route', ('route', 'method', 'status')
+)
+RESPONSE_SIZE = registry.histogram(
+    'http_response_size_bytes', 'Size of non-streamed response bodies, by route', ('route',), SIZE_BUCKETS
+)
+UPSTREAM_LATENCY = registry.histogram(
+    'nse_upstream_fetch_seconds', 'Time spent fetching and decoding an NSE endpoint', ('endpoint', 'outcome')
+)
+COINGECKO_LATENCY = registry.histogram(
+    'coingecko_upstream_fetch_seconds', 'Time spent fetching and decoding a CoinGecko endpoint', ('endpoint', 'outcome')
+)
+TRANSFORM_LATENCY = registry.histogram(
+    'nse_transform_seconds', 'Time spent mapping an NSE response through its dataset schema', ('dataset',)
+)
+ENCODE_LATENCY = registry.histogram(
+    'snapshot_encode_seconds', 'Time spent serializing a snapshot body to JSON', ('dataset',)
+)
@@ -0,0 +1,145 @@
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from app.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`. Callers
+    reserve a token up front and then wait out any deficit, so concurrent
+    callers are spaced evenly instead of all retrying at once.
+
+    The bucket also holds a pause deadline (`pause`, `paused_for`) for
+    callers to honour after the upstream itself says to slow down, so it
+    is shared exactly as widely as the rate.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._updated = self._clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _clock(self):
+        return time.monotonic()
+
+    @contextmanager
+    def _state(self):
+        """Hold exclusive access to the bucket state"""
+        with self._lock:
+            yield
+
+    def _refill(self, now):
+        """Add the tokens accrued since the last update (caller holds the state)"""
+        self._tokens = min(self.burst, self._tokens + max(now - self._updated, 0) * self.rate)
+        self._updated = now
+
+    def reserve(self, max_wait=None):
+        """
+        Take one token and return how many seconds to wait before using it.
+
+        With `max_wait`, a token that could not be used within that many
+        seconds is left in the bucket and None is returned instead.
+        """
+        with self._state():
+            self._refill(self._clock())
+            wait = max(1 - self._tokens, 0.0) / self.rate
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+    def wait_time(self):
+        """Seconds until a token would be available, without taking one"""
+        with self._state():
+            self._refill(self._clock())
+            return max(1 - self._tokens, 0.0) / self.rate
+
+    def try_acquire(self):
+        """Take one token if one is available right now"""
+        with self._state():
+            self._refill(self._clock())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, max_wait=None):
+        """Block until a token is available; with `max_wait`, return False rather than wait longer"""
+        wait = self.reserve(max_wait)
+        if wait is None:
+            return False
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def pause(self, seconds):
+        """Record that the upstream must not be called for `seconds`, extending any current pause"""
+        with self._state():
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def paused_for(self):
+        """Seconds left in the current pause"""
+        with self._state():
+            return max(self._paused_until - self._clock(), 0.0)
+
+class FileTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a small file shared by every process.
+
+    The state (tokens, last update and pause deadline as wall-clock times)
+    is read and written under an exclusive `flock`, so all gunicorn workers
+    on a host draw from one bucket, the configured rate holds globally and
+    a pause set by one worker holds for all of them.
+    """
+
+    _STATE = struct.Struct('ddd')
+
+    def __init__(self, rate, burst=1, path=None):
+        self.path = path
+        super().__init__(rate, burst)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        os.close(fd)
+
+    def _clock(self):
+        return time.time()
+
+    @contextmanager
+    def _state(self):
+        """Lock the state file, load it, and write it back on exit"""
+        with self._lock, open(self.path, 'r+b') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                raw = handle.read(self._STATE.size)
+                if len(raw) == self._STATE.size:
+                    self._tokens, self._updated, self._paused_until = self._STATE.unpack(raw)
+                else:
+                    self._tokens, self._updated, self._paused_until = self.burst, self._clock(), 0.0
+
+                yield
+
+                handle.seek(0)
+                handle.write(self._STATE.pack(self._tokens, self._updated, self._paused_until))
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+def create_rate_limiter(rate, burst, backend='memory', path=None):
+    """Create a process-local or host-wide token bucket"""
+    if backend == 'file':
+        if fcntl is not None:
+            return FileTokenBucket(rate, burst, path=path)
+        logger.warning("File rate limiter backend needs fcntl, falling back to in-process limiter")
+
+    return TokenBucket(rate, burst)
@@ -1,9 +1,16 @@
 from flask import Flask, jsonify
 from flask_cors import CORS
-from nsepython import nsefetch
+from app.config.config import Config
+from app.services.nse_client import NSEClient
 
 app = Flask(__name__)
 
+_client = NSEClient(Config.NSE_BASE_URL, Config.NSE_HOME_URL, timeout=Config.NSE_TIMEOUT)
+
+def nsefetch(url):
+    """Fetch a full nseindia.com API URL through the pooled NSE client"""
+    return _client.get_json(url.split('/api/', 1)[1])
+
 # Configure CORS
 CORS(app)
 
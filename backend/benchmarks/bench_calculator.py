@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Calculator benchmark: vectorized grid evaluation against a per-scenario loop.
+
+For each calculator, evaluates an amount x rate x years grid once with the
+NumPy engine behind /api/calc and once with a plain Python loop calling the
+scalar formula per scenario (the way the frontend calculators compute one
+result), checks both agree and reports scenarios per second and the speedup.
+Also times the full POST /api/calc/<name> round trip, JSON encoding included.
+
+Then streams 30-year monthly EMI schedules for growing batches of loans in
+each output format, reporting rows per second and peak traced memory, which
+should stay flat as the batch grows.
+
+    python benchmarks/bench_calculator.py [--amounts 100] [--rates 100] [--years 30]
+        [--repeat 5] [--plans 10 100 1000]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app
+from app.services.calculator import CALCULATORS, COMPOUNDING, PAYMENT, evaluate
+from app.services.schedules import FORMATS, SCHEDULES, stream_schedule
+from app.utils.logger import setup_logger
+
+def naive_sip(amount, rate, years, frequency):
+    monthly = rate / 100 / 12
+    months = years * 12
+    if monthly == 0:
+        return amount * months
+    return amount * ((1 + monthly) ** months - 1) / monthly * (1 + monthly)
+
+def naive_lumpsum(amount, rate, years, frequency):
+    return amount * (1 + rate / 100) ** years
+
+def naive_emi(amount, rate, years, frequency):
+    per_year = PAYMENT[frequency]
+    periodic = rate / 100 / per_year
+    periods = years * per_year
+    if periodic == 0:
+        return amount / periods
+    growth = (1 + periodic) ** periods
+    return amount * periodic * growth / (growth - 1)
+
+def naive_compound(amount, rate, years, frequency):
+    per_year = COMPOUNDING[frequency]
+    return amount * (1 + rate / 100 / per_year) ** (years * per_year)
+
+def naive_simple(amount, rate, years, frequency):
+    return amount + amount * rate / 100 * years
+
+def naive_present_value(amount, rate, years, frequency):
+    per_year = COMPOUNDING[frequency]
+    return amount / (1 + rate / 100 / per_year) ** (years * per_year)
+
+# Calculator -> (scalar formula, the output it should match)
+NAIVE = {
+    'sip': (naive_sip, 'maturityAmount'),
+    'lumpsum': (naive_lumpsum, 'maturityAmount'),
+    'emi': (naive_emi, 'emi'),
+    'compound-interest': (naive_compound, 'maturityAmount'),
+    'simple-interest': (naive_simple, 'maturityAmount'),
+    'future-value': (naive_compound, 'futureValue'),
+    'present-value': (naive_present_value, 'presentValue')
+}
+
+def grid_params(amounts, rates, years):
+    return {
+        'amount': {'start': 1000, 'stop': 1000000, 'num': amounts},
+        'rate': {'start': 0, 'stop': 20, 'num': rates},
+        'years': {'start': 1, 'stop': years, 'num': years}
+    }
+
+def naive_loop(name, params):
+    """Every scenario through the scalar formula, as nested lists"""
+    formula, _ = NAIVE[name]
+    calculator = CALCULATORS[name]
+    axes = {axis: evaluate(calculator, params)['axes'][axis].tolist() for axis in ('amount', 'rate', 'years')}
+    frequency = calculator.default_frequency
+    return [[[formula(amount, rate, years, frequency) for years in axes['years']]
+             for rate in axes['rate']]
+            for amount in axes['amount']]
+
+def best_of(repeat, function):
+    """Fastest of `repeat` runs, in seconds, and the last result"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def run_suite(amounts=100, rates=100, years=30, repeat=5):
+    """Time every calculator both ways; returns one row per calculator"""
+    setup_logger(level='WARNING', log_file='')
+    app = create_app('testing', start_background=False)
+    app.config['CALC_MAX_SCENARIOS'] = amounts * rates * years
+    # Encode compactly, as production does (debug pretty-prints with the stdlib encoder)
+    app.json.compact = True
+    client = app.test_client()
+    params = grid_params(amounts, rates, years)
+
+    rows = []
+    for name, (_, output) in NAIVE.items():
+        calculator = CALCULATORS[name]
+        vectorized, result = best_of(repeat, lambda: evaluate(calculator, params))
+        naive, expected = best_of(max(1, repeat // 5), lambda: naive_loop(name, params))
+        http, response = best_of(repeat, lambda: client.post(f"/api/calc/{name}", json=params))
+        assert response.status_code == 200, response.get_data(as_text=True)
+        np.testing.assert_allclose(result['results'][output], expected, rtol=1e-9)
+
+        rows.append({
+            'calculator': name,
+            'scenarios': result['scenarios'],
+            'naive': naive,
+            'vectorized': vectorized,
+            'http': http,
+            'speedup': naive / vectorized
+        })
+    return rows
+
+def run_schedule_suite(plan_counts=(10, 100, 1000), years=30):
+    """Stream EMI schedules for each batch size and format; returns one row per run"""
+    rows = []
+    for output in FORMATS:
+        for count in plan_counts:
+            plans = [(100000.0 + i * 1000, 6 + i % 10, years) for i in range(count)]
+            tracemalloc.start()
+            start = time.perf_counter()
+            size = sum(len(chunk) for chunk in stream_schedule(SCHEDULES['emi'], plans, 'monthly', output))
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            rows.append({
+                'format': output,
+                'plans': count,
+                'rows': count * years * 12,
+                'bytes': size,
+                'seconds': elapsed,
+                'peak': peak
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--amounts', type=int, default=100)
+    parser.add_argument('--rates', type=int, default=100)
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--plans', type=int, nargs='+', default=[10, 100, 1000], help='loans per streamed schedule batch')
+    args = parser.parse_args()
+
+    rows = run_suite(args.amounts, args.rates, args.years, args.repeat)
+    print(f"{args.amounts} x {args.rates} x {args.years} grid, best of {args.repeat}")
+    print(f"  {'calculator':<18} {'scenarios':>9} {'naive ms':>9} {'numpy ms':>9} {'speedup':>8} {'HTTP ms':>9}")
+    for row in rows:
+        print(f"  {row['calculator']:<18} {row['scenarios']:>9} {row['naive'] * 1000:>9.2f} "
+              f"{row['vectorized'] * 1000:>9.2f} {row['speedup']:>7.1f}x {row['http'] * 1000:>9.2f}")
+
+    print(f"\nStreamed {args.years}-year monthly EMI schedules (rates include tracemalloc overhead)")
+    print(f"  {'format':<7} {'plans':>6} {'rows':>9} {'MiB out':>8} {'rows/s':>9} {'peak KiB':>9}")
+    for row in run_schedule_suite(args.plans, args.years):
+        print(f"  {row['format']:<7} {row['plans']:>6} {row['rows']:>9} {row['bytes'] / 2 ** 20:>8.1f} "
+              f"{row['rows'] / row['seconds']:>9.0f} {row['peak'] / 1024:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Downsampling benchmark: time, payload size and shape error per method.
+
+Reduces random-walk price series of each size to a fixed number of points
+with LTTB and min/max decimation and reports the reduction time, the JSON
+size of the `[[time, price], ...]` series before and after, and how far the
+downsampled line strays from the original: the largest gap between each
+original point and the reduced line interpolated at its time, as a
+fraction of the series' range. A second call through `Downsampler` is
+timed to show the per-version cache.
+
+    python benchmarks/bench_downsampling.py [--sizes 1000 10000 100000 1000000]
+        [--points 500]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.downsampling import METHODS, Downsampler
+
+def random_walk(size, seed=7):
+    """Millisecond timestamps one minute apart and a random-walk price"""
+    rng = np.random.default_rng(seed)
+    return np.arange(size) * 60000.0 + 1.7e12, 30000 + np.cumsum(rng.standard_normal(size) * 20)
+
+def shape_error(x, y, selected):
+    """Largest deviation of the original from the downsampled line, relative to the range"""
+    line = np.interp(x, x[selected], y[selected])
+    return float(np.abs(line - y).max() / (y.max() - y.min()))
+
+def run_suite(sizes=(1000, 10000, 100000, 1000000), points=500):
+    """Reduce each series with every method; returns one row per (size, method)"""
+    rows = []
+    for size in sizes:
+        x, y = random_walk(size)
+        original = len(json.dumps(np.column_stack([x, y]).tolist()))
+        for method, reduce in METHODS.items():
+            start = time.perf_counter()
+            selected = reduce(x, y, points)
+            elapsed = time.perf_counter() - start
+
+            downsampler = Downsampler()
+            downsampler.indices('series', size, x, y, points, method)
+            start = time.perf_counter()
+            downsampler.indices('series', size, x, y, points, method)
+            cached = time.perf_counter() - start
+
+            rows.append({
+                'size': size,
+                'method': method,
+                'points': len(selected),
+                'seconds': elapsed,
+                'cached': cached,
+                'bytes': original,
+                'reduced_bytes': len(json.dumps(np.column_stack([x[selected], y[selected]]).tolist())),
+                'error': shape_error(x, y, selected)
+            })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--points', type=int, default=500)
+    args = parser.parse_args()
+
+    rows = run_suite(args.sizes, args.points)
+    print(f"Random-walk series reduced to {args.points} points")
+    print(f"  {'size':>9} {'method':>7} {'points':>6} {'ms':>8} {'cached ms':>9} {'JSON KB':>9} {'reduced':>8} {'shrink':>7} {'error':>7}")
+    for row in rows:
+        print(f"  {row['size']:>9} {row['method']:>7} {row['points']:>6} {row['seconds'] * 1000:>8.2f} "
+              f"{row['cached'] * 1000:>9.3f} {row['bytes'] / 1024:>9.0f} {row['reduced_bytes'] / 1024:>8.1f} "
+              f"{row['bytes'] / row['reduced_bytes']:>6.0f}x {row['error']:>6.1%}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Offline endpoint benchmark: replay recorded NSE fixtures through NSEService
+and the Flask test client.
+
+Each endpoint is measured at the recorded size and at synthetic multiples
+(--scales), both warm (snapshot already published) and cold (every request
+fetches from the fixture, transforms and encodes). Reports throughput,
+p50/p99 latency and peak traced memory, and compares p50 and memory with
+a stored baseline so regressions show up without network access.
+
+    python benchmarks/bench_endpoints.py [--iterations 200] [--scales 1 10]
+    python benchmarks/bench_endpoints.py --save-baseline
+    python benchmarks/bench_endpoints.py --check   # exit 1 on regression
+"""
+
+import argparse
+import copy
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app import create_app
+from app.api import routes
+from app.services.nse_service import DATASETS
+from app.services.snapshot_store import SnapshotStore
+from app.utils.logger import logger
+from app.utils.rate_limiter import TokenBucket
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(BENCH_DIR, 'fixtures')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+# Fixture file -> dataset whose endpoint it answers
+FIXTURES = {
+    'allIndices': 'indices',
+    'nifty50': 'nifty50',
+    '52week_high': '52week_high',
+    '52week_low': '52week_low'
+}
+
+# Benchmarked routes and the dataset each one reads
+ENDPOINTS = (
+    ('/api/indices/all', 'indices'),
+    ('/api/nifty50/stocks', 'nifty50'),
+    ('/api/nifty50/stock/RELIANCE', 'nifty50'),
+    ('/api/nifty50/market-overview', 'nifty50'),
+    ('/api/live/52week-high', '52week_high'),
+    ('/api/live/52week-low', '52week_low')
+)
+
+MEMORY_ITERATIONS = 10
+
+def scale_rows(rows, scale, keep=0):
+    """Repeat rows `scale` times with suffixed symbols; the first `keep` rows appear once"""
+    scaled = list(rows)
+    for copy_number in range(1, scale):
+        for row in rows[keep:]:
+            row = copy.deepcopy(row)
+            for key in ('symbol', 'indexSymbol', 'index'):
+                if key in row:
+                    row[key] = f"{row[key]}-{copy_number}"
+            scaled.append(row)
+    return scaled
+
+def load_fixtures(scale=1):
+    """Recorded responses keyed by NSE endpoint, with rows multiplied by `scale`"""
+    responses = {}
+    for name, dataset in FIXTURES.items():
+        with open(os.path.join(FIXTURES_DIR, f"{name}.json")) as f:
+            data = json.load(f)
+        # The NIFTY 50 index row stays unique
+        data['data'] = scale_rows(data['data'], scale, keep=1 if dataset == 'nifty50' else 0)
+        responses[DATASETS[dataset].endpoint] = data
+    return responses
+
+class FixtureClient:
+    """Stands in for NSEClient, answering every endpoint from recorded fixtures"""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = 0
+
+    def get_json(self, endpoint):
+        self.requests += 1
+        return self.responses[endpoint]
+
+    def close(self):
+        pass
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class Harness:
+    """A testing app whose NSEService replays fixtures instead of calling NSE"""
+
+    def __init__(self):
+        self.app = create_app('testing')
+        # Per-request log lines would dominate the measurements; restored by close()
+        self._log_level = logger.level
+        logger.setLevel('WARNING')
+        self.client = self.app.test_client()
+        self.service = routes.nse_service
+        self._originals = (self.service.client, self.service.rate_limiter, self.service.snapshots)
+        self.service.rate_limiter = TokenBucket(rate=1e9, burst=1e9)
+
+    def close(self):
+        """Give the shared service back its real client, limiter and snapshots, and the logger its level"""
+        self.service.client, self.service.rate_limiter, self.service.snapshots = self._originals
+        logger.setLevel(self._log_level)
+        self.service.cache.invalidate()
+
+    def use_fixtures(self, responses):
+        self.service.client = FixtureClient(responses)
+        self.reset()
+
+    def reset(self):
+        """Drop cached responses and published snapshots, so the next request is cold"""
+        self.service.cache.invalidate()
+        self.service.snapshots = SnapshotStore(history_size=self.service.snapshots.history_size)
+
+    def request(self, path):
+        response = self.client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return response
+
+    def measure(self, path, iterations, cold):
+        """Latency samples (seconds) for `iterations` requests"""
+        if not cold:
+            self.request(path)
+
+        latencies = []
+        for _ in range(iterations):
+            if cold:
+                self.reset()
+            start = time.perf_counter()
+            self.request(path)
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    def peak_memory(self, path, cold):
+        """Peak traced allocation (bytes) across a few requests"""
+        if not cold:
+            self.request(path)
+        tracemalloc.start()
+        try:
+            for _ in range(MEMORY_ITERATIONS):
+                if cold:
+                    self.reset()
+                self.request(path)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+def run_suite(iterations=200, scales=(1, 10), endpoints=ENDPOINTS):
+    """Run every endpoint x scale x mode case, keyed by 'path|scale|mode'"""
+    harness = Harness()
+    results = {}
+
+    try:
+        for scale in scales:
+            harness.use_fixtures(load_fixtures(scale))
+            for path, _ in endpoints:
+                for mode in ('warm', 'cold'):
+                    cold = mode == 'cold'
+                    latencies = sorted(harness.measure(path, iterations, cold))
+                    results[f"{path}|{scale}x|{mode}"] = {
+                        'rps': round(len(latencies) / sum(latencies), 1),
+                        'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+                        'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+                        'peak_kib': round(harness.peak_memory(path, cold) / 1024, 1)
+                    }
+    finally:
+        harness.close()
+    return results
+
+def compare(results, baseline, tolerance):
+    """Cases whose p50 latency or peak memory grew more than `tolerance` over the baseline"""
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get('results', {}).get(case)
+        if previous is None:
+            continue
+        for metric in ('p50_ms', 'peak_kib'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append((case, metric, previous[metric], current[metric]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 if any case regressed')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='allowed growth over the baseline (0.3 = 30%%)')
+    args = parser.parse_args()
+
+    results = run_suite(args.iterations, args.scales)
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{args.iterations} requests per case, Python {platform.python_version()}")
+    print(f"  {'case':<44} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>9} {'vs base':>8}")
+    for case, result in results.items():
+        previous = baseline.get('results', {}).get(case)
+        delta = f"{(result['p50_ms'] / previous['p50_ms'] - 1) * 100:+.0f}%" if previous and previous['p50_ms'] else ''
+        print(f"  {case:<44} {result['rps']:>9.1f} {result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['peak_kib']:>9.1f} {delta:>8}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'iterations': args.iterations,
+                'results': results
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for case, metric, previous, current in regressions:
+        print(f"REGRESSION {case} {metric}: {previous} -> {current}")
+    return 1 if args.check and regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
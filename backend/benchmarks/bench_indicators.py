@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark advancing the Nifty 50 indicator matrix by one bar: the engine's
+incremental update against rebuilding every indicator from the full history.
+
+    python benchmarks/bench_indicators.py [--symbols 50] [--bars 500] [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.indicator_service import IndicatorEngine
+
+def make_closes(bars, symbols):
+    """Random-walk closes, one column per symbol"""
+    rng = np.random.default_rng(42)
+    return 1000 * np.exp(np.cumsum(rng.normal(0, 0.002, size=(bars, symbols)), axis=0))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--bars', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    closes = make_closes(args.bars + 1, args.symbols)
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    history, new_bar = closes[:-1], closes[-1]
+
+    engine = IndicatorEngine(symbols)
+    engine.load(history)
+
+    def incremental():
+        engine.update(new_bar)
+
+    def full_recompute():
+        IndicatorEngine(symbols).load(closes)
+
+    incremental_time = min(timeit.repeat(incremental, number=args.repeat, repeat=3)) / args.repeat
+    full_time = min(timeit.repeat(full_recompute, number=max(1, args.repeat // 50), repeat=3)) / max(1, args.repeat // 50)
+
+    print(f"{args.symbols} symbols x {args.bars} bars of history")
+    print(f"  {'incremental':<14} {incremental_time * 1e6:>9.1f} us/bar")
+    print(f"  {'full recompute':<14} {full_time * 1e6:>9.1f} us/bar")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSON serialization of an /api/indices/all sized payload.
+
+Compares Flask's default provider, the fast (orjson) provider, and serving
+a snapshot's cached encoded body.
+
+    python benchmarks/bench_json.py [--rows 120] [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.models.snapshot import Snapshot
+from app.utils import json_provider
+
+def make_indices(rows):
+    """Build `rows` index records shaped like NSEService.get_all_indices output"""
+    return [
+        {
+            'key': 'BROAD MARKET INDICES', 'name': f"NIFTY INDEX {i}", 'symbol': f"NIFTY{i}",
+            'lastPrice': 24500.55 + i, 'change': 120.4, 'pChange': 0.49, 'previousClose': 24380.15,
+            'open': 24400.0, 'high': 24550.0, 'low': 24350.1, 'yearHigh': 26277.35, 'yearLow': 21137.2,
+            'indicativeClose': 0, 'pe': '22.41', 'pb': '3.87', 'dy': '1.23', 'advances': '32',
+            'declines': '17', 'unchanged': '1', 'perChange365d': 12.34, 'date365dAgo': '15-Jan-2023',
+            'perChange30d': 2.1, 'date30dAgo': '15-Dec-2023', 'previousDay': 24380.15,
+            'oneWeekAgo': 24100.0, 'oneMonthAgo': 23900.0, 'oneYearAgo': 21800.0,
+            'chartTodayPath': f"https://nsearchives.nseindia.com/today/{i}.svg",
+            'chart30dPath': f"https://nsearchives.nseindia.com/30d/{i}.svg",
+            'chart365dPath': f"https://nsearchives.nseindia.com/365d/{i}.svg"
+        }
+        for i in range(rows)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    payload = {'indices': make_indices(args.rows), 'count': args.rows}
+    body = {'status': 'success', 'data': payload}
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    default_provider.compact = True
+    fast_provider = json_provider.FastJSONProvider(app)
+    fast_provider.compact = True
+
+    cases = [
+        ('flask default jsonify', lambda: default_provider.response(body).get_data()),
+        (f"fast provider ({'orjson' if json_provider.orjson else 'stdlib'})", lambda: fast_provider.response(body).get_data()),
+    ]
+
+    snapshot = Snapshot(name='indices', payload=payload)
+    snapshot.body
+    cases.append(('cached snapshot body', lambda: app.response_class(snapshot.body).get_data()))
+
+    print(f"{args.rows} rows, {len(snapshot.body) / 1024:.1f} KiB encoded, {args.repeat} iterations")
+    with app.app_context():
+        baseline = None
+        for label, func in cases:
+            seconds = min(timeit.repeat(func, number=args.repeat, repeat=3)) / args.repeat
+            baseline = baseline or seconds
+            print(f"  {label:<28} {seconds * 1e6:>10.1f} us/op  {baseline / seconds:>6.1f}x")
+
+if __name__ == '__main__':
+    main()
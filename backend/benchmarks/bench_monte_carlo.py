@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo benchmark: projection time as paths and pool processes grow.
+
+Runs a 30-year monthly SIP projection for each path count on engines with
+each process count, checks every process count returns the same bands
+(seeded per chunk, so results never depend on parallelism) and reports
+wall time, paths per second and the speedup over a single process. A
+second identical request is timed to show the result cache.
+
+    python benchmarks/bench_monte_carlo.py [--paths 10000 100000 1000000]
+        [--processes 1 2 4] [--years 30]
+
+Speedup is bounded by the cores available; the pool starts once per engine
+and its startup is excluded from the timings.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.services.monte_carlo import MonteCarloEngine
+from app.utils.logger import setup_logger
+
+def run_suite(path_counts=(10000, 100000, 1000000), process_counts=(1, 2, 4), years=30):
+    """Time projections for every (processes, paths) pair; returns one row per run"""
+    rows = []
+    reference = {}
+    for processes in process_counts:
+        engine = MonteCarloEngine(processes=processes, max_paths=max(path_counts), timeout=600)
+        try:
+            if processes > 1:
+                # Warm the pool so process startup is not timed
+                engine.project('lumpsum', {'amount': 1, 'years': 1, 'paths': engine.chunk_paths * processes})
+            for paths in path_counts:
+                params = {'amount': 5000, 'years': years, 'paths': paths}
+                start = time.perf_counter()
+                result = engine.project('sip', params)
+                elapsed = time.perf_counter() - start
+                start = time.perf_counter()
+                engine.project('sip', params)
+                cached = time.perf_counter() - start
+
+                bands = reference.setdefault(paths, result['bands'])
+                rows.append({
+                    'processes': processes,
+                    'paths': paths,
+                    'seconds': elapsed,
+                    'cached': cached,
+                    'bands': result['bands'],
+                    'reproducible': result['bands'] == bands
+                })
+        finally:
+            engine.close()
+
+    single = {row['paths']: row['seconds'] for row in rows if row['processes'] == process_counts[0]}
+    for row in rows:
+        row['speedup'] = single[row['paths']] / row['seconds']
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--paths', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--years', type=float, default=30)
+    args = parser.parse_args()
+
+    setup_logger(level='WARNING', log_file='')
+    rows = run_suite(args.paths, args.processes, args.years)
+    print(f"{args.years:g}-year monthly SIP, {os.cpu_count()} CPUs")
+    print(f"  {'procs':>5} {'paths':>9} {'seconds':>8} {'paths/s':>10} {'speedup':>8} {'cached ms':>9} {'P10':>12} {'P50':>12} {'P90':>12} same")
+    for row in rows:
+        bands = row['bands']
+        print(f"  {row['processes']:>5} {row['paths']:>9} {row['seconds']:>8.2f} {row['paths'] / row['seconds']:>10.0f} "
+              f"{row['speedup']:>7.2f}x {row['cached'] * 1000:>9.3f} {bands['p10']:>12.0f} {bands['p50']:>12.0f} "
+              f"{bands['p90']:>12.0f} {'yes' if row['reproducible'] else 'NO'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark building the /api/indices/all dataset as dict rows, a RecordTable
+built field by field, and a RecordTable built by the compiled schema mapper.
+
+Reports transform time and memory retained per snapshot.
+
+    python benchmarks/bench_records.py [--rows 120] [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.models.records import RecordTable
+from app.services.nse_service import DATASETS, INDEX_FIELDS
+
+def make_raw_indices(rows):
+    """Build raw allIndices rows as NSE returns them"""
+    raw = []
+    for i in range(rows):
+        row = {field.source: (24500.55 + i if field.type is float else f"value-{field.source}") for field in INDEX_FIELDS}
+        row['key'] = 'BROAD MARKET INDICES'
+        raw.append(row)
+    return raw
+
+def build_dict_rows(raw):
+    """The original per-row dict transform"""
+    return [{field.name: row.get(field.source, field.default) for field in INDEX_FIELDS} for row in raw]
+
+def build_table(raw):
+    return RecordTable.from_rows(INDEX_FIELDS, raw)
+
+def build_schema(raw):
+    return DATASETS['indices'].mapper(raw)
+
+def retained_bytes(builder, raw):
+    """Bytes still allocated after building (and keeping) one dataset"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = builder(raw)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return after - before
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=120)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    raw = make_raw_indices(args.rows)
+    print(f"{args.rows} rows x {len(INDEX_FIELDS)} fields, {args.repeat} iterations")
+    for label, builder in (('dict per row', build_dict_rows), ('record table', build_table), ('schema mapper', build_schema)):
+        seconds = min(timeit.repeat(lambda: builder(raw), number=args.repeat, repeat=3)) / args.repeat
+        print(f"  {label:<14} {seconds * 1e6:>9.1f} us/build  {retained_bytes(builder, raw) / 1024:>8.1f} KiB retained")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Load test: requests per second against gunicorn as the worker count grows.
+
+Starts a local NSE stub serving the recorded fixtures, then for each worker
+count boots `gunicorn -c gunicorn.conf.py wsgi:app` (production config,
+preloaded and primed), drives it with keep-alive client processes for a
+fixed duration and reports throughput, latency percentiles, the number of
+requests that reached the NSE stub and the proportional memory (PSS) of the
+whole gunicorn process tree. With shared snapshots (the production default)
+the last two should stay flat as workers are added; --no-shared shows each
+worker polling on its own.
+
+    python benchmarks/bench_workers.py [--workers 1 2 4 8] [--duration 10]
+        [--clients 4] [--connections 8] [--path /api/indices/all] [--no-shared]
+
+The load generator shares the machine with the server, so throughput
+flattens once workers plus clients exceed the available cores.
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(BENCH_DIR, '..')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'tests'))
+
+from bench_endpoints import load_fixtures, percentile
+from nse_stub import NSEStubServer
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def tree_pss_kib(pid):
+    """Proportional set size of a process and its descendants (Linux only), or None"""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            total = next(int(line.split()[1]) for line in f if line.startswith('Pss:'))
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = [int(child) for child in f.read().split()]
+    except (OSError, StopIteration):
+        return None
+    return total + sum(tree_pss_kib(child) or 0 for child in children)
+
+def start_server(workers, port, stub, data_dir, shared=True):
+    """Boot gunicorn with `workers` workers and wait until it answers"""
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        SERVER_BIND=f"127.0.0.1:{port}",
+        SERVER_WORKERS=str(workers),
+        NSE_BASE_URL=stub.base_url,
+        NSE_HOME_URL=stub.home_url,
+        NSE_RATE_LIMIT_BACKEND='memory',
+        TICK_STORE_PATH=os.path.join(data_dir, f"ticks-{workers}.db"),
+        SHARED_SNAPSHOTS_ENABLED='1' if shared else '0',
+        SHARED_SNAPSHOT_DIR=os.path.join(data_dir, f"snapshots-{workers}"),
+        LOG_FILE=''
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not become ready')
+
+def stop_server(process):
+    process.terminate()
+    process.wait(30)
+
+def client_worker(port, path, connections, duration):
+    """One load process: `connections` keep-alive threads issuing GETs until `duration` elapses"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def run():
+        local = []
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    raise http.client.HTTPException(response.status)
+            except (OSError, http.client.HTTPException):
+                with lock:
+                    errors[0] += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+                continue
+            local.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=run) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+def load(port, path, clients, connections, duration):
+    """Aggregate latencies and error count across `clients` load processes"""
+    with multiprocessing.Pool(clients) as pool:
+        results = pool.starmap(client_worker, [(port, path, connections, duration)] * clients)
+    latencies = sorted(latency for batch, _ in results for latency in batch)
+    return latencies, sum(errors for _, errors in results)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--clients', type=int, default=4, help='load generator processes')
+    parser.add_argument('--connections', type=int, default=8, help='keep-alive connections per client process')
+    parser.add_argument('--path', default='/api/indices/all')
+    parser.add_argument('--no-shared', action='store_true', help='disable the shared snapshot store')
+    args = parser.parse_args()
+
+    stub = NSEStubServer(load_fixtures()).start()
+    print(f"{args.path} for {args.duration:.0f}s per run, {args.clients}x{args.connections} connections, "
+          f"{os.cpu_count()} CPUs, shared snapshots {'off' if args.no_shared else 'on'}")
+    print(f"  {'workers':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'upstream':>9} {'PSS MiB':>8}")
+
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            for workers in args.workers:
+                port = free_port()
+                upstream = stub.api_requests
+                process = start_server(workers, port, stub, data_dir, shared=not args.no_shared)
+                try:
+                    latencies, errors = load(port, args.path, args.clients, args.connections, args.duration)
+                    pss = tree_pss_kib(process.pid)
+                finally:
+                    stop_server(process)
+
+                upstream = stub.api_requests - upstream
+                pss = f"{pss / 1024:.1f}" if pss is not None else '-'
+                if not latencies:
+                    print(f"  {workers:>7} {'-':>9} {'-':>9} {'-':>9} {errors:>7} {upstream:>9} {pss:>8}")
+                    continue
+                print(f"  {workers:>7} {len(latencies) / args.duration:>9.1f} "
+                      f"{percentile(latencies, 0.50) * 1000:>9.2f} "
+                      f"{percentile(latencies, 0.99) * 1000:>9.2f} {errors:>7} {upstream:>9} {pss:>8}")
+    finally:
+        stub.stop()
+
+if __name__ == '__main__':
+    main()
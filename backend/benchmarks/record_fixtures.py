@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Write the NSE response fixtures used by the offline benchmark suite.
+
+By default the fixtures are generated deterministically in the exact shape
+NSE returns (field names, numeric vs string values, nested `meta`). With
+--live the same endpoints are recorded from NSE instead.
+
+    python benchmarks/record_fixtures.py [--live]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from app.config.config import Config
+from app.services.nse_service import DATASETS
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Datasets with recorded fixtures: fixture file name -> dataset whose endpoint it answers
+FIXTURES = {
+    'allIndices': 'indices',
+    'nifty50': 'nifty50',
+    '52week_high': '52week_high',
+    '52week_low': '52week_low'
+}
+
+TIMESTAMP = '15-Jan-2024 15:30:00'
+
+NIFTY50 = (
+    ('ADANIENT', 'Diversified Commercial Services'), ('ADANIPORTS', 'Port & Port services'),
+    ('APOLLOHOSP', 'Hospital'), ('ASIANPAINT', 'Paints'), ('AXISBANK', 'Private Sector Bank'),
+    ('BAJAJ-AUTO', '2/3 Wheelers'), ('BAJFINANCE', 'Non Banking Financial Company (NBFC)'),
+    ('BAJAJFINSV', 'Holding Company'), ('BPCL', 'Refineries & Marketing'), ('BHARTIARTL', 'Telecom - Cellular & Fixed line services'),
+    ('BRITANNIA', 'Packaged Foods'), ('CIPLA', 'Pharmaceuticals'), ('COALINDIA', 'Coal'),
+    ('DIVISLAB', 'Pharmaceuticals'), ('DRREDDY', 'Pharmaceuticals'), ('EICHERMOT', '2/3 Wheelers'),
+    ('GRASIM', 'Cement & Cement Products'), ('HCLTECH', 'Computers - Software & Consulting'),
+    ('HDFCBANK', 'Private Sector Bank'), ('HDFCLIFE', 'Life Insurance'), ('HEROMOTOCO', '2/3 Wheelers'),
+    ('HINDALCO', 'Aluminium'), ('HINDUNILVR', 'Diversified FMCG'), ('ICICIBANK', 'Private Sector Bank'),
+    ('ITC', 'Diversified FMCG'), ('INDUSINDBK', 'Private Sector Bank'), ('INFY', 'Computers - Software & Consulting'),
+    ('JSWSTEEL', 'Iron & Steel'), ('KOTAKBANK', 'Private Sector Bank'), ('LTIM', 'Computers - Software & Consulting'),
+    ('LT', 'Civil Construction'), ('M&M', 'Passenger Cars & Utility Vehicles'), ('MARUTI', 'Passenger Cars & Utility Vehicles'),
+    ('NTPC', 'Power Generation'), ('NESTLEIND', 'Packaged Foods'), ('ONGC', 'Oil Exploration & Production'),
+    ('POWERGRID', 'Power - Transmission'), ('RELIANCE', 'Refineries & Marketing'), ('SBILIFE', 'Life Insurance'),
+    ('SBIN', 'Public Sector Bank'), ('SUNPHARMA', 'Pharmaceuticals'), ('TCS', 'Computers - Software & Consulting'),
+    ('TATACONSUM', 'Tea & Coffee'), ('TATAMOTORS', 'Passenger Cars & Utility Vehicles'), ('TATASTEEL', 'Iron & Steel'),
+    ('TECHM', 'Computers - Software & Consulting'), ('TITAN', 'Gems, Jewellery And Watches'),
+    ('ULTRACEMCO', 'Cement & Cement Products'), ('UPL', 'Pesticides & Agrochemicals'), ('WIPRO', 'Computers - Software & Consulting')
+)
+
+INDEX_GROUPS = (
+    ('BROAD MARKET INDICES', 30), ('SECTORAL INDICES', 25), ('THEMATIC INDICES', 40),
+    ('STRATEGY INDICES', 30), ('FIXED INCOME INDICES', 10)
+)
+
+def _quote(rng, base):
+    """Open/high/low/last/previous close around a base price"""
+    previous = round(base, 2)
+    last = round(previous * (1 + rng.uniform(-0.03, 0.03)), 2)
+    low = round(min(previous, last) * (1 - rng.uniform(0, 0.01)), 2)
+    high = round(max(previous, last) * (1 + rng.uniform(0, 0.01)), 2)
+    return {
+        'open': round(previous * (1 + rng.uniform(-0.005, 0.005)), 2),
+        'high': high,
+        'low': low,
+        'last': last,
+        'previousClose': previous,
+        'change': round(last - previous, 2),
+        'pChange': round((last - previous) / previous * 100, 2)
+    }
+
+def all_indices(rng):
+    """allIndices response"""
+    rows = []
+    for key, count in INDEX_GROUPS:
+        for i in range(count):
+            name = f"NIFTY {key.split()[0]} {i + 1}" if i else ('NIFTY 50' if key.startswith('BROAD') else f"NIFTY {key.split()[0]}")
+            quote = _quote(rng, rng.uniform(1000, 50000))
+            rows.append({
+                'key': key, 'index': name, 'indexSymbol': name,
+                'last': quote['last'], 'variation': quote['change'], 'percentChange': quote['pChange'],
+                'open': quote['open'], 'high': quote['high'], 'low': quote['low'],
+                'previousClose': quote['previousClose'],
+                'yearHigh': round(quote['high'] * 1.15, 2), 'yearLow': round(quote['low'] * 0.8, 2),
+                'indicativeClose': 0,
+                'pe': f"{rng.uniform(10, 40):.2f}", 'pb': f"{rng.uniform(1, 8):.2f}", 'dy': f"{rng.uniform(0, 3):.2f}",
+                'declines': str(rng.randint(0, 30)), 'advances': str(rng.randint(0, 30)), 'unchanged': str(rng.randint(0, 3)),
+                'perChange365d': round(rng.uniform(-20, 40), 2), 'date365dAgo': '13-Jan-2023',
+                'chart365dPath': f"https://nsearchives.nseindia.com/365d/{name.replace(' ', '-')}.svg",
+                'date30dAgo': '15-Dec-2023', 'perChange30d': round(rng.uniform(-8, 8), 2),
+                'chart30dPath': f"https://nsearchives.nseindia.com/30d/{name.replace(' ', '-')}.svg",
+                'chartTodayPath': f"https://nsearchives.nseindia.com/today/{name.replace(' ', '-')}.svg",
+                'previousDay': quote['previousClose'], 'oneWeekAgo': round(quote['previousClose'] * 0.99, 2),
+                'oneMonthAgo': round(quote['previousClose'] * 0.97, 2), 'oneYearAgo': round(quote['previousClose'] * 0.85, 2)
+            })
+    return {'data': rows, 'timestamp': TIMESTAMP, 'advances': 1201, 'declines': 1347, 'unchanged': 98, 'dates': {}}
+
+def nifty50(rng):
+    """equity-stockIndices?index=NIFTY 50 response, index row first"""
+    rows = []
+    index = _quote(rng, 21894.55)
+    rows.append({
+        'priority': 1, 'symbol': 'NIFTY 50', 'identifier': 'NIFTY 50',
+        'open': index['open'], 'dayHigh': index['high'], 'dayLow': index['low'], 'lastPrice': index['last'],
+        'previousClose': index['previousClose'], 'change': index['change'], 'pChange': index['pChange'],
+        'ffmc': 0, 'yearHigh': 22124.15, 'yearLow': 16828.35, 'totalTradedVolume': 312456789,
+        'totalTradedValue': 31245678912.5, 'lastUpdateTime': TIMESTAMP, 'nearWKH': 1.04, 'nearWKL': -30.1,
+        'perChange365d': 21.5, 'date365dAgo': '13-Jan-2023', 'date30dAgo': '15-Dec-2023', 'perChange30d': 3.2
+    })
+    for symbol, industry in NIFTY50:
+        quote = _quote(rng, rng.uniform(100, 12000))
+        rows.append({
+            'priority': 0, 'symbol': symbol, 'identifier': f"{symbol}EQN", 'series': 'EQ',
+            'open': quote['open'], 'dayHigh': quote['high'], 'dayLow': quote['low'], 'lastPrice': quote['last'],
+            'previousClose': quote['previousClose'], 'change': quote['change'], 'pChange': quote['pChange'],
+            'ffmc': round(rng.uniform(1e11, 1e13), 2), 'yearHigh': round(quote['high'] * 1.2, 2),
+            'yearLow': round(quote['low'] * 0.75, 2), 'totalTradedVolume': rng.randint(100000, 30000000),
+            'totalTradedValue': round(rng.uniform(1e8, 2e10), 2), 'lastUpdateTime': TIMESTAMP,
+            'nearWKH': round(rng.uniform(0, 20), 2), 'nearWKL': round(rng.uniform(-60, 0), 2),
+            'perChange365d': round(rng.uniform(-20, 60), 2), 'date365dAgo': '13-Jan-2023',
+            'chart365dPath': f"https://nsearchives.nseindia.com/365d/{symbol}-EQ.svg",
+            'date30dAgo': '15-Dec-2023', 'perChange30d': round(rng.uniform(-10, 10), 2),
+            'chart30dPath': f"https://nsearchives.nseindia.com/30d/{symbol}-EQ.svg",
+            'chartTodayPath': f"https://nsearchives.nseindia.com/today/{symbol}-EQ.svg",
+            'meta': {
+                'symbol': symbol, 'companyName': f"{symbol.title()} Limited", 'industry': industry,
+                'activeSeries': ['EQ'], 'debtSeries': [], 'isFNOSec': True, 'isCASec': False,
+                'isSLBSec': True, 'isDebtSec': False, 'isSuspended': False, 'tempSuspendedSeries': [],
+                'isETFSec': False, 'isDelisted': False, 'isin': f"INE{rng.randint(100000, 999999)}01",
+                'isMunicipalBond': False
+            }
+        })
+    advances = sum(1 for row in rows[1:] if row['change'] > 0)
+    return {
+        'name': 'NIFTY 50',
+        'advance': {'declines': str(50 - advances), 'advances': str(advances), 'unchanged': '0'},
+        'timestamp': TIMESTAMP,
+        'data': rows,
+        'metadata': {'indexName': 'NIFTY 50', 'last': index['last'], 'timeVal': TIMESTAMP}
+    }
+
+def week52(rng, kind):
+    """live-analysis-data-52week{high,low}stock response"""
+    rows = []
+    for i in range(rng.randint(40, 60) if kind == 'high' else rng.randint(15, 30)):
+        quote = _quote(rng, rng.uniform(20, 5000))
+        rows.append({
+            'symbol': f"STOCK{i}{kind.upper()}", 'series': 'EQ', 'comapnyName': f"Stock {i} Industries Limited",
+            'new52WHL': quote['high'] if kind == 'high' else quote['low'],
+            'prev52WHL': round(quote['high'] * 0.98, 2) if kind == 'high' else round(quote['low'] * 1.02, 2),
+            'prevHLDate': '12-Jan-2024', 'ltp': quote['last'], 'prevClose': quote['previousClose'],
+            'change': quote['change'], 'pChange': quote['pChange']
+        })
+    return {kind: len(rows), 'data': rows, 'timestamp': TIMESTAMP}
+
+def generate():
+    rng = random.Random(2024)
+    return {
+        'allIndices': all_indices(rng),
+        'nifty50': nifty50(rng),
+        '52week_high': week52(rng, 'high'),
+        '52week_low': week52(rng, 'low')
+    }
+
+def record_live():
+    from app.services.nse_client import NSEClient
+    client = NSEClient(Config.NSE_BASE_URL, Config.NSE_HOME_URL, timeout=Config.NSE_TIMEOUT)
+    try:
+        return {name: client.get_json(DATASETS[dataset].endpoint) for name, dataset in FIXTURES.items()}
+    finally:
+        client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--live', action='store_true', help='record from NSE instead of generating')
+    args = parser.parse_args()
+
+    fixtures = record_live() if args.live else generate()
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for name, data in fixtures.items():
+        path = os.path.join(FIXTURES_DIR, f"{name}.json")
+        with open(path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        print(f"  {name:<12} {len(data.get('data', [])):>4} rows  {os.path.getsize(path) / 1024:>7.1f} KiB  {path}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+"""
+gunicorn settings, taken from the Config class named by FLASK_CONFIG.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Command-line flags (e.g. `-w 4`) still override these.
+"""
+
+import os
+from app.config import config as _config
+from app.server import gunicorn_options
+
+# Every top-level name here is read as a gunicorn setting, hence the alias
+globals().update(gunicorn_options(_config.config[os.environ.get('FLASK_CONFIG', 'production')]))
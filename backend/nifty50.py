@@ -1,10 +1,11 @@
-from nsepython import nsefetch
+from app.config.config import Config
+from app.services.nse_client import NSEClient
 
 # NSE API for Nifty 50 index
-url = "https://www.nseindia.com/api/equity-stockIndices?index=NIFTY%2050"
+client = NSEClient(Config.NSE_BASE_URL, Config.NSE_HOME_URL, timeout=Config.NSE_TIMEOUT)
 
 # Fetch data
-data = nsefetch(url)
+data = client.get_json("equity-stockIndices?index=NIFTY%2050")
 
 # Extract stock symbols
 nifty50_symbols = [stock["symbol"] for stock in data["data"]]
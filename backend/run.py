@@ -1,29 +1,41 @@
 #!/usr/bin/env python3
 """
 Finance API - Main Application Entry Point
+
+    python run.py                 # Flask development server
+    python run.py --production    # gunicorn, configured from Config (see app/server.py)
 """
 
+import argparse
 import os
 from app import create_app
 from app.utils.logger import logger
 
 def main():
     """Main application entry point"""
-    
+
+    parser = argparse.ArgumentParser(description='Finance API server')
+    parser.add_argument('--production', action='store_true', help='serve with gunicorn workers')
+    args = parser.parse_args()
+
     # Get configuration from environment
-    config_name = os.environ.get('FLASK_CONFIG', 'development')
-    
+    config_name = os.environ.get('FLASK_CONFIG', 'production' if args.production else 'development')
+
+    if args.production:
+        from app.server import serve
+        serve(config_name)
+        return
+
     # Create application
     app = create_app(config_name)
-    
+
     # Run application
-    if __name__ == '__main__':
-        logger.info("Starting Finance API server...")
-        app.run(
-            debug=app.config['DEBUG'],
-            host='0.0.0.0',
-            port=5000
-        )
+    logger.info("Starting Finance API server...")
+    app.run(
+        debug=app.config['DEBUG'],
+        host='0.0.0.0',
+        port=5000
+    )
 
 if __name__ == '__main__':
     main()
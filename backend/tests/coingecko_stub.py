@@ -0,0 +1,93 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+class CoinGeckoStubServer:
+    """
+    Local stand-in for api.coingecko.com.
+
+    `/api/v3/<path>` serves the JSON registered in `routes` under its path
+    (query strings are recorded in `requests` but not matched). After
+    `rate_limit(n)` the next `n` requests are answered with 429, and
+    `delay` slows every response so concurrent callers overlap.
+    """
+
+    def __init__(self, routes=None, delay=0):
+        self.routes = dict(routes or {})
+        self.delay = delay
+        self.requests = []
+        self._limited = 0
+        self._retry_after = None
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/api/v3"
+
+    @property
+    def api_requests(self):
+        return len(self.requests)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def rate_limit(self, count=1, retry_after=None):
+        """Answer the next `count` requests with 429 and an optional Retry-After"""
+        self._limited = count
+        self._retry_after = retry_after
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b'{}', headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                path = url.path[len('/api/v3/'):]
+                with stub._lock:
+                    stub.requests.append((path, url.query))
+                    limited = stub._limited > 0
+                    if limited:
+                        stub._limited -= 1
+                if stub.delay:
+                    time.sleep(stub.delay)
+
+                if limited:
+                    headers = {'Retry-After': str(stub._retry_after)} if stub._retry_after is not None else None
+                    self._send(429, b'{"status": {"error_code": 429}}', headers)
+                    return
+                if path not in stub.routes:
+                    self._send(404, b'{"error": "coin not found"}')
+                    return
+
+                body = json.dumps(stub.routes[path]).encode()
+                headers = {}
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    headers['Content-Encoding'] = 'gzip'
+                self._send(200, body, headers)
+
+        return Handler
@@ -0,0 +1,27 @@
+import pytest
+from coingecko_stub import CoinGeckoStubServer
+from nse_stub import NSEStubServer
+from app.api.routes import nse_service
+from app.services.snapshot_store import SnapshotStore
+
+@pytest.fixture
+def nse_stub():
+    """Start a local NSE stub server for the duration of a test"""
+    server = NSEStubServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def coingecko_stub():
+    """Start a local CoinGecko stub server for the duration of a test"""
+    server = CoinGeckoStubServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def snapshot_store():
+    """Give the shared NSE service a fresh snapshot store for the duration of a test"""
+    original = nse_service.snapshots
+    nse_service.snapshots = store = SnapshotStore()
+    yield store
+    nse_service.snapshots = original
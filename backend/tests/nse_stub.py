@@ -0,0 +1,88 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class NSEStubServer:
+    """
+    Local stand-in for nseindia.com.
+
+    `/` sets the session cookie, `/api/<endpoint>` serves the JSON registered
+    in `routes` (gzip-encoded when the client accepts it) and answers 401
+    when the cookie is missing or has been expired with `expire_cookies()`.
+    """
+
+    def __init__(self, routes=None):
+        self.routes = dict(routes or {})
+        self.handshakes = 0
+        self.api_requests = 0
+        self.connections = set()
+        self._cookie = None
+        self._generation = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def home_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/api"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def expire_cookies(self):
+        """Invalidate the cookie handed out by the last handshake"""
+        self._cookie = None
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                stub.connections.add(self.client_address)
+
+                if self.path == '/':
+                    stub.handshakes += 1
+                    stub._generation += 1
+                    stub._cookie = f"session-{stub._generation}"
+                    self._send(200, b'<html></html>', {'Set-Cookie': f"nsit={stub._cookie}; Path=/"})
+                    return
+
+                endpoint = self.path[len('/api/'):]
+                stub.api_requests += 1
+                if stub._cookie is None or f"nsit={stub._cookie}" not in self.headers.get('Cookie', ''):
+                    self._send(401, b'{}', {'Content-Type': 'application/json'})
+                    return
+                if endpoint not in stub.routes:
+                    self._send(404, b'{}', {'Content-Type': 'application/json'})
+                    return
+
+                body = json.dumps(stub.routes[endpoint]).encode()
+                headers = {'Content-Type': 'application/json'}
+                if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body)
+                    headers['Content-Encoding'] = 'gzip'
+                self._send(200, body, headers)
+
+        return Handler
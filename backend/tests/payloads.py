@@ -0,0 +1,5 @@
+from app.services.nse_service import DATASETS
+
+def indices(*rows):
+    """An indices payload from (indexSymbol, last) pairs"""
+    return DATASETS['indices'].transform({'data': [{'indexSymbol': symbol, 'last': last} for symbol, last in rows]})
@@ -37,3 +37,12 @@ def test_404_error(client):
     assert response.status_code == 404
     data = response.get_json()
     assert data['status'] == 'error'
+
+def test_cache_stats(client):
+    """Test the cache statistics endpoint"""
+    response = client.get('/api/cache/stats')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['status'] == 'success'
+    assert 'hits' in data['data']
+    assert 'misses' in data['data']
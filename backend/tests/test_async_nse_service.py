@@ -0,0 +1,104 @@
+import time
+from app import create_app
+from app.api import routes
+from app.services.async_nse_service import AsyncNSEService
+from app.services.nse_service import NSEService
+from app.services.snapshot_archive import SnapshotArchive
+from app.services.snapshot_store import SnapshotStore
+from app.utils.rate_limiter import TokenBucket
+from payloads import indices
+
+PAYLOADS = {
+    'allIndices': {'data': [{'index': 'NIFTY 50', 'last': 24500.5}]},
+    'equity-stockIndices?index=NIFTY%2050': {'data': [{'symbol': 'NIFTY 50'}, {'symbol': 'RELIANCE'}]},
+    'live-analysis-data-52weekhighstock': {'data': [{'symbol': 'TCS'}], 'high': 1, 'timestamp': '15-Jan-2024'},
+    'live-analysis-data-52weeklowstock': {'data': [], 'low': 0, 'timestamp': '15-Jan-2024'}
+}
+
+def slow_upstream(delay):
+    """Create a fake upstream that takes `delay` seconds per call"""
+    def fetch(endpoint):
+        time.sleep(delay)
+        return PAYLOADS[endpoint]
+    return fetch
+
+def test_token_bucket_paces_after_burst():
+    """Test that the bucket allows a burst and then spaces callers at its rate"""
+    bucket = TokenBucket(rate=20, burst=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.04 <= bucket.reserve() <= 0.06
+    assert not bucket.try_acquire()
+
+def test_market_snapshot_fans_out_concurrently():
+    """Test that four datasets cost about one round trip, not four"""
+    service = NSEService()
+    service.rate_limiter = TokenBucket(rate=100, burst=10)
+    service.client.get_json = slow_upstream(0.2)
+    engine = AsyncNSEService(service, max_concurrency=4)
+
+    started = time.perf_counter()
+    results = engine.run(engine.get_market_snapshot())
+    elapsed = time.perf_counter() - started
+
+    assert all(result['success'] for result in results.values())
+    assert results['52week_high']['snapshot'].payload['totalHigh'] == 1
+    assert elapsed < 0.5
+
+def test_tokens_are_only_spent_upstream():
+    """Test that datasets sharing an endpoint cost one token, since the second is answered by the cache"""
+    service = NSEService()
+    service.rate_limiter = TokenBucket(rate=100, burst=10)
+    service.client.get_json = slow_upstream(0.2)
+    reserve = service.rate_limiter.reserve
+    reserved = []
+    service.rate_limiter.reserve = lambda *args: reserved.append(1) or reserve(*args)
+    engine = AsyncNSEService(service, max_concurrency=4)
+
+    results = engine.run(engine.get_market_snapshot(['nifty50', 'nifty50_symbols', 'indices']))
+
+    assert all(result['success'] for result in results.values())
+    assert len(reserved) == 2
+
+def test_restored_snapshot_starts_live_refresh(tmp_path):
+    """Test that an archived snapshot is served at once and refreshed in the background, as in the sync path"""
+    previous = SnapshotStore()
+    previous.subscribe(SnapshotArchive(str(tmp_path)).save)
+    previous.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=60)
+
+    service = NSEService()
+    service.archive = SnapshotArchive(str(tmp_path))
+    service.client.get_json = slow_upstream(0.3)
+    engine = AsyncNSEService(service)
+
+    started = time.perf_counter()
+    result = engine.run(engine.get_snapshot('indices'))
+    assert result['snapshot'].restored
+    assert time.perf_counter() - started < 0.2
+
+    for _ in range(100):
+        if not service.snapshots.get('indices').restored:
+            break
+        time.sleep(0.02)
+    assert service.snapshots.get('indices').payload['count'] == 1
+    assert not service.snapshots.get('indices').restored
+
+def test_market_snapshot_endpoint(monkeypatch):
+    """Test the composite endpoint and its partial-failure reporting"""
+    def fetch(endpoint):
+        if endpoint == 'live-analysis-data-52weeklowstock':
+            raise RuntimeError('upstream down')
+        return PAYLOADS[endpoint]
+
+    service = NSEService()
+    service.client.get_json = fetch
+    monkeypatch.setattr(routes, 'async_nse_service', AsyncNSEService(service))
+
+    response = create_app('testing').test_client().get('/api/market/snapshot')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['data']['nifty50_symbols']['symbols'] == ['NIFTY 50', 'RELIANCE']
+    assert body['data']['indices']['count'] == 1
+    assert '52week_low' in body['errors']
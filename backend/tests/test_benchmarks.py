@@ -0,0 +1,47 @@
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from bench_endpoints import ENDPOINTS, compare, load_fixtures, run_suite, scale_rows
+from app.services.nse_service import DATASETS
+from app.utils.logger import logger
+
+def test_fixtures_cover_benchmarked_datasets():
+    """Test that every benchmarked endpoint has a recorded response"""
+    responses = load_fixtures()
+    for _, dataset in ENDPOINTS:
+        assert responses[DATASETS[dataset].endpoint]['data']
+
+def test_scale_rows_keeps_symbols_unique():
+    """Test that scaled copies get distinct symbols and kept rows appear once"""
+    rows = [{'symbol': 'NIFTY 50'}, {'symbol': 'A'}, {'symbol': 'B'}]
+    scaled = scale_rows(rows, 3, keep=1)
+
+    symbols = [row['symbol'] for row in scaled]
+    assert len(symbols) == 7
+    assert len(set(symbols)) == 7
+    assert symbols.count('NIFTY 50') == 1
+
+def test_suite_runs_every_case():
+    """Test that a short run covers each endpoint warm and cold"""
+    results = run_suite(iterations=2, scales=(1,))
+
+    assert len(results) == len(ENDPOINTS) * 2
+    for path, _ in ENDPOINTS:
+        for mode in ('warm', 'cold'):
+            result = results[f"{path}|1x|{mode}"]
+            assert result['rps'] > 0
+            assert result['p50_ms'] <= result['p99_ms']
+
+    # The harness quiets logging only while it runs
+    assert logger.level == logging.DEBUG
+
+def test_compare_flags_regressions():
+    """Test that only growth beyond the tolerance is reported"""
+    baseline = {'results': {'case': {'p50_ms': 1.0, 'peak_kib': 100.0}}}
+
+    assert compare({'case': {'p50_ms': 1.2, 'peak_kib': 110.0}}, baseline, 0.3) == []
+    assert compare({'case': {'p50_ms': 2.0, 'peak_kib': 110.0}}, baseline, 0.3) == [('case', 'p50_ms', 1.0, 2.0)]
+    assert compare({'other': {'p50_ms': 9.0, 'peak_kib': 900.0}}, baseline, 0.3) == []
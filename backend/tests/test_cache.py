@@ -0,0 +1,92 @@
+import threading
+import time
+import pytest
+from app.utils.cache import SnapshotCache
+
+def test_hit_after_miss():
+    """Test that a second lookup is served from the cache"""
+    cache = SnapshotCache(default_ttl=60)
+    calls = []
+    loader = lambda: calls.append(1) or 'value'
+
+    assert cache.get('key', loader) == 'value'
+    assert cache.get('key', loader) == 'value'
+    assert len(calls) == 1
+
+    stats = cache.stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+
+def test_per_key_ttl():
+    """Test that each key expires on its own TTL"""
+    cache = SnapshotCache(default_ttl=60, ttls={'short': 0}, stale_ttl=0)
+    calls = []
+    loader = lambda: calls.append(1) or len(calls)
+
+    assert cache.get('short', loader) == 1
+    assert cache.get('short', loader) == 2
+    assert cache.get('long', loader) == 3
+    assert cache.get('long', loader) == 3
+
+def test_concurrent_misses_share_one_load():
+    """Test that concurrent misses run the loader only once"""
+    cache = SnapshotCache(default_ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get('key', loader))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['value'] * 10
+    assert len(calls) == 1
+    assert cache.stats()['coalesced'] == 9
+
+def test_stale_while_revalidate():
+    """Test that an expired entry is served while it refreshes in the background"""
+    cache = SnapshotCache(default_ttl=0, stale_ttl=60)
+    release = threading.Event()
+    cache.set('key', 'old')
+
+    def loader():
+        release.wait(1)
+        return 'new'
+
+    assert cache.get('key', loader) == 'old'
+    assert cache.stats()['refreshes'] == 1
+    release.set()
+
+    for _ in range(100):
+        if cache.peek('key', allow_stale=True) == 'new':
+            break
+        time.sleep(0.01)
+    assert cache.peek('key', allow_stale=True) == 'new'
+
+def test_loader_error_is_not_cached():
+    """Test that a failed load raises for every waiter and stores nothing"""
+    cache = SnapshotCache(default_ttl=60)
+
+    def loader():
+        raise RuntimeError('upstream down')
+
+    with pytest.raises(RuntimeError):
+        cache.get('key', loader)
+    assert cache.peek('key', allow_stale=True) is None
+    assert cache.stats()['errors'] == 1
+
+def test_max_entries_evicts_oldest():
+    """Test that storing past `max_entries` drops the longest-stored keys"""
+    cache = SnapshotCache(default_ttl=60, max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.get(key, lambda: key.upper())
+
+    assert cache.peek('a') is None
+    assert cache.peek('b') == 'B' and cache.peek('c') == 'C'
+    assert cache.stats()['evictions'] == 1
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from app import create_app
+from app.services.calculator import CALCULATORS, CalculatorError, evaluate, parse_axis
+
+@pytest.fixture
+def client():
+    """Create a test client for the app"""
+    app = create_app('testing', start_background=False)
+    return app.test_client()
+
+def test_formulas_match_scalar_calculators():
+    """Test that each calculator matches the frontend's closed-form result for one scenario"""
+    def single(name, **params):
+        result = evaluate(CALCULATORS[name], {'amount': 100000, 'rate': 12, 'years': 10, **params})
+        return {key: value.item() for key, value in result['results'].items()}
+
+    monthly = 0.01
+    sip = single('sip', amount=5000)
+    assert sip['maturityAmount'] == pytest.approx(5000 * ((1 + monthly) ** 120 - 1) / monthly * (1 + monthly))
+    assert sip['totalInvestment'] == 600000
+
+    emi = single('emi')
+    assert emi['emi'] == pytest.approx(100000 * monthly * 1.01 ** 120 / (1.01 ** 120 - 1))
+    assert emi['totalInterest'] == pytest.approx(emi['emi'] * 120 - 100000)
+
+    assert single('lumpsum')['maturityAmount'] == pytest.approx(100000 * 1.12 ** 10)
+    assert single('compound-interest', frequency='quarterly')['maturityAmount'] == pytest.approx(100000 * 1.03 ** 40)
+    assert single('simple-interest')['totalInterest'] == pytest.approx(120000)
+    assert single('present-value')['presentValue'] == pytest.approx(100000 / 1.12 ** 10)
+
+def test_zero_rate_has_finite_results():
+    """Test that a 0% rate falls back to the limits instead of dividing by zero"""
+    result = evaluate(CALCULATORS['emi'], {'amount': 120000, 'rate': [0, 10], 'years': 1})['results']
+    assert result['emi'][0, 0, 0] == pytest.approx(10000)
+    assert result['totalInterest'][0, 0, 0] == pytest.approx(0)
+
+    sip = evaluate(CALCULATORS['sip'], {'amount': 1000, 'rate': 0, 'years': 2})['results']
+    assert sip['maturityAmount'].item() == pytest.approx(24000)
+
+def test_grid_and_zip_modes():
+    """Test that grid mode returns the full product and zip mode pairs axes element-wise"""
+    calculator = CALCULATORS['compound-interest']
+    params = {'amount': [1000, 2000], 'rate': {'start': 5, 'stop': 7, 'step': 1}, 'years': [1, 2, 3, 4]}
+
+    grid = evaluate(calculator, params)
+    assert grid['shape'] == [2, 3, 4]
+    assert grid['scenarios'] == 24
+    assert grid['results']['maturityAmount'][1, 2, 3] == pytest.approx(2000 * 1.07 ** 4)
+
+    paired = evaluate(calculator, {'amount': 1000, 'rate': '5,6,7', 'years': [1, 2, 3]}, mode='zip')
+    assert paired['shape'] == [3]
+    np.testing.assert_allclose(paired['results']['maturityAmount'], [1050, 1000 * 1.06 ** 2, 1000 * 1.07 ** 3])
+
+    with pytest.raises(CalculatorError):
+        evaluate(calculator, {'amount': [1, 2], 'rate': [1, 2, 3], 'years': 1}, mode='zip')
+    with pytest.raises(CalculatorError):
+        evaluate(calculator, params, max_scenarios=10)
+
+def test_parse_axis_rejects_bad_input():
+    """Test that malformed axes raise CalculatorError"""
+    np.testing.assert_allclose(parse_axis('rate', {'start': 0, 'stop': 1, 'num': 3}), [0, 0.5, 1])
+    for value in (None, [], 'abc', {'start': 1}, {'start': 0, 'stop': 1, 'step': 0}, [[1, 2]], float('nan')):
+        with pytest.raises(CalculatorError):
+            parse_axis('rate', value)
+
+def test_axis_size_checked_before_allocation():
+    """Test that oversized ranges and lists are rejected before any array is built"""
+    for value in ({'start': 0, 'stop': 1e15, 'step': 1}, {'start': 0, 'stop': 1, 'num': 20000000},
+                  {'start': 0, 'stop': 1e300, 'step': 1e-300}, ','.join(['1'] * 11)):
+        with pytest.raises(CalculatorError):
+            parse_axis('amount', value, max_size=10)
+    assert parse_axis('amount', {'start': 1, 'stop': 10, 'step': 1}, max_size=10).size == 10
+
+    calculator = CALCULATORS['sip']
+    with pytest.raises(CalculatorError):
+        evaluate(calculator, {'amount': {'start': 0, 'stop': 1e15, 'step': 1}, 'rate': 12, 'years': 10}, max_scenarios=1000)
+
+def test_calc_endpoints(client):
+    """Test the listing, GET and POST evaluation and error responses"""
+    listing = client.get('/api/calc').get_json()['data']
+    assert {calculator['name'] for calculator in listing['calculators']} == set(CALCULATORS)
+
+    response = client.post('/api/calc/emi', json={'amount': [100000, 200000], 'rate': [8, 9], 'years': 5, 'frequency': 'yearly'})
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['shape'] == [2, 2, 1]
+    assert data['axes']['rate'] == [8.0, 9.0]
+    assert len(data['results']['emi']) == 2
+
+    response = client.get('/api/calc/simple-interest?amount=1000&rate=5,10&years=2&mode=zip')
+    assert response.get_json()['data']['results']['totalInterest'] == [100.0, 200.0]
+
+    assert client.get('/api/calc/unknown?amount=1&rate=1&years=1').status_code == 404
+    assert client.get('/api/calc/sip?amount=1000&rate=-1&years=1').status_code == 400
+    assert client.get('/api/calc/emi?amount=1&rate=1&years=1&frequency=daily').status_code == 400
+    assert client.post('/api/calc/sip', data='not json', content_type='application/json').status_code == 400
@@ -0,0 +1,71 @@
+import time
+import pytest
+from app.services.nse_service import NSEService
+from app.utils.cache import SnapshotCache
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from app.utils.rate_limiter import FileTokenBucket, fcntl
+
+def test_breaker_opens_and_recovers():
+    """Test that the breaker opens at the threshold and closes after a good trial"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_open_circuit_serves_cached_data_without_upstream_call():
+    """Test that upstream failures fail fast to the last good response"""
+    service = NSEService()
+    service.cache = SnapshotCache(default_ttl=0, stale_ttl=0)
+    service.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    calls = []
+
+    def fetch(endpoint):
+        calls.append(endpoint)
+        raise ConnectionError('NSE unavailable')
+
+    service.client.get_json = fetch
+    service.cache.set('allIndices', {'data': []})
+
+    assert service.fetch_data('allIndices') == {'success': True, 'data': {'data': []}, 'stale': True}
+    assert service.breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        service._request('allIndices')
+    assert service.fetch_data('allIndices')['stale']
+    assert service.fetch_data('live-analysis-data-52weeklowstock')['success'] is False
+    assert len(calls) == 1
+
+@pytest.mark.skipif(fcntl is None, reason='file backend needs fcntl')
+def test_file_bucket_is_shared_between_instances(tmp_path):
+    """Test that separate limiters on one state file draw from one bucket"""
+    path = str(tmp_path / 'bucket')
+    first = FileTokenBucket(rate=10, burst=2, path=path)
+    second = FileTokenBucket(rate=10, burst=2, path=path)
+
+    assert first.reserve() == 0
+    assert second.reserve() == 0
+    assert first.reserve() > 0.05
+    assert not second.try_acquire()
+
+def test_bounded_wait_and_shared_pause(tmp_path):
+    """Test that a refused reservation takes no token and a pause is seen by every limiter on the file"""
+    path = str(tmp_path / 'bucket')
+    first = FileTokenBucket(rate=1, burst=1, path=path)
+    second = FileTokenBucket(rate=1, burst=1, path=path)
+
+    assert first.acquire(max_wait=0)
+    assert second.reserve(max_wait=0.5) is None
+    assert 0.5 < second.wait_time() <= 1
+    assert 0.5 < first.reserve(max_wait=1) <= 1
+
+    first.pause(30)
+    assert 29 < second.paused_for() <= 30
@@ -0,0 +1,161 @@
+import threading
+import time
+import pytest
+from app import create_app
+from app.api import crypto_routes
+from app.services.coingecko_client import CoinGeckoClient
+from app.services.coingecko_service import CoinGeckoService, CryptoRequestError
+from app.utils.cache import SnapshotCache
+from app.utils.rate_limiter import FileTokenBucket, TokenBucket
+
+COINS = [{'id': f"coin-{i}", 'market_cap_rank': i} for i in range(1, 501)]
+
+@pytest.fixture
+def service(coingecko_stub):
+    """A CoinGecko service pointed at the stub, without rate limiting"""
+    service = CoinGeckoService()
+    service.client = CoinGeckoClient(coingecko_stub.base_url, timeout=5)
+    service.rate_limiter = TokenBucket(1000, 1000)
+    yield service
+    service.client.close()
+
+def test_market_lists_share_upstream_pages(service, coingecko_stub):
+    """Test that any per_page is sliced from one cached full-size page"""
+    coingecko_stub.routes['coins/markets'] = COINS[:250]
+
+    assert [coin['id'] for coin in service.get_markets('usd', per_page=10)['data']] == [f"coin-{i}" for i in range(1, 11)]
+    assert len(service.get_markets('USD', per_page=100)['data']) == 100
+    assert coingecko_stub.api_requests == 1
+    path, query = coingecko_stub.requests[0]
+    assert path == 'coins/markets' and 'per_page=250' in query and 'vs_currency=usd' in query
+
+    # A slice crossing an upstream page boundary fetches both pages
+    service.markets_page_size = 4
+    coingecko_stub.routes['coins/markets'] = COINS[:4]
+    assert len(service.get_markets('eur', per_page=3, page=2)['data']) == 3
+    assert coingecko_stub.api_requests == 3
+
+def test_concurrent_requests_coalesce(service, coingecko_stub):
+    """Test that simultaneous requests for one resource make a single upstream call"""
+    coingecko_stub.routes['global'] = {'data': {'active_cryptocurrencies': 10000}}
+    coingecko_stub.delay = 0.2
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(service.get_global())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(results) == 8
+    assert all(result['data']['data']['active_cryptocurrencies'] == 10000 for result in results)
+    assert coingecko_stub.api_requests == 1
+
+def test_429_backs_off_and_serves_stale(service, coingecko_stub):
+    """Test that a 429 stops upstream calls for Retry-After and cached data keeps being served"""
+    coingecko_stub.routes['search/trending'] = {'coins': []}
+    coingecko_stub.rate_limit(1, retry_after=60)
+
+    result = service.get_trending()
+    assert not result['success']
+    assert result['status_code'] == 503
+    assert 50 < result['retry_after'] <= 60
+    assert service.get_trending()['retry_after'] > 0
+    assert coingecko_stub.api_requests == 1
+
+    # Expired entries keep answering while their refresh is rate limited
+    service.rate_limiter = TokenBucket(1000, 1000)
+    service.caches['trending'] = SnapshotCache(default_ttl=0, stale_ttl=600)
+    service.caches['trending'].set('search/trending', {'coins': ['cached']})
+    coingecko_stub.rate_limit(1, retry_after=60)
+    assert service.get_trending()['data'] == {'coins': ['cached']}
+
+    for _ in range(100):
+        if service.backoff_remaining() > 0:
+            break
+        time.sleep(0.01)
+    assert service.backoff_remaining() > 50
+    assert service.get_trending()['data'] == {'coins': ['cached']}
+    assert coingecko_stub.api_requests == 2
+
+def test_exponential_backoff_without_retry_after(service, coingecko_stub):
+    """Test that consecutive 429s without Retry-After double the backoff"""
+    coingecko_stub.rate_limit(2)
+
+    service.get_global()
+    first = service.backoff_remaining()
+    service.rate_limiter = TokenBucket(1000, 1000)
+    service.get_global()
+
+    assert 4 < first <= 5
+    assert 9 < service.backoff_remaining() <= 10
+    assert service.breaker.stats()['state'] == 'closed'
+
+def test_rate_limit_wait_is_bounded(service, coingecko_stub):
+    """Test that a request short of tokens is answered from cache or with a 503 instead of sleeping"""
+    service.rate_limiter = TokenBucket(rate=0.01, burst=1)
+    service.max_wait = 0.1
+    coingecko_stub.routes['global'] = {'data': {}}
+    assert service.get_global()['success']
+
+    started = time.monotonic()
+    result = service.get_trending()
+    assert time.monotonic() - started < 1
+    assert result['status_code'] == 503
+    assert 90 < result['retry_after'] <= 100
+
+    service.caches['trending'] = SnapshotCache(default_ttl=0, stale_ttl=0)
+    service.caches['trending'].set('search/trending', {'coins': ['cached']})
+    assert service.get_trending() == {'success': True, 'data': {'coins': ['cached']}, 'stale': True}
+    assert coingecko_stub.api_requests == 1
+
+def test_backoff_is_shared_through_the_limiter_file(service, coingecko_stub, tmp_path):
+    """Test that one worker's 429 stops another worker sharing the rate-limit file"""
+    other = CoinGeckoService()
+    other.client = CoinGeckoClient(coingecko_stub.base_url, timeout=5)
+    service.rate_limiter = FileTokenBucket(1000, 1000, path=str(tmp_path / 'bucket'))
+    other.rate_limiter = FileTokenBucket(1000, 1000, path=str(tmp_path / 'bucket'))
+    coingecko_stub.rate_limit(1, retry_after=60)
+
+    assert service.get_global()['status_code'] == 503
+    assert other.backoff_remaining() > 50
+    assert other.get_global()['retry_after'] > 50
+    assert coingecko_stub.api_requests == 1
+    other.client.close()
+
+def test_unknown_coin_is_404_and_ids_are_validated(service, coingecko_stub):
+    """Test that an upstream 404 is reported as such and bad input never leaves the service"""
+    result = service.get_coin('no-such-coin')
+    assert not result['success']
+    assert result['status_code'] == 404
+
+    for call in (lambda: service.get_coin('../global'), lambda: service.get_markets(per_page=500),
+                 lambda: service.get_market_chart('bitcoin', days='3'), lambda: service.search('  ')):
+        with pytest.raises(CryptoRequestError):
+            call()
+    assert coingecko_stub.api_requests == 1
+
+def test_crypto_endpoints(service, coingecko_stub, monkeypatch):
+    """Test the proxy routes, their Cache-Control and error statuses"""
+    monkeypatch.setattr(crypto_routes, 'coingecko_service', service)
+    client = create_app('testing', start_background=False).test_client()
+    coingecko_stub.routes['coins/markets'] = COINS[:250]
+    coingecko_stub.routes['coins/bitcoin/market_chart'] = {'prices': [[1700000000000, 37000.5]]}
+
+    response = client.get('/api/crypto/coins/markets?vs_currency=usd&per_page=5')
+    assert response.status_code == 200
+    assert len(response.get_json()['data']) == 5
+    assert response.cache_control.max_age == 60
+
+    response = client.get('/api/crypto/coins/bitcoin/market_chart?days=30&interval=daily')
+    assert response.get_json()['data']['prices'] == [[1700000000000, 37000.5]]
+    assert 'interval=daily' in coingecko_stub.requests[-1][1]
+
+    assert client.get('/api/crypto/coins/no-such-coin').status_code == 404
+    assert client.get('/api/crypto/coins/markets?per_page=abc').status_code == 400
+
+    coingecko_stub.rate_limit(1, retry_after=30)
+    response = client.get('/api/crypto/global')
+    assert response.status_code == 503
+    assert int(response.headers['Retry-After']) > 0
+    assert client.get('/api/crypto/stats').get_json()['data']['cache']['markets']['misses'] == 1
@@ -0,0 +1,54 @@
+import pytest
+from app import create_app
+from app.api import routes
+
+HIGH_PAYLOAD = {
+    'highStocks': [{'symbol': 'TCS', 'ltp': 4120.5}],
+    'count': 1,
+    'totalHigh': 1,
+    'timestamp': '15-Jan-2024 15:30:00'
+}
+
+@pytest.fixture
+def client():
+    """Create a test client with a published 52-week high snapshot"""
+    routes.nse_service.snapshots.publish('52week_high', dict(HIGH_PAYLOAD), ttl=60)
+    app = create_app('testing')
+    with app.test_client() as client:
+        yield client
+
+def test_snapshot_validators(client):
+    """Test that snapshot responses carry ETag, Last-Modified and Cache-Control"""
+    response = client.get('/api/live/52week-high')
+
+    assert response.status_code == 200
+    assert response.headers['ETag'] == f'"{routes.nse_service.snapshots.get("52week_high").etag}"'
+    assert response.headers['Last-Modified'] == 'Mon, 15 Jan 2024 10:00:00 GMT'
+    assert 'max-age=60' in response.headers['Cache-Control']
+
+def test_matching_etag_returns_304(client):
+    """Test that a matching If-None-Match skips the body"""
+    etag = client.get('/api/live/52week-high').headers['ETag']
+
+    response = client.get('/api/live/52week-high', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+
+    routes.nse_service.snapshots.publish('52week_high', dict(HIGH_PAYLOAD, count=2), ttl=60)
+    assert client.get('/api/live/52week-high', headers={'If-None-Match': etag}).status_code == 200
+
+def test_republishing_same_content_keeps_modification_time():
+    """Test that identical data does not move the modification time or ETag"""
+    store = routes.nse_service.snapshots
+    first = store.publish('52week_high', dict(HIGH_PAYLOAD, timestamp=''), ttl=60)
+    second = store.publish('52week_high', dict(HIGH_PAYLOAD, timestamp=''), ttl=60)
+
+    assert second.etag == first.etag
+    assert second.last_modified == first.last_modified
+    assert second.fetched_at >= first.fetched_at
+
+def test_other_endpoints_get_content_etags(client):
+    """Test that non-snapshot GETs also support conditional requests"""
+    etag = client.get('/api/health').headers['ETag']
+
+    assert client.get('/api/health', headers={'If-None-Match': etag}).status_code == 304
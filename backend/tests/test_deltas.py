@@ -0,0 +1,67 @@
+import sys
+import threading
+from app import create_app
+from app.services.snapshot_store import SnapshotStore
+from payloads import indices
+
+def test_versions_increase_only_when_content_changes():
+    """Test that republishing identical data keeps the version"""
+    store = SnapshotStore(history_size=2)
+    first = store.publish('indices', indices(('NIFTY 50', 22000.0)))
+    same = store.publish('indices', indices(('NIFTY 50', 22000.0)))
+    second = store.publish('indices', indices(('NIFTY 50', 22001.0)))
+    third = store.publish('indices', indices(('NIFTY 50', 22002.0)))
+
+    assert same.version == first.version
+    assert first.version < second.version < third.version
+    assert store.versions('indices') == [second.version, third.version]
+    assert store.at_version('indices', first.version) is None
+
+def test_concurrent_publishes_get_distinct_versions():
+    """Test that publishes racing on one dataset never share a version"""
+    store = SnapshotStore(history_size=200)
+    start = threading.Barrier(8)
+
+    def publish(thread):
+        start.wait()
+        for i in range(25):
+            store.publish('indices', indices(('NIFTY 50', 22000.0 + thread * 100 + i)))
+
+    threads = [threading.Thread(target=publish, args=(thread,)) for thread in range(8)]
+    # Switch threads as often as possible so publishes interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    versions = store.versions('indices')
+    assert len(versions) == 200
+    assert all(earlier < later for earlier, later in zip(versions, versions[1:]))
+
+def test_since_returns_only_changed_rows(snapshot_store):
+    """Test ?since= deltas, the empty delta at the current version and the full-payload fallback"""
+    client = create_app('testing').test_client()
+    base = snapshot_store.publish('indices', indices(('NIFTY 50', 22000.0), ('NIFTY BANK', 47000.0), ('NIFTY IT', 36000.0)), ttl=60)
+    latest = snapshot_store.publish('indices', indices(('NIFTY 50', 22010.0), ('NIFTY BANK', 47000.0), ('INDIA VIX', 13.1)), ttl=60)
+
+    response = client.get(f"/api/indices/all?since={base.version}")
+    body = response.get_json()
+    assert body['format'] == 'delta'
+    assert response.headers['X-Snapshot-Version'] == str(latest.version)
+    assert body['data']['version'] == latest.version
+    assert [row['symbol'] for row in body['data']['added']] == ['INDIA VIX']
+    assert [row['symbol'] for row in body['data']['changed']] == ['NIFTY 50']
+    assert body['data']['removed'] == ['NIFTY IT']
+
+    current = client.get(f"/api/indices/all?since={latest.version}").get_json()['data']
+    assert (current['added'], current['changed'], current['removed']) == ([], [], [])
+
+    # Unknown or evicted versions fall back to the full payload
+    full = client.get('/api/indices/all?since=1').get_json()
+    assert 'format' not in full
+    assert full['data']['count'] == 3
@@ -0,0 +1,122 @@
+import math
+import numpy as np
+import pytest
+from app import create_app
+from app.api import crypto_routes
+from app.services.coingecko_client import CoinGeckoClient
+from app.services.coingecko_service import CoinGeckoService
+from app.services.downsampling import Downsampler, DownsamplingError, lttb, minmax, parse_resolution
+from app.utils.rate_limiter import TokenBucket
+
+# 10:00:00 IST on 15 Jan 2024
+OPEN = 1705293000
+
+def reference_lttb(points, threshold):
+    """Straightforward per-point LTTB, as published"""
+    n = len(points)
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    selected = [0]
+    for i in range(threshold - 2):
+        start, end = int(math.floor((i + 1) * every)) + 1, min(int(math.floor((i + 2) * every)) + 1, n)
+        following = points[start:end] or [points[-1]]
+        avg_x = sum(x for x, _ in following) / len(following)
+        avg_y = sum(y for _, y in following) / len(following)
+        best, chosen = -1, None
+        for j in range(int(math.floor(i * every)) + 1, int(math.floor((i + 1) * every)) + 1):
+            (ax, ay), (bx, by) = points[a], points[j]
+            area = abs((ax - avg_x) * (by - ay) - (ax - bx) * (avg_y - ay))
+            if area > best:
+                best, chosen = area, j
+        selected.append(chosen)
+        a = chosen
+    return selected + [n - 1]
+
+def random_walk(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return np.arange(n) * 60000.0 + 1.7e12, np.cumsum(rng.standard_normal(n))
+
+def test_lttb_matches_reference():
+    """Test that the vectorized LTTB picks the same points as the per-point algorithm"""
+    for n, threshold in ((1000, 100), (2003, 250), (12, 5)):
+        x, y = random_walk(n)
+        expected = reference_lttb(list(zip((x - x[0]).tolist(), y.tolist())), threshold)
+        assert lttb(x, y, threshold).tolist() == expected
+
+    assert lttb(*random_walk(10), 50).tolist() == list(range(10))
+
+def test_minmax_keeps_extremes():
+    """Test that min/max decimation keeps every bucket's peak and trough and the endpoints"""
+    x, y = random_walk(10000)
+    selected = minmax(x, y, 200)
+
+    assert len(selected) <= 200
+    assert selected[0] == 0 and selected[-1] == 9999
+    assert np.all(np.diff(selected) > 0)
+    assert y.argmax() in selected and y.argmin() in selected
+
+def test_parse_resolution():
+    """Test the ?points and ?method arguments"""
+    assert parse_resolution({}) is None
+    assert parse_resolution({'points': '200'}) == (200, 'lttb')
+    assert parse_resolution({'points': '50', 'method': 'minmax'}) == (50, 'minmax')
+    for args in ({'points': 'x'}, {'points': '2'}, {'points': '100', 'method': 'mean'}, {'points': '9000'}):
+        with pytest.raises(DownsamplingError):
+            parse_resolution(args, max_points=5000)
+
+def test_results_reused_until_the_source_changes():
+    """Test that a series is reduced once per source version"""
+    downsampler = Downsampler()
+    x, y = random_walk(1000)
+    chart = {'prices': np.column_stack([x, y]).tolist(), 'total_volumes': np.column_stack([x, y * 10]).tolist()}
+
+    first = downsampler.market_chart('btc', chart, 100)
+    assert len(first['prices']) == 100
+    assert [point[0] for point in first['total_volumes']] == [point[0] for point in first['prices']]
+    assert downsampler.indices('btc', chart, x, y, 100) is downsampler.indices('btc', chart, x, y, 100)
+    assert downsampler.cache.stats()['entries'] == 1
+
+    changed = {**chart, 'prices': chart['prices'][:-1]}
+    assert len(downsampler.market_chart('btc', changed, 100)['prices']) == 100
+    assert downsampler.cache.peek(('btc', 100, 'lttb'))[0] is changed
+
+def test_history_endpoint_downsamples(monkeypatch):
+    """Test that ?points thins index history bars"""
+    app = create_app('testing')
+    store = app.extensions['tick_store']
+    for minute, price in enumerate(random_walk(600)[1] + 20000):
+        store.record(OPEN + minute * 60, [('NIFTY 50', float(price))])
+    client = app.test_client()
+
+    data = client.get('/api/indices/NIFTY 50/history?period=max&interval=1m&points=60').get_json()['data']
+    assert data['count'] == 60
+    assert data['sourceCount'] == 600
+    assert data['bars'][0]['time'] == OPEN
+
+    assert client.get('/api/indices/NIFTY 50/history?period=max&interval=1m').get_json()['data']['count'] == 600
+    assert client.get('/api/indices/NIFTY 50/history?period=max&points=1').status_code == 400
+
+def test_market_chart_endpoint_downsamples(coingecko_stub, monkeypatch):
+    """Test that ?points thins a proxied CoinGecko chart"""
+    service = CoinGeckoService()
+    service.client = CoinGeckoClient(coingecko_stub.base_url, timeout=5)
+    service.rate_limiter = TokenBucket(1000, 1000)
+    monkeypatch.setattr(crypto_routes, 'coingecko_service', service)
+    x, y = random_walk(2000)
+    coingecko_stub.routes['coins/bitcoin/market_chart'] = {
+        'prices': np.column_stack([x, y + 100]).tolist(),
+        'market_caps': np.column_stack([x, y]).tolist(),
+        'total_volumes': np.column_stack([x, y]).tolist()
+    }
+    client = create_app('testing', start_background=False).test_client()
+
+    response = client.get('/api/crypto/coins/bitcoin/market_chart?days=365&points=200&method=minmax')
+    data = response.get_json()['data']
+    assert len(data['prices']) <= 200
+    assert len(data['market_caps']) == len(data['prices'])
+    assert max(price for _, price in data['prices']) == pytest.approx(y.max() + 100)
+
+    assert len(client.get('/api/crypto/coins/bitcoin/market_chart?days=365').get_json()['data']['prices']) == 2000
+    assert client.get('/api/crypto/coins/bitcoin/market_chart?days=365&points=abc').status_code == 400
+    assert coingecko_stub.api_requests == 1
+    service.client.close()
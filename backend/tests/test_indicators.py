@@ -0,0 +1,76 @@
+import numpy as np
+from app import create_app
+from app.services.indicator_service import INDICATOR_NAMES, IndicatorEngine
+from app.services.nse_service import DATASETS
+from app.api.routes import nse_service
+
+# 10:00:00 IST on 15 Jan 2024, aligned to a 5 minute bar
+OPEN = 1705293000
+
+def reference_ema(values, period):
+    """Full-history EMA seeded with the first value"""
+    alpha = 2.0 / (period + 1)
+    ema = values[0]
+    for value in values[1:]:
+        ema = ema + alpha * (value - ema)
+    return ema
+
+def test_incremental_updates_match_full_recompute():
+    """Test that per-bar updates agree with recomputing over the whole history"""
+    rng = np.random.default_rng(7)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(120, 3)), axis=0))
+    engine = IndicatorEngine(['A', 'B', 'C'])
+
+    latest = engine.load(closes)
+
+    assert latest.shape == (3, len(INDICATOR_NAMES))
+    column = {name: i for i, name in enumerate(INDICATOR_NAMES)}
+    np.testing.assert_allclose(latest[:, column['sma20']], closes[-20:].mean(axis=0))
+    np.testing.assert_allclose(latest[:, column['sma50']], closes[-50:].mean(axis=0))
+    np.testing.assert_allclose(latest[:, column['bbMiddle']], closes[-20:].mean(axis=0))
+    np.testing.assert_allclose(
+        latest[:, column['volatility20']],
+        np.diff(np.log(closes[-21:]), axis=0).std(axis=0, ddof=1)
+    )
+    for i in range(3):
+        assert np.isclose(latest[i, column['ema12']], reference_ema(closes[:, i], 12))
+        assert np.isclose(latest[i, column['ema26']], reference_ema(closes[:, i], 26))
+    assert np.all((latest[:, column['rsi14']] >= 0) & (latest[:, column['rsi14']] <= 100))
+
+def test_indicators_wait_for_enough_bars():
+    """Test that indicators stay undefined until their period has been seen"""
+    engine = IndicatorEngine(['A', 'B'])
+    engine.load([[100.0 + i, np.nan if i < 10 else 50.0 + i] for i in range(25)])
+
+    assert engine.values('A')['sma20'] is not None
+    assert engine.values('A')['sma50'] is None
+    assert engine.values('B')['sma20'] is None
+    assert engine.values('B')['close'] == 74.0
+
+def test_indicator_endpoints():
+    """Test single and batch indicator endpoints seeded from the tick store"""
+    app = create_app('testing')
+    store = app.extensions['tick_store']
+    service = app.extensions['indicator_service']
+    service.engine = None
+
+    symbols = DATASETS['nifty50_symbols'].transform({'data': [{'symbol': 'NIFTY 50'}, {'symbol': 'TCS'}, {'symbol': 'INFY'}]})
+    nse_service.snapshots.publish('nifty50_symbols', symbols, ttl=60)
+    for i in range(30):
+        store.record(OPEN + i * 300, [('TCS', 3500.0 + i), ('INFY', 1500.0 + i)])
+
+    client = app.test_client()
+    response = client.get('/api/indicators/tcs')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['bars'] == 30
+    assert data['indicators']['close'] == 3529.0
+    assert data['indicators']['sma20'] == sum(3500.0 + i for i in range(10, 30)) / 20
+    assert data['indicators']['sma50'] is None
+
+    batch = client.get('/api/indicators?symbols=INFY,TCS&format=columnar').get_json()['data']
+    assert batch['indicators']['symbols'] == ['INFY', 'TCS']
+    assert batch['indicators']['fields'] == list(INDICATOR_NAMES)
+    assert batch['indicators']['values'][0][0] == 1529.0
+
+    assert client.get('/api/indicators/UNKNOWN').status_code == 404
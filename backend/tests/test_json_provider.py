@@ -0,0 +1,60 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+import numpy as np
+import pytest
+from app import create_app
+from app.models.snapshot import Snapshot
+from app.utils import json_provider
+
+PAYLOAD = {
+    'lastPrice': 24500.55,
+    'advances': 32,
+    'pe': Decimal('22.41'),
+    'asOf': datetime(2024, 1, 15, 10, 30, tzinfo=timezone.utc),
+    'tradeDate': date(2024, 1, 15),
+    'perChange365d': float('nan')
+}
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def backend(request, monkeypatch):
+    """Run a test against both the orjson and stdlib encoders"""
+    if request.param == 'orjson' and json_provider.orjson is None:
+        pytest.skip('orjson is not installed')
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    return request.param
+
+def test_numbers_and_dates_match_flask(backend):
+    """Test that both encoders produce the same valid JSON"""
+    decoded = json.loads(json_provider.dumps_bytes(PAYLOAD))
+
+    assert decoded == {
+        'lastPrice': 24500.55,
+        'advances': 32,
+        'pe': '22.41',
+        'asOf': 'Mon, 15 Jan 2024 10:30:00 GMT',
+        'tradeDate': 'Mon, 15 Jan 2024 00:00:00 GMT',
+        'perChange365d': None
+    }
+
+def test_provider_installed_and_keeps_key_order(backend):
+    """Test that create_app installs the fast provider"""
+    app = create_app('testing')
+
+    assert isinstance(app.json, json_provider.FastJSONProvider)
+    with app.app_context():
+        assert app.json.dumps({'b': 1, 'a': 2}) == '{"b":1,"a":2}'
+
+def test_numpy_arrays(backend):
+    """Test that NumPy arrays and scalars encode as lists and numbers, NaN as null"""
+    payload = {'grid': np.arange(4.0).reshape(2, 2)[:, ::-1], 'rate': np.float64(7.5), 'gap': np.array([np.nan])}
+
+    assert json.loads(json_provider.dumps_bytes(payload)) == {'grid': [[1.0, 0.0], [3.0, 2.0]], 'rate': 7.5, 'gap': [None]}
+
+def test_snapshot_body_encoded_once():
+    """Test that repeated reads of a snapshot reuse its encoded bytes"""
+    snapshot = Snapshot(name='indices', payload={'indices': [], 'count': 0})
+
+    assert snapshot.body is snapshot.body
+    assert json.loads(snapshot.body) == {'status': 'success', 'data': {'indices': [], 'count': 0}}
@@ -0,0 +1,34 @@
+import logging
+from logging.handlers import TimedRotatingFileHandler
+from app import create_app
+from app.utils import logger as logger_module
+from app.utils.logger import setup_logger
+
+def test_config_log_level_is_applied():
+    """Test that create_app applies the config's LOG_LEVEL"""
+    create_app('testing')
+    assert logger_module.logger.level == logging.DEBUG
+
+    try:
+        logger = setup_logger(level='WARNING', log_file='')
+        assert not logger.isEnabledFor(logging.INFO)
+    finally:
+        setup_logger(level='DEBUG', log_file='')
+
+def test_records_are_written_by_listener_thread(tmp_path):
+    """Test that the logger only enqueues and the listener writes the rotating file"""
+    log_file = tmp_path / 'app.log'
+    try:
+        logger = setup_logger(level='INFO', log_file=str(log_file), rotation='time')
+        assert [type(handler) for handler in logger.handlers] == [logger_module._DeferredQueueHandler]
+        assert isinstance(logger_module._listener.handlers[-1], TimedRotatingFileHandler)
+
+        logger.info("Processed %s %s records", 50, 'nifty50')
+        logger.debug("Disabled level %s", 'never formatted')
+        logger_module.stop_logging()
+
+        contents = log_file.read_text()
+        assert 'Processed 50 nifty50 records' in contents
+        assert 'never formatted' not in contents
+    finally:
+        setup_logger(level='DEBUG', log_file='')
@@ -0,0 +1,84 @@
+import time
+from datetime import datetime, timezone
+import pytest
+from app import create_app
+from app.api import routes
+from app.services.market_poller import MarketDataPoller
+from app.services.nse_service import NSEService
+
+ALL_INDICES = {
+    'data': [
+        {'key': 'BROAD MARKET INDICES', 'index': 'NIFTY 50', 'indexSymbol': 'NIFTY 50', 'last': 24500.5}
+    ]
+}
+
+def make_poller(service):
+    """Create a poller with distinct market and off-hours intervals"""
+    return MarketDataPoller(
+        service,
+        market_hours_intervals={'indices': 15},
+        off_hours_intervals={'indices': 300}
+    )
+
+def test_market_hours_schedule():
+    """Test that the poll interval follows IST trading hours"""
+    poller = make_poller(NSEService())
+
+    # 10:30 IST on a Monday
+    assert poller.is_market_open(datetime(2024, 1, 15, 5, 0, tzinfo=timezone.utc))
+    assert poller.interval_for('indices', datetime(2024, 1, 15, 5, 0, tzinfo=timezone.utc)) == 15
+    # 16:30 IST on a Monday
+    assert not poller.is_market_open(datetime(2024, 1, 15, 11, 0, tzinfo=timezone.utc))
+    # 10:30 IST on a Saturday
+    assert poller.interval_for('indices', datetime(2024, 1, 20, 5, 0, tzinfo=timezone.utc)) == 300
+
+def test_poll_once_publishes_snapshot(monkeypatch):
+    """Test that a poll publishes an immutable snapshot of the dataset"""
+    service = NSEService()
+    monkeypatch.setattr(service.client, 'get_json', lambda endpoint: ALL_INDICES)
+
+    result = make_poller(service).poll_once('indices')
+
+    assert result['success']
+    snapshot = service.snapshots.get('indices')
+    assert snapshot is result['snapshot']
+    assert snapshot.payload['count'] == 1
+    assert snapshot.payload['indices'][0]['lastPrice'] == 24500.5
+    with pytest.raises(AttributeError):
+        snapshot.payload = {}
+
+def test_route_reads_published_snapshot(monkeypatch):
+    """Test that routes serve the published snapshot without an upstream call"""
+    def fail(endpoint):
+        raise AssertionError('unexpected upstream call')
+
+    routes.nse_service.snapshots.publish('indices', {'indices': [], 'count': 0}, ttl=60)
+    monkeypatch.setattr(routes.nse_service.client, 'get_json', fail)
+
+    client = create_app('testing').test_client()
+    response = client.get('/api/indices/all')
+
+    assert response.status_code == 200
+    assert response.get_json()['data'] == {'indices': [], 'count': 0}
+
+def test_expired_fallback_is_published_stale(monkeypatch):
+    """Test that data served from an expired response is flagged stale rather than published as fresh"""
+    def fail(endpoint):
+        raise ConnectionError('NSE is down')
+
+    service = NSEService()
+    endpoint = service.DATASETS['indices'].endpoint
+    service.cache.set(endpoint, ALL_INDICES)
+    fresh = service.refresh_snapshot('indices', ttl=0, force=False)['snapshot']
+    # Past both the TTL and the stale-while-revalidate window
+    service.cache._entries[endpoint].expires_at = time.monotonic() - service.cache.stale_ttl - 1
+    monkeypatch.setattr(service.client, 'get_json', fail)
+
+    result = service.get_snapshot('indices')
+
+    assert result['success'] and result['stale']
+    snapshot = result['snapshot']
+    assert snapshot.stale
+    assert snapshot.version == fresh.version
+    assert snapshot.expires_at - snapshot.fetched_at <= 10
+    assert 'stale' not in snapshot.payload
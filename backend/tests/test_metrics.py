@@ -0,0 +1,47 @@
+from app import create_app
+from app.api.routes import nse_service
+from app.services.nse_client import NSEClient
+from app.services.nse_service import DATASETS, NSEService
+from app.utils import metrics
+from app.utils.metrics import MetricsRegistry
+
+def test_histogram_exposition():
+    """Test cumulative buckets, sum and count in the Prometheus text format"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram('fetch_seconds', 'Fetch time', ('endpoint',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 2.0):
+        histogram.observe(value, 'allIndices')
+
+    text = registry.render()
+    assert '# TYPE fetch_seconds histogram' in text
+    assert 'fetch_seconds_bucket{endpoint="allIndices",le="0.1"} 1' in text
+    assert 'fetch_seconds_bucket{endpoint="allIndices",le="1.0"} 2' in text
+    assert 'fetch_seconds_bucket{endpoint="allIndices",le="+Inf"} 3' in text
+    assert 'fetch_seconds_count{endpoint="allIndices"} 3' in text
+
+def test_upstream_and_transform_timings(nse_stub):
+    """Test that NSE fetches and schema transforms are timed per endpoint and dataset"""
+    service = NSEService()
+    service.client = NSEClient(nse_stub.base_url, nse_stub.home_url, timeout=5)
+    nse_stub.routes['allIndices'] = {'data': [{'indexSymbol': 'NIFTY 50', 'last': 22000.0}]}
+    fetches = metrics.UPSTREAM_LATENCY.snapshot('allIndices', 'success')[2]
+    transforms = metrics.TRANSFORM_LATENCY.snapshot('indices')[2]
+
+    assert service.get_dataset('indices')['success']
+    assert metrics.UPSTREAM_LATENCY.snapshot('allIndices', 'success')[2] == fetches + 1
+    assert metrics.TRANSFORM_LATENCY.snapshot('indices')[2] == transforms + 1
+
+def test_metrics_endpoint():
+    """Test that route latency, payload size and cache gauges are exposed at /metrics"""
+    client = create_app('testing').test_client()
+    nse_service.snapshots.publish('indices', DATASETS['indices'].transform({'data': []}), ttl=60)
+    client.get('/api/indices/all')
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    text = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{route="/api/indices/all",method="GET",status="200"}' in text
+    assert 'http_response_size_bytes_count{route="/api/indices/all"}' in text
+    assert 'snapshot_encode_seconds_count{dataset="indices"}' in text
+    assert 'nse_cache_hit_ratio ' in text
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from app import create_app
+from app.services.calculator import CalculatorError
+from app.services.monte_carlo import MonteCarloEngine, MonteCarloTimeout, parse_projection, projection_key, simulate_chunk
+
+@pytest.fixture
+def client():
+    """Create a test client for the app"""
+    app = create_app('testing', start_background=False)
+    return app.test_client()
+
+def test_results_do_not_depend_on_chunking_or_processes():
+    """Test that seeded chunk streams give the same bands inline and across a process pool"""
+    params = {'amount': 5000, 'years': 5, 'paths': 6000, 'seed': 7}
+    inline = MonteCarloEngine(processes=1, chunk_paths=2000).project('sip', params)
+    pooled_engine = MonteCarloEngine(processes=2, chunk_paths=2000)
+    try:
+        pooled = pooled_engine.project('sip', params)
+    finally:
+        pooled_engine.close()
+
+    assert pooled['bands'] == inline['bands']
+    assert pooled['mean'] == inline['mean']
+    assert MonteCarloEngine(processes=1, chunk_paths=2000).project('sip', {**params, 'seed': 8})['bands'] != inline['bands']
+
+def test_projection_statistics():
+    """Test that the mean matches the fixed-rate calculator and zero volatility collapses the bands"""
+    engine = MonteCarloEngine(processes=1)
+
+    lumpsum = engine.project('lumpsum', {'amount': 100000, 'years': 10, 'paths': 200000})
+    assert lumpsum['mean'] == pytest.approx(lumpsum['fixedRateCorpus'], rel=0.01)
+    assert lumpsum['bands']['p10'] < lumpsum['bands']['p50'] < lumpsum['bands']['p90']
+    assert lumpsum['invested'] == 100000
+
+    sip = engine.project('sip', {'amount': 10000, 'years': 30, 'expectedReturn': 12, 'volatility': 1, 'paths': 20000})
+    assert sip['mean'] == pytest.approx(sip['fixedRateCorpus'], rel=0.01)
+
+    flat = engine.project('sip', {'amount': 1000, 'years': 2, 'volatility': 0, 'expectedReturn': 0, 'percentiles': [5, 95]})
+    assert list(flat['bands']) == ['p5', 'p95']
+    assert flat['bands']['p5'] == pytest.approx(24000)
+    assert flat['bands']['p95'] == pytest.approx(24000)
+    assert flat['probabilityOfLoss'] == 0
+
+def test_results_are_cached_by_parameters():
+    """Test that repeated projections hit the cache and equivalent parameters share a key"""
+    engine = MonteCarloEngine(processes=1)
+    first = engine.project('sip', {'amount': 1000, 'years': 1, 'paths': 100})
+    assert engine.project('sip', {'amount': '1000', 'years': 1.0, 'paths': 100}) is first
+    assert engine.stats()['cache']['hits'] == 1
+
+    assert projection_key(parse_projection('sip', {'amount': 1, 'years': 1, 'percentiles': [90, 10, 50]})) == \
+        projection_key(parse_projection('sip', {'amount': 1, 'years': 1}))
+
+def test_invalid_projections():
+    """Test parameter validation"""
+    for kind, params in (('sip', {'years': 1}), ('sip', {'amount': 1, 'years': 0}), ('sip', {'amount': 1, 'years': 1, 'volatility': -1}),
+                         ('lumpsum', {'amount': 1, 'years': 1, 'paths': 0}), ('sip', {'amount': 1, 'years': 1, 'percentiles': [0]}),
+                         ('bond', {'amount': 1, 'years': 1})):
+        with pytest.raises(CalculatorError):
+            parse_projection(kind, params)
+    with pytest.raises(CalculatorError):
+        parse_projection('sip', {'amount': 1, 'years': 1, 'paths': 11}, max_paths=10)
+
+def test_simulate_chunk_is_reproducible():
+    """Test that a chunk's values depend only on its seed"""
+    seed = np.random.SeedSequence(3).spawn(1)[0]
+    first = simulate_chunk('sip', 100, 3, 0.1, 0.2, 50, seed)
+    assert np.array_equal(first, simulate_chunk('sip', 100, 3, 0.1, 0.2, 50, seed))
+
+def test_monte_carlo_endpoint(client):
+    """Test the projection endpoint, its errors and stats"""
+    response = client.get('/api/calc/monte-carlo/sip?amount=5000&years=10&paths=2000&percentiles=10,50,90')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert set(data['bands']) == {'p10', 'p50', 'p90'}
+    assert data['invested'] == 600000
+
+    assert client.post('/api/calc/monte-carlo/lumpsum', json={'amount': 1000, 'years': 5, 'paths': 100}).status_code == 200
+    assert client.get('/api/calc/monte-carlo/bond?amount=1&years=1').status_code == 404
+    assert client.get('/api/calc/monte-carlo/sip?amount=1&years=1&paths=2000000').status_code == 400
+    assert client.get('/api/calc/monte-carlo/stats').get_json()['data']['cache']['misses'] == 2
+
+def test_timeouts_return_503_and_stop_abandoned_work(client):
+    """Test the time budget inline and on the pool, whose running chunks are stopped"""
+    client.application.extensions['monte_carlo'] = MonteCarloEngine(processes=1, chunk_paths=1000, timeout=0)
+    response = client.get('/api/calc/monte-carlo/sip?amount=5000&years=30&paths=20000')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'error'
+
+    engine = MonteCarloEngine(processes=2, chunk_paths=1000, timeout=0.05)
+    try:
+        # Started before timing so pool startup does not use up the budget
+        pool = engine._get_executor()
+        pool.submit(int).result(timeout=60)
+        processes = list(pool._processes.values())
+        with pytest.raises(MonteCarloTimeout):
+            engine.project('sip', {'amount': 5000, 'years': 30, 'paths': 200000})
+        assert engine.stats()['poolStarted'] is False
+        for process in processes:
+            process.join(timeout=10)
+            assert not process.is_alive()
+        assert engine.project('lumpsum', {'amount': 1000, 'years': 1, 'paths': 100})['paths'] == 100
+    finally:
+        engine.close()
@@ -0,0 +1,52 @@
+import pytest
+import requests
+from app.services.nse_client import NSEClient
+
+def make_client(stub, timeout=5):
+    """Create a client pointed at the stub server"""
+    return NSEClient(stub.base_url, stub.home_url, timeout=timeout)
+
+def test_handshake_once_and_reuse_connection(nse_stub):
+    """Test that cookies and the TCP connection are reused across requests"""
+    nse_stub.routes['allIndices'] = {'data': [{'index': 'NIFTY 50'}]}
+    client = make_client(nse_stub)
+
+    for _ in range(5):
+        assert client.get_json('allIndices') == {'data': [{'index': 'NIFTY 50'}]}
+
+    assert nse_stub.handshakes == 1
+    assert client.handshakes == 1
+    assert nse_stub.api_requests == 5
+    assert len(nse_stub.connections) == 1
+
+def test_cookies_refreshed_on_401(nse_stub):
+    """Test that an expired cookie triggers one new handshake and a retry"""
+    nse_stub.routes['allIndices'] = {'data': []}
+    client = make_client(nse_stub)
+    client.get_json('allIndices')
+
+    nse_stub.expire_cookies()
+    assert client.get_json('allIndices') == {'data': []}
+    assert nse_stub.handshakes == 2
+
+def test_gzip_response_decoded(nse_stub):
+    """Test that gzip-encoded bodies are advertised and decoded"""
+    nse_stub.routes['allIndices'] = {'data': [{'index': 'NIFTY BANK'}] * 50}
+    client = make_client(nse_stub)
+
+    assert 'gzip' in client.session.headers['Accept-Encoding']
+    assert len(client.get_json('allIndices')['data']) == 50
+
+def test_http_errors_raise(nse_stub):
+    """Test that non-auth HTTP errors surface to the caller"""
+    client = make_client(nse_stub)
+
+    with pytest.raises(requests.HTTPError):
+        client.get_json('missing')
+
+def test_service_client_uses_config_timeout():
+    """Test that the service's client honors Config.NSE_TIMEOUT"""
+    from app.config.config import Config
+    from app.services.nse_service import NSEService
+
+    assert NSEService().client.timeout == Config.NSE_TIMEOUT
@@ -0,0 +1,65 @@
+from app import create_app
+from app.api.routes import nse_service
+from app.models.quotes import QuoteIndex
+from app.services.nse_service import DATASETS
+
+RAW_NIFTY50 = {
+    'timestamp': '15-Jan-2024 15:30:00',
+    'data': [
+        {'symbol': 'NIFTY 50', 'lastPrice': 22032.3, 'change': 137.75, 'pChange': 0.63},
+        {'symbol': 'TCS', 'lastPrice': 3900.0, 'change': 40.0, 'pChange': 1.04, 'totalTradedValue': 9e9,
+         'meta': {'companyName': 'Tata Consultancy Services Limited', 'industry': 'Computers - Software & Consulting'}},
+        {'symbol': 'INFY', 'lastPrice': 1650.0, 'change': -5.0, 'pChange': -0.3, 'totalTradedValue': 7e9,
+         'meta': {'companyName': 'Infosys Limited', 'industry': 'Computers - Software & Consulting'}},
+        {'symbol': 'HDFCBANK', 'lastPrice': 1680.0, 'change': 0.0, 'pChange': 0.0, 'totalTradedValue': 1.2e10,
+         'meta': {'companyName': 'HDFC Bank Limited', 'industry': 'Private Sector Bank'}}
+    ]
+}
+
+def test_nested_fields_and_index_row():
+    """Test that meta fields map from nested paths and the index row is kept apart"""
+    quotes = QuoteIndex.from_payload(DATASETS['nifty50'].transform(RAW_NIFTY50))
+
+    assert len(quotes) == 3
+    assert 'NIFTY 50' not in quotes
+    assert quotes.index_quote['lastPrice'] == 22032.3
+    assert quotes.quote('INFY')['companyName'] == 'Infosys Limited'
+    assert quotes.quote('UNKNOWN') is None
+
+def test_sector_groupings_and_breadth():
+    """Test the precomputed sector groups and advance/decline aggregates"""
+    quotes = QuoteIndex.from_payload(DATASETS['nifty50'].transform(RAW_NIFTY50))
+
+    it = quotes.sectors['Computers - Software & Consulting']
+    assert it['symbols'] == ['TCS', 'INFY']
+    assert (it['advances'], it['declines'], it['avgPChange']) == (1, 1, 0.37)
+    assert quotes.breadth == {'advances': 1, 'declines': 1, 'unchanged': 1, 'advanceDeclineRatio': 1.0}
+
+    overview = quotes.overview()
+    assert overview['topGainers'][0]['symbol'] == 'TCS'
+    assert overview['mostActive'][0]['symbol'] == 'HDFCBANK'
+    assert [sector['sector'] for sector in overview['sectors']] == ['Computers - Software & Consulting', 'Private Sector Bank']
+
+def test_nifty50_endpoints():
+    """Test the stocks, single-stock and market-overview endpoints the frontend calls"""
+    client = create_app('testing').test_client()
+    nse_service.snapshots.publish('nifty50', DATASETS['nifty50'].transform(RAW_NIFTY50), ttl=60)
+
+    stocks = client.get('/api/nifty50/stocks')
+    assert stocks.status_code == 200
+    data = stocks.get_json()['data']
+    assert [stock['symbol'] for stock in data['stocks']] == ['TCS', 'INFY', 'HDFCBANK']
+    assert data['index']['symbol'] == 'NIFTY 50'
+
+    banks = client.get('/api/nifty50/stocks?sector=Private Sector Bank&format=columnar').get_json()['data']
+    assert banks['stocks']['columns'][0] == ['HDFCBANK']
+    assert client.get('/api/nifty50/stocks?sector=Nope').status_code == 404
+
+    stock = client.get('/api/nifty50/stock/tcs')
+    assert stock.get_json()['data']['quote']['industry'] == 'Computers - Software & Consulting'
+    assert client.get('/api/nifty50/stock/tcs', headers={'If-None-Match': stock.headers['ETag']}).status_code == 304
+    assert client.get('/api/nifty50/stock/NIFTY 50').status_code == 404
+
+    overview = client.get('/api/nifty50/market-overview').get_json()['data']
+    assert overview['breadth']['advances'] == 1
+    assert overview['count'] == 3
@@ -0,0 +1,45 @@
+from app import create_app
+from app.api import routes
+from app.models.records import Field, RecordTable
+
+FIELDS = (
+    Field('symbol', 'symbol', str, ''),
+    Field('companyName', 'comapnyName', str, ''),
+    Field('ltp', 'ltp', float, 0.0),
+    Field('pChange', 'pChange', float, 0.0)
+)
+
+ROWS = [
+    {'symbol': 'TCS', 'comapnyName': 'Tata Consultancy Services', 'ltp': '4,120.50', 'pChange': 1.2},
+    {'symbol': 'INFY', 'ltp': 1650, 'pChange': '-'}
+]
+
+def test_numeric_fields_parsed_once_as_floats():
+    """Test that numeric columns are packed floats with defaults applied"""
+    table = RecordTable.from_rows(FIELDS, ROWS)
+
+    assert len(table) == 2
+    assert table.column('ltp').typecode == 'd'
+    assert list(table.column('ltp')) == [4120.5, 1650.0]
+    assert table[1] == {'symbol': 'INFY', 'companyName': '', 'ltp': 1650.0, 'pChange': 0.0}
+
+def test_columnar_view_names_fields_once():
+    """Test the column-oriented representation"""
+    columnar = RecordTable.from_rows(FIELDS, ROWS).to_columnar()
+
+    assert columnar['fields'] == ['symbol', 'companyName', 'ltp', 'pChange']
+    assert columnar['columns'][0] == ['TCS', 'INFY']
+    assert columnar['length'] == 2
+
+def test_route_serves_rows_and_columnar_format():
+    """Test that a table-backed snapshot serves both output formats"""
+    table = RecordTable.from_rows(FIELDS, ROWS)
+    routes.nse_service.snapshots.publish('52week_high', {'highStocks': table, 'count': 2}, ttl=60)
+    client = create_app('testing').test_client()
+
+    rows = client.get('/api/live/52week-high').get_json()
+    columnar = client.get('/api/live/52week-high?format=columnar')
+
+    assert rows['data']['highStocks'][0]['ltp'] == 4120.5
+    assert columnar.get_json()['data']['highStocks']['columns'][2] == [4120.5, 1650.0]
+    assert columnar.headers['ETag'] != client.get('/api/live/52week-high').headers['ETag']
@@ -0,0 +1,101 @@
+import csv
+import io
+import json
+import tracemalloc
+import pytest
+from app import create_app
+from app.services.calculator import CALCULATORS, CalculatorError, evaluate
+from app.services.schedules import SCHEDULES, parse_plans, stream_schedule
+
+@pytest.fixture
+def client():
+    """Create a test client for the app"""
+    app = create_app('testing', start_background=False)
+    return app.test_client()
+
+def test_schedules_agree_with_calculators():
+    """Test that an amortization clears the loan at the EMI and a SIP ends at its maturity amount"""
+    rows = list(SCHEDULES['emi'].generate(500000, 9, 20, 'monthly'))
+    expected = evaluate(CALCULATORS['emi'], {'amount': 500000, 'rate': 9, 'years': 20})['results']
+
+    assert len(rows) == 240
+    assert rows[0][1] == pytest.approx(expected['emi'].item(), abs=0.01)
+    assert rows[-1][-1] == 0
+    assert sum(row[3] for row in rows) == pytest.approx(expected['totalInterest'].item(), abs=1)
+
+    rows = list(SCHEDULES['sip'].generate(5000, 12, 10))
+    expected = evaluate(CALCULATORS['sip'], {'amount': 5000, 'rate': 12, 'years': 10})['results']
+    assert rows[-1][-1] == pytest.approx(expected['maturityAmount'].item(), abs=0.01)
+
+def test_parse_plans_validates_up_front():
+    """Test that bad plans are rejected before streaming and rows are counted"""
+    schedule = SCHEDULES['emi']
+    plans, frequency, rows = parse_plans(schedule, {'plans': [{'amount': 1000, 'rate': 8, 'years': 2}] * 3, 'frequency': 'quarterly'})
+    assert len(plans) == 3 and frequency == 'quarterly' and rows == 24
+
+    for params in ({'plans': []}, {'plans': [{'amount': 1, 'rate': 1}]}, {'amount': 1, 'rate': -1, 'years': 1},
+                   {'amount': 1, 'rate': 1, 'years': 0.01}, {'amount': 1, 'rate': 1, 'years': 1, 'frequency': 'daily'}):
+        with pytest.raises(CalculatorError):
+            parse_plans(schedule, params)
+    with pytest.raises(CalculatorError):
+        parse_plans(schedule, {'amount': 1, 'rate': 1, 'years': 30}, max_rows=100)
+
+def test_sip_schedule_is_monthly_only(client):
+    """Test that a SIP counts monthly rows and refuses any other frequency"""
+    assert parse_plans(SCHEDULES['sip'], {'amount': 1000, 'rate': 12, 'years': 10})[2] == 120
+    for frequency in ('yearly', 'bogus'):
+        response = client.get(f"/api/calc/schedule/sip?amount=1000&rate=12&years=10&frequency={frequency}")
+        assert response.status_code == 400
+    response = client.get('/api/calc/schedule/emi?amount=1000&rate=12&years=10&frequency=bogus')
+    assert response.status_code == 400
+
+def test_overflowing_plans_rejected_before_streaming(client):
+    """Test that a rate too large to compute is a 400, not a truncated stream"""
+    for name in ('emi', 'sip'):
+        with pytest.raises(CalculatorError):
+            parse_plans(SCHEDULES[name], {'amount': 1000, 'rate': 100000, 'years': 30})
+        response = client.get(f"/api/calc/schedule/{name}?amount=1000&rate=100000&years=30")
+        assert response.status_code == 400
+
+    # Large but representable growth still streams to the last row
+    lines = client.get('/api/calc/schedule/emi?amount=1000&rate=1000&years=30').get_data(as_text=True).splitlines()
+    assert len(lines) == 360
+    assert json.loads(lines[-1])['balance'] == 0
+
+def test_stream_memory_does_not_grow_with_rows():
+    """Test that encoding ten times the rows does not raise peak memory"""
+    def peak(plan_count):
+        plans = [(100000.0 + i, 9.0, 30.0) for i in range(plan_count)]
+        tracemalloc.start()
+        try:
+            for _ in stream_schedule(SCHEDULES['emi'], plans, 'monthly', chunk_size=16 * 1024):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    assert peak(100) < peak(10) * 1.5
+
+def test_schedule_endpoint_streams_ndjson_and_csv(client):
+    """Test both output formats, the row count header and error responses"""
+    body = {'plans': [{'amount': 120000, 'rate': 0, 'years': 1}, {'amount': 50000, 'rate': 10, 'years': 2}]}
+
+    response = client.post('/api/calc/schedule/emi', json=body)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    assert response.headers['X-Schedule-Rows'] == '36'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 36
+    assert lines[0] == {'plan': 0, 'period': 1, 'payment': 10000.0, 'principal': 10000.0, 'interest': 0.0, 'balance': 110000.0}
+    assert lines[-1]['plan'] == 1 and lines[-1]['balance'] == 0
+
+    response = client.get('/api/calc/schedule/sip?amount=1000&rate=12&years=1&format=csv')
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 12
+    assert rows[-1]['invested'] == '12000.0'
+
+    assert client.get('/api/calc/schedule/unknown?amount=1&rate=1&years=1').status_code == 404
+    assert client.get('/api/calc/schedule/emi?amount=1&rate=1&years=1&format=xml').status_code == 400
+    assert client.post('/api/calc/schedule/emi', json={'plans': 'all'}).status_code == 400
@@ -0,0 +1,57 @@
+from app import create_app
+from app.api import routes
+from app.models.records import Field
+from app.models.schema import EndpointSchema
+from app.services.nse_service import DATASETS, NSEService
+
+FIELDS = (
+    Field('symbol', 'symbol', str, ''),
+    Field('ltp', 'ltp', float, 0.0)
+)
+
+def test_fast_and_fallback_paths_agree():
+    """Test that rows missing keys map the same as the .get() fallback"""
+    schema = EndpointSchema('test', 'test', 'stocks', FIELDS)
+
+    complete = schema.transform({'data': [{'symbol': 'TCS', 'ltp': 4120.5}]})
+    partial = schema.transform({'data': [{'symbol': 'TCS', 'ltp': 4120.5}, {'symbol': 'INFY'}]})
+
+    assert complete['stocks'].to_rows() == [{'symbol': 'TCS', 'ltp': 4120.5}]
+    assert partial['stocks'].to_rows() == [{'symbol': 'TCS', 'ltp': 4120.5}, {'symbol': 'INFY', 'ltp': 0.0}]
+    assert partial['count'] == 2
+
+def test_nested_rows_path_and_extras():
+    """Test rows and extras located by nested paths"""
+    schema = DATASETS['gainers']
+    payload = schema.transform({'NIFTY': {'data': [{'symbol': 'TCS', 'perChange': '2.5'}], 'timestamp': '15-Jan-2024'}})
+
+    assert payload['gainers'][0]['pChange'] == 2.5
+    assert payload['timestamp'] == '15-Jan-2024'
+    assert schema.transform({})['count'] == 0
+
+def test_existing_datasets_keep_their_shape():
+    """Test that schema-driven getters return the original payload keys"""
+    service = NSEService()
+    service.client.get_json = lambda endpoint: {
+        'data': [{'symbol': 'RELIANCE', 'comapnyName': 'Reliance Industries', 'ltp': 2950}],
+        'high': 1,
+        'low': 0,
+        'timestamp': '15-Jan-2024 15:30:00'
+    }
+
+    symbols = service.get_nifty50_symbols()
+    high = service.get_52week_high_stocks()
+
+    assert symbols == {'success': True, 'symbols': ['RELIANCE'], 'count': 1}
+    assert list(high) == ['success', 'highStocks', 'count', 'totalHigh', 'timestamp']
+    assert high['highStocks'][0]['companyName'] == 'Reliance Industries'
+
+def test_live_dataset_route(monkeypatch):
+    """Test that a dataset declared only as a schema is served by the API"""
+    routes.nse_service.snapshots.publish('most_active', DATASETS['most_active'].transform({'data': [{'symbol': 'SBIN'}]}), ttl=60)
+    client = create_app('testing').test_client()
+
+    response = client.get('/api/live/most-active')
+    assert response.status_code == 200
+    assert response.get_json()['data']['mostActive'][0]['symbol'] == 'SBIN'
+    assert client.get('/api/live/unknown').status_code == 404
@@ -0,0 +1,86 @@
+from app import create_app
+from app.api.routes import nse_service
+from app.config.config import ProductionConfig
+from app.server import gunicorn_options, post_fork, prepare_fork, start_worker, stop_worker
+from app.services.nse_client import NSEClient
+from app.services.shared_snapshot_store import SharedSnapshotStore
+from app.services.snapshot_store import SnapshotStore
+from app.services.tick_store import TickStore
+
+# 10:00:00 IST on 15 Jan 2024
+OPEN = 1705293000
+
+def test_gunicorn_options_follow_config():
+    """Test that server settings and lifecycle hooks come from the config class"""
+    options = gunicorn_options(ProductionConfig)
+
+    assert options['bind'] == ProductionConfig.SERVER_BIND
+    assert options['workers'] == ProductionConfig.SERVER_WORKERS >= 1
+    assert options['worker_class'] == 'gthread'
+    assert options['preload_app'] is True
+    assert options['post_fork'] is post_fork
+    # Even with more workers than CPUs, each worker's projections still run on a pool
+    assert ProductionConfig.MONTE_CARLO_WORKER_PROCESSES >= 2
+
+def test_client_reopen_keeps_cookies(nse_stub):
+    """Test that a reopened client gets a new pool but skips the handshake"""
+    nse_stub.routes['allIndices'] = {'data': []}
+    client = NSEClient(nse_stub.base_url, nse_stub.home_url, timeout=5)
+    client.get_json('allIndices')
+    session = client.session
+
+    client.close()
+    client.reopen()
+
+    assert client.session is not session
+    assert client.get_json('allIndices') == {'data': []}
+    assert nse_stub.handshakes == 1
+    assert len(nse_stub.connections) == 2
+
+def test_tick_store_reopen_keeps_data(tmp_path):
+    """Test that closing and reopening a file-backed store keeps its bars"""
+    store = TickStore(str(tmp_path / 'ticks.db'))
+    store.record(OPEN, [('TCS', 100.0)])
+
+    store.close()
+    store.reopen()
+
+    assert store.bars('TCS', '1m', start=OPEN, end=OPEN + 60)[0]['close'] == 100.0
+    store.close()
+
+def test_worker_lifecycle_without_poller():
+    """Test that the fork hooks release and recreate per-process resources"""
+    app = create_app('testing', start_background=False)
+    app.config['MONTE_CARLO_WORKER_PROCESSES'] = 3
+    tick_store = app.extensions['tick_store']
+    session = nse_service.client.session
+
+    prepare_fork(app)
+    start_worker(app)
+
+    assert nse_service.client.session is not session
+    assert app.extensions['monte_carlo'].processes == 3
+    assert tick_store.bars('TCS', '1m', start=OPEN, end=OPEN + 60) == []
+    assert not app.extensions['market_poller'].running
+
+    stop_worker(app)
+    nse_service.client.reopen()
+
+def test_worker_reads_shared_snapshots(tmp_path):
+    """Test that with a shared store, forked workers become readers and leave polling and ticks to the poller process"""
+    app = create_app('testing', start_background=False)
+    app.config['MARKET_POLLER_ENABLED'] = True
+    tick_store = app.extensions['tick_store']
+    nse_service.snapshots = store = SharedSnapshotStore(str(tmp_path))
+    store.subscribe(tick_store.record_snapshot)
+
+    try:
+        start_worker(app)
+
+        assert store.writer is False
+        assert tick_store.record_snapshot not in store._subscribers
+        assert not app.extensions['market_poller'].running
+    finally:
+        stop_worker(app)
+        nse_service.client.reopen()
+        nse_service.snapshots = SnapshotStore()
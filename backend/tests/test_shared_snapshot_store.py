@@ -0,0 +1,89 @@
+import os
+from array import array
+import pytest
+from app.models.records import RecordTable
+from app.services.shared_snapshot_store import SharedSnapshotStore
+from payloads import indices
+
+def test_reader_adopts_writer_snapshot(tmp_path):
+    """Test that a reader serves the writer's encoded body, ETag and version without re-encoding"""
+    writer = SharedSnapshotStore(str(tmp_path), writer=True)
+    reader = SharedSnapshotStore(str(tmp_path), writer=False)
+    published = writer.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=60)
+
+    snapshot = reader.get('indices')
+
+    assert snapshot.version == published.version
+    assert snapshot.body == published.body
+    assert snapshot.etag == published.etag
+    assert snapshot.columnar_body == published.columnar_body
+    assert snapshot.expires_at == published.expires_at
+    assert snapshot.payload['indices'].to_rows() == published.payload['indices'].to_rows()
+    assert reader.names() == ['indices']
+
+def test_payload_is_stored_as_json(tmp_path):
+    """Test that record tables come back packed from a file holding no pickle"""
+    writer = SharedSnapshotStore(str(tmp_path), writer=True)
+    reader = SharedSnapshotStore(str(tmp_path), writer=False)
+    writer.publish('indices', indices(('NIFTY 50', 22000.0), ('NIFTY BANK', float('nan'))))
+
+    assert b'"tables":{"indices"' in (tmp_path / 'indices.snap').read_bytes()
+    table = reader.get('indices').payload['indices']
+    assert isinstance(table, RecordTable)
+    assert isinstance(table.column('lastPrice'), array)
+    assert table[0]['lastPrice'] == 22000.0
+    assert table[1]['lastPrice'] != table[1]['lastPrice']
+
+def test_refuses_directory_others_can_write(tmp_path):
+    """Test that a snapshot directory open to other users is rejected rather than trusted"""
+    directory = tmp_path / 'shared'
+    directory.mkdir(mode=0o700)
+    os.chmod(directory, 0o777)
+
+    with pytest.raises(PermissionError):
+        SharedSnapshotStore(str(directory), writer=False)
+
+    os.chmod(directory, 0o700)
+    SharedSnapshotStore(str(directory), writer=False)
+
+def test_reader_tracks_versions_and_notifies_subscribers(tmp_path):
+    """Test that adopted snapshots fill the reader's history and reach its subscribers once per file"""
+    writer = SharedSnapshotStore(str(tmp_path), writer=True)
+    reader = SharedSnapshotStore(str(tmp_path), writer=False)
+    seen = []
+    reader.subscribe(lambda snapshot: seen.append(snapshot.version))
+
+    first = writer.publish('indices', indices(('NIFTY 50', 22000.0)))
+    reader.get('indices')
+    reader.get('indices')
+    second = writer.publish('indices', indices(('NIFTY 50', 22010.0)))
+    reader.get('indices')
+
+    assert seen == [first.version, second.version]
+    assert reader.versions('indices') == [first.version, second.version]
+    assert reader.at_version('indices', first.version).payload['indices'][0]['lastPrice'] == 22000.0
+
+def test_unchanged_republish_reuses_decoded_payload(tmp_path):
+    """Test that a republish with the same version refreshes freshness but keeps the payload object"""
+    writer = SharedSnapshotStore(str(tmp_path), writer=True)
+    reader = SharedSnapshotStore(str(tmp_path), writer=False)
+    writer.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=60)
+    before = reader.get('indices')
+
+    writer.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=600)
+    after = reader.get('indices')
+
+    assert after is not before
+    assert after.version == before.version
+    assert after.payload is before.payload
+    assert after.expires_at > before.expires_at
+    assert reader.versions('indices') == [before.version]
+
+def test_reader_publishes_locally_only(tmp_path):
+    """Test that a reader's own fallback fetches never overwrite the shared files"""
+    reader = SharedSnapshotStore(str(tmp_path), writer=False)
+
+    reader.publish('indices', indices(('NIFTY 50', 22000.0)))
+
+    assert reader.get('indices') is not None
+    assert not os.path.exists(reader.path('indices'))
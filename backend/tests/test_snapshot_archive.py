@@ -0,0 +1,81 @@
+import threading
+import time
+from app import create_app
+from app.api.routes import nse_service
+from app.services.snapshot_archive import SnapshotArchive
+from app.services.snapshot_store import SnapshotStore
+from payloads import indices
+
+class BlockingClient:
+    """NSE client whose responses wait until `release` is set"""
+
+    def __init__(self, data):
+        self.data = data
+        self.release = threading.Event()
+
+    def get_json(self, endpoint):
+        self.release.wait(5)
+        return self.data
+
+    def close(self):
+        pass
+
+def test_archive_round_trip(tmp_path):
+    """Test that an archived snapshot comes back with its bodies, ETag and version, marked restored"""
+    store = SnapshotStore()
+    archive = SnapshotArchive(str(tmp_path))
+    store.subscribe(archive.save)
+    published = store.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=60)
+
+    restored = SnapshotArchive(str(tmp_path)).load('indices')
+
+    assert restored.restored is True
+    assert restored.version == published.version
+    assert restored.body == published.body
+    assert restored.etag == published.etag
+    assert restored.payload['indices'].to_rows() == published.payload['indices'].to_rows()
+    assert SnapshotArchive(str(tmp_path)).load('nifty50') is None
+
+def test_unreadable_archive_is_ignored(tmp_path):
+    """Test that a corrupt file is treated as missing"""
+    archive = SnapshotArchive(str(tmp_path))
+    with open(archive.path('indices'), 'wb') as f:
+        f.write(b'not a snapshot')
+
+    assert archive.load('indices') is None
+
+def test_cold_start_serves_restored_snapshot_until_live_refresh(tmp_path):
+    """Test that a restart answers from disk, flagged stale, without waiting for a slow NSE"""
+    previous = SnapshotStore()
+    previous.subscribe(SnapshotArchive(str(tmp_path)).save)
+    archived = previous.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=60)
+
+    client = create_app('testing').test_client()
+    originals = (nse_service.client, nse_service.snapshots, nse_service.archive)
+    nse_service.client = BlockingClient({'data': [{'indexSymbol': 'NIFTY 50', 'last': 22050.0}]})
+    nse_service.snapshots = SnapshotStore()
+    nse_service.archive = SnapshotArchive(str(tmp_path))
+    nse_service._restore_attempted.clear()
+    nse_service.cache.invalidate()
+
+    try:
+        stale = client.get('/api/indices/all')
+        assert stale.status_code == 200
+        assert stale.headers['X-Snapshot-Stale'] == 'true'
+        assert stale.headers['X-Snapshot-Version'] == str(archived.version)
+        assert stale.get_json()['data']['indices'][0]['lastPrice'] == 22000.0
+
+        nse_service.client.release.set()
+        for _ in range(100):
+            if not nse_service.snapshots.get('indices').restored:
+                break
+            time.sleep(0.02)
+
+        live = client.get('/api/indices/all')
+        assert 'X-Snapshot-Stale' not in live.headers
+        assert live.get_json()['data']['indices'][0]['lastPrice'] == 22050.0
+    finally:
+        nse_service.client.release.set()
+        nse_service.client, nse_service.snapshots, nse_service.archive = originals
+        nse_service._restore_attempted.clear()
+        nse_service.cache.invalidate()
@@ -0,0 +1,98 @@
+from app import create_app
+from app.api.routes import nse_service
+from app.models.diff import diff_tables
+from app.services.nse_service import NSEService
+from app.services.stream_hub import StreamHub
+from payloads import indices
+
+def test_keyed_diff():
+    """Test that only added, changed and removed rows are reported"""
+    diff = diff_tables(
+        indices(('NIFTY 50', 22000.0), ('NIFTY BANK', 47000.0), ('NIFTY IT', 36000.0))['indices'],
+        indices(('NIFTY 50', 22010.5), ('NIFTY BANK', 47000.0), ('INDIA VIX', 13.2))['indices']
+    )
+
+    assert [row['symbol'] for row in diff['added']] == ['INDIA VIX']
+    assert [(row['symbol'], row['lastPrice']) for row in diff['changed']] == [('NIFTY 50', 22010.5)]
+    assert diff['removed'] == ['NIFTY IT']
+
+def test_diffs_fan_out_once_per_publish():
+    """Test that every client receives the same encoded diff and unchanged publishes send nothing"""
+    service = NSEService()
+    hub = StreamHub(service)
+    service.snapshots.subscribe(hub.on_snapshot)
+    service.snapshots.publish('indices', indices(('NIFTY 50', 22000.0), ('NIFTY BANK', 47000.0)))
+
+    first, second = hub.connect('indices'), hub.connect('indices')
+    service.snapshots.publish('indices', indices(('NIFTY 50', 22000.0), ('NIFTY BANK', 47000.0)))
+    snapshot = service.snapshots.publish('indices', indices(('NIFTY 50', 22005.0), ('NIFTY BANK', 47000.0)))
+
+    event = first.next_event(timeout=1)
+    assert event is second.next_event(timeout=1)
+    assert event.startswith(f"id: {snapshot.version}\nevent: diff\n".encode())
+    assert b'NIFTY BANK' not in event
+    assert first.next_event(timeout=0.01) is None
+
+def test_slow_consumer_resyncs_with_one_snapshot():
+    """Test that a full queue is replaced by a single full snapshot event"""
+    service = NSEService()
+    hub = StreamHub(service, queue_size=3)
+    service.snapshots.subscribe(hub.on_snapshot)
+    service.snapshots.publish('indices', indices(('NIFTY 50', 22000.0)))
+    client = hub.connect('indices')
+
+    versions = [service.snapshots.publish('indices', indices(('NIFTY 50', 22000.0 + i))).version for i in range(1, 6)]
+
+    events = [client.next_event(timeout=0.01) for _ in range(3)]
+    assert events[0].startswith(f"id: {versions[3]}\nevent: snapshot\n".encode())
+    assert b'22004.0' in events[0]
+    assert events[1].startswith(f"id: {versions[4]}\nevent: diff\n".encode())
+    assert events[2] is None
+    assert hub.stats()['resyncs'] == 1
+    assert client.dropped == 3
+
+def test_stream_endpoint():
+    """Test that the SSE endpoint sends a snapshot, then diffs, and releases the client on close"""
+    app = create_app('testing')
+    hub = app.extensions['stream_hub']
+    nse_service.snapshots.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=60)
+
+    response = app.test_client().get('/api/stream/indices', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+
+    chunks = iter(response.response)
+    assert b'event: snapshot' in next(chunks)
+    nse_service.snapshots.publish('indices', indices(('NIFTY 50', 22100.0)), ttl=60)
+    assert b'22100.0' in next(chunks)
+
+    response.close()
+    assert hub.stats()['clients'] == 0
+    assert app.test_client().get('/api/stream/unknown').status_code == 404
+
+def test_streams_leave_threads_for_requests():
+    """Test that the stream cap stays below the server's threads and refuses streams past it"""
+    app = create_app('testing')
+    hub = app.extensions['stream_hub']
+    assert 0 < hub.max_clients < app.config['SERVER_THREADS']
+    nse_service.snapshots.publish('indices', indices(('NIFTY 50', 22000.0)), ttl=60)
+
+    hub.max_clients = 1
+    client = app.test_client()
+    response = client.get('/api/stream/indices', buffered=False)
+    assert response.status_code == 200
+    assert client.get('/api/stream/indices').status_code == 503
+
+    response.close()
+    assert hub.stats()['clients'] == 0
+
+def test_new_app_replaces_previous_subscribers():
+    """Test that creating an app unsubscribes the previous app's snapshot handlers"""
+    apps = [create_app('testing', start_background=False) for _ in range(3)]
+    subscribers = nse_service.snapshots._subscribers
+
+    assert apps[-1].extensions['stream_hub'].on_snapshot in subscribers
+    for app in apps[:-1]:
+        assert app.extensions['stream_hub'].on_snapshot not in subscribers
+        assert app.extensions['tick_store'].record_snapshot not in subscribers
+    assert len(subscribers) == len(set(subscribers))
@@ -0,0 +1,68 @@
+from app import create_app
+from app.models.snapshot import Snapshot
+from app.services.nse_service import DATASETS
+from app.services.tick_store import TickStore
+
+# 10:00:00 IST on 15 Jan 2024
+OPEN = 1705293000
+
+def test_rollups_build_ohlc_bars():
+    """Test that ticks fold into OHLC bars for each interval"""
+    store = TickStore(':memory:')
+    for offset, price in ((0, 100.0), (20, 105.0), (40, 98.0), (70, 101.0)):
+        store.record(OPEN + offset, [('TCS', price)])
+
+    one_minute = store.bars('TCS', '1m', start=OPEN, end=OPEN + 120)
+    five_minute = store.bars('TCS', '5m', start=OPEN, end=OPEN + 120)
+
+    assert [(bar['open'], bar['high'], bar['low'], bar['close']) for bar in one_minute] == [
+        (100.0, 105.0, 98.0, 98.0),
+        (101.0, 101.0, 101.0, 101.0)
+    ]
+    assert len(five_minute) == 1
+    assert five_minute[0]['ticks'] == 4
+    assert five_minute[0]['high'] == 105.0
+
+def test_daily_bars_align_to_ist_midnight():
+    """Test that daily buckets start at exchange-local midnight"""
+    store = TickStore(':memory:')
+
+    # 00:00 IST on 15 Jan 2024 is 18:30 UTC on 14 Jan
+    assert store.bucket(OPEN, 86400) == 1705257000
+
+def test_records_only_changed_snapshots():
+    """Test that republished, unchanged snapshots add no ticks"""
+    store = TickStore(':memory:')
+    payload = DATASETS['nifty50'].transform({'data': [{'symbol': 'RELIANCE', 'lastPrice': 2950.5}]})
+
+    store.record_snapshot(Snapshot('nifty50', payload, fetched_at=OPEN, modified_at=OPEN))
+    store.record_snapshot(Snapshot('nifty50', payload, fetched_at=OPEN + 15, modified_at=OPEN))
+
+    assert store.ticks('RELIANCE', end=OPEN + 60) == [(OPEN, 2950.5)]
+
+def test_index_recorded_from_indices_only():
+    """Test that the index row repeated in the Nifty 50 payload adds no ticks"""
+    store = TickStore(':memory:')
+    payload = DATASETS['nifty50'].transform({'data': [
+        {'symbol': 'NIFTY 50', 'lastPrice': 21800.0},
+        {'symbol': 'TCS', 'lastPrice': 3900.0}
+    ]})
+
+    store.record_snapshot(Snapshot('nifty50', payload, fetched_at=OPEN, modified_at=OPEN))
+
+    assert store.ticks('NIFTY 50', end=OPEN + 60) == []
+    assert store.ticks('TCS', end=OPEN + 60) == [(OPEN, 3900.0)]
+
+def test_history_endpoint():
+    """Test the stock history endpoint the frontend calls"""
+    app = create_app('testing')
+    app.extensions['tick_store'].record(OPEN, [('INFY', 1650.0)])
+    client = app.test_client()
+
+    response = client.get('/api/nifty50/stock/infy/history?period=max&interval=1h')
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['count'] == 1
+    assert data['bars'][0]['close'] == 1650.0
+
+    assert client.get('/api/nifty50/stock/INFY/history?interval=2m').status_code == 400
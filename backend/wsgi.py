@@ -0,0 +1,11 @@
+"""
+Finance API - WSGI entry point for production servers
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import os
+from app import create_app
+
+# Background polling starts in each worker after fork (see app.server)
+app = create_app(os.environ.get('FLASK_CONFIG', 'production'), start_background=False)
@@ -1,5 +1,6 @@
-// Cryptocurrency API Base URL
-const COINGECKO_API_BASE = 'https://api.coingecko.com/api/v3';
+// Cryptocurrency API Base URL: the backend's cached CoinGecko proxy
+const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
+const COINGECKO_API_BASE = `${API_BASE_URL}/api/crypto`;
 
 // API Endpoints
 export const API_ENDPOINTS = {
@@ -11,6 +12,9 @@ export const API_ENDPOINTS = {
   TRENDING: '/search/trending'
 };
 
+// Chart series are downsampled server-side to about this many points
+const CHART_POINTS = 300;
+
 /**
  * Fetch top cryptocurrencies with market data
  * @param {number} limit - Number of cryptocurrencies to fetch (default: 10)
@@ -20,14 +24,14 @@ export const API_ENDPOINTS = {
 export const fetchTopCryptocurrencies = async (limit = 10, currency = 'usd') => {
   try {
     const response = await fetch(
-      `${COINGECKO_API_BASE}${API_ENDPOINTS.TOP_CRYPTOS}?vs_currency=${currency}&order=market_cap_desc&per_page=${limit}&page=1&sparkline=false&price_change_percentage=1h,24h,7d`
+      `${COINGECKO_API_BASE}${API_ENDPOINTS.TOP_CRYPTOS}?vs_currency=${currency}&per_page=${limit}&page=1`
     );
 
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
+    const { data } = await response.json();
     return data;
   } catch (error) {
     console.error('Error fetching top cryptocurrencies:', error);
@@ -47,7 +51,7 @@ export const fetchGlobalMarketData = async () => {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
+    const { data } = await response.json();
     return data.data;
   } catch (error) {
     console.error('Error fetching global market data:', error);
@@ -63,14 +67,14 @@ export const fetchGlobalMarketData = async () => {
 export const fetchCryptoDetails = async (cryptoId) => {
   try {
     const response = await fetch(
-      `${COINGECKO_API_BASE}${API_ENDPOINTS.CRYPTO_DETAILS}/${cryptoId}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false&sparkline=false`
+      `${COINGECKO_API_BASE}${API_ENDPOINTS.CRYPTO_DETAILS}/${cryptoId}`
     );
 
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
+    const { data } = await response.json();
     return data;
   } catch (error) {
     console.error('Error fetching crypto details:', error);
@@ -100,14 +104,14 @@ export const fetchChartData = async (cryptoId, timeRange, currency = 'usd') => {
     const interval = timeRange === '1d' ? 'hourly' : 'daily';
 
     const response = await fetch(
-      `${COINGECKO_API_BASE}${API_ENDPOINTS.CRYPTO_DETAILS}/${cryptoId}${API_ENDPOINTS.MARKET_CHART}?vs_currency=${currency}&days=${days}&interval=${interval}`
+      `${COINGECKO_API_BASE}${API_ENDPOINTS.CRYPTO_DETAILS}/${cryptoId}${API_ENDPOINTS.MARKET_CHART}?vs_currency=${currency}&days=${days}&interval=${interval}&points=${CHART_POINTS}`
     );
 
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
+    const { data } = await response.json();
     
     // Process the data for charts
     const processedData = data.prices.map(([timestamp, price]) => ({
@@ -140,7 +144,7 @@ export const searchCryptocurrencies = async (query) => {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
+    const { data } = await response.json();
     return data.coins || [];
   } catch (error) {
     console.error('Error searching cryptocurrencies:', error);
@@ -160,7 +164,7 @@ export const fetchTrendingCryptocurrencies = async () => {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
+    const { data } = await response.json();
     return data.coins || [];
   } catch (error) {
     console.error('Error fetching trending cryptocurrencies:', error);
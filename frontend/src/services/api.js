@@ -81,10 +81,36 @@ class ApiService {
     return this.request('/api/nifty50/market-overview');
   }
 
-  async getStockHistory(symbol, period = '1y', interval = '1d') {
-    const params = new URLSearchParams({ period, interval });
+  // `points` asks the server to downsample long series (LTTB) to about that many bars
+  async getStockHistory(symbol, period = '1y', interval = '1d', points) {
+    const params = new URLSearchParams({ period, interval, ...(points ? { points } : {}) });
     return this.request(`/api/nifty50/stock/${symbol}/history?${params}`);
   }
+
+  async getIndexHistory(symbol, period = '1d', interval = '5m', points) {
+    const params = new URLSearchParams({ period, interval, ...(points ? { points } : {}) });
+    return this.request(`/api/indices/${encodeURIComponent(symbol)}/history?${params}`);
+  }
+
+  // Live updates over Server-Sent Events ('indices' or 'nifty50').
+  // onSnapshot receives the full payload, onDiff receives {added, changed, removed, timestamp}.
+  // Returns a function that closes the stream.
+  subscribe(dataset, { onSnapshot, onDiff, onError } = {}) {
+    const source = new EventSource(`${this.baseURL}/api/stream/${dataset}`);
+
+    source.addEventListener('snapshot', (event) => {
+      if (onSnapshot) onSnapshot(JSON.parse(event.data).data);
+    });
+    source.addEventListener('diff', (event) => {
+      if (onDiff) onDiff(JSON.parse(event.data).data);
+    });
+    source.onerror = (error) => {
+      console.error(`Stream error for ${dataset}:`, error);
+      if (onError) onError(error);
+    };
+
+    return () => source.close();
+  }
 }
 
 // Create and export a singleton instance